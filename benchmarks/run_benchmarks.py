@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark suite of the neuron and synapse models.
+
+Every neuron class and every synapse class of ``brainmodels`` is run at
+several network sizes and connection densities, on the backends given
+by ``--backends``. The models of ``tensor_backend`` are run with the
+``numpy`` backend, and the models of ``numba_backend`` with the
+``numba`` and ``numba-parallel`` backends.
+
+Each case runs in a fresh process, so that the memory high-water mark
+and the compile time belong to that case only. The results are written
+as JSON::
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --kind neuron --sizes 1000 --backends numba
+
+and can be compared against an earlier run, which exits with status 1
+if some case became slower than the tolerance::
+
+    python benchmarks/run_benchmarks.py --output new.json --compare results.json
+
+For each case, the result reports
+
+- ``build_time``: the seconds to construct the models and the connectivity.
+- ``compile_time``: the seconds of the first run which are not spent in
+  stepping, i.e. code generation and JIT compilation.
+- ``steps_per_sec``: the simulation steps per second of the warm run.
+- ``peak_memory``: the memory high-water mark of the process in bytes.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import brainpy as bp
+import numpy as np
+
+# benchmark the working tree, not an installed copy
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import brainmodels
+
+BACKEND_TO_MODELS = {
+    'numpy': 'tensor',
+    'numba': 'numba',
+    'numba-parallel': 'numba',
+}
+RATE_SYNAPSES = ('BCM', 'Oja')
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+DEFAULT_DENSITIES = (0.001, 0.01, 0.1)
+
+
+def get_model_names(kind, models):
+    """Get the names of the neuron or synapse classes of a model backend."""
+    module = getattr(getattr(brainmodels, f'{models}_backend'), f'{kind}s')
+    base = bp.NeuGroup if kind == 'neuron' else bp.TwoEndConn
+    return sorted(name for name, obj in vars(module).items()
+                  if isinstance(obj, type) and issubclass(obj, base)
+                  and obj.__module__.startswith(module.__name__))
+
+
+def get_cases(args):
+    """Get the benchmark cases, and the cases skipped by the size limits."""
+    cases, skipped = [], []
+    for backend in args.backends:
+        models = BACKEND_TO_MODELS[backend]
+        for kind in args.kind:
+            for name in get_model_names(kind, models):
+                if args.models and name not in args.models:
+                    continue
+                for size in args.sizes:
+                    if kind == 'neuron':
+                        cases.append(dict(kind=kind, name=name, models=models,
+                                          backend=backend, size=size))
+                        continue
+                    for density in args.densities:
+                        case = dict(kind=kind, name=name, models=models,
+                                    backend=backend, size=size, density=density)
+                        num_syn = size * size * density
+                        if num_syn > args.max_synapses:
+                            skipped.append(dict(case, skipped=f'{num_syn:.3g} synapses exceed '
+                                                              f'--max-synapses={args.max_synapses:.3g}'))
+                        elif models == 'tensor' and args.storage == 'dense' and size * size > args.max_dense:
+                            skipped.append(dict(case, skipped=f'{size * size:.3g} dense elements exceed '
+                                                              f'--max-dense={args.max_dense:.3g}'))
+                        else:
+                            cases.append(case)
+    return cases, skipped
+
+
+def get_peak_memory():
+    """Get the memory high-water mark of this process in bytes."""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def build_case(case, storage):
+    """Build the network of a case, and its inputs."""
+    module = getattr(brainmodels, f'{case["models"]}_backend')
+    rng = np.random.RandomState(0)
+    size = case['size']
+
+    if case['kind'] == 'neuron':
+        group = getattr(module.neurons, case['name'])(size)
+        return bp.Network(group), [(group, 'input', rng.uniform(5., 30., size))]
+
+    if case['name'] in RATE_SYNAPSES:
+        pre, post = RateGroup(size), RateGroup(size)
+        inputs = []
+    else:
+        pre, post = module.neurons.LIF(size), module.neurons.LIF(size)
+        inputs = [(pre, 'input', rng.uniform(15., 30., size))]
+    kwargs = dict(storage=storage) if case['models'] == 'tensor' else dict()
+    conn = bp.connect.FixedProb(case['density'], seed=1)
+    syn = getattr(module.synapses, case['name'])(pre=pre, post=post, conn=conn, **kwargs)
+    case['num_synapses'] = int(len(syn.conn.requires('pre_ids')))
+    return bp.Network(pre, syn, post), inputs
+
+
+def run_case(case, args):
+    """Run one benchmark case in this process."""
+    bp.backend.set(case['backend'], dt=args.dt)
+    brainmodels.set_dtype(args.dtype)
+
+    t0 = time.perf_counter()
+    net, inputs = build_case(case, args.storage)
+    case['build_time'] = time.perf_counter() - t0
+
+    # the first run includes the code generation and the compilation
+    t0 = time.perf_counter()
+    net.run(args.warmup, inputs=inputs)
+    first_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    net.run(args.duration, inputs=inputs)
+    run_time = time.perf_counter() - t0
+
+    num_step = int(round(args.duration / args.dt))
+    num_warmup = int(round(args.warmup / args.dt))
+    case['steps_per_sec'] = num_step / run_time
+    case['compile_time'] = max(first_time - num_warmup * run_time / num_step, 0.)
+    case['peak_memory'] = get_peak_memory()
+    return case
+
+
+def run_case_in_process(case, args):
+    """Run one benchmark case in a fresh process."""
+    cmd = [sys.executable, os.path.abspath(__file__), '--case', json.dumps(case),
+           '--dt', str(args.dt), '--duration', str(args.duration),
+           '--warmup', str(args.warmup), '--storage', args.storage,
+           '--dtype', args.dtype]
+    try:
+        res = subprocess.run(cmd, capture_output=True, text=True, timeout=args.timeout)
+    except subprocess.TimeoutExpired:
+        return dict(case, error=f'timeout after {args.timeout} s')
+    if res.returncode != 0:
+        # the exception message, without the traceback
+        lines = res.stderr.strip().split('\n')
+        starts = [i for i, line in enumerate(lines) if line.split(':')[0].endswith(('Error', 'Exception'))]
+        error = '\n'.join(lines[starts[-1]:]) if starts else (lines[-1] or f'exit status {res.returncode}')
+        return dict(case, error=error[:1000])
+    return json.loads(res.stdout.strip().split('\n')[-1])
+
+
+def get_meta(args):
+    """Get the versions and the settings of the benchmark run."""
+    meta = dict(brainmodels=brainmodels.__version__,
+                brainpy=bp.__version__,
+                numpy=np.__version__,
+                python=platform.python_version(),
+                platform=platform.platform(),
+                processor=platform.processor(),
+                cpu_count=os.cpu_count(),
+                date=datetime.datetime.now().isoformat(timespec='seconds'),
+                dt=args.dt,
+                duration=args.duration,
+                warmup=args.warmup,
+                storage=args.storage,
+                dtype=args.dtype)
+    try:
+        import numba
+        meta['numba'] = numba.__version__
+    except ModuleNotFoundError:
+        pass
+    return meta
+
+
+def compare(results, baseline, tolerance):
+    """Get the cases which are slower than the baseline by more than
+    the relative ``tolerance``."""
+    keys = ('kind', 'name', 'backend', 'size', 'density')
+    old = {tuple(r.get(k) for k in keys): r for r in baseline['results']}
+    regressions = []
+    for new in results:
+        ref = old.get(tuple(new.get(k) for k in keys))
+        if ref is None or 'steps_per_sec' not in ref or 'steps_per_sec' not in new:
+            continue
+        ratio = new['steps_per_sec'] / ref['steps_per_sec']
+        if ratio < 1. - tolerance:
+            regressions.append(dict(new, baseline_steps_per_sec=ref['steps_per_sec'], ratio=ratio))
+    return regressions
+
+
+class RateGroup(bp.NeuGroup):
+    """Neuron group with a constant firing rate ``r``, for the rate-based
+    learning rules."""
+    target_backend = 'general'
+
+    def __init__(self, size, **kwargs):
+        self.r = np.random.RandomState(0).uniform(0.1, 1., size)
+        super(RateGroup, self).__init__(size=size, **kwargs)
+
+    def update(self, _t):
+        # The rates are constant. The numba driver of brainpy generates an
+        # empty, uncompilable step function from an update without any
+        # variable access, e.g. ``pass``, so one rate is written back.
+        self.r[0] = self.r[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the brainmodels neuron and synapse models.')
+    parser.add_argument('--kind', nargs='+', default=['neuron', 'synapse'], choices=['neuron', 'synapse'])
+    parser.add_argument('--models', nargs='+', default=None, help='Class names to run, default all.')
+    parser.add_argument('--backends', nargs='+', default=list(BACKEND_TO_MODELS),
+                        choices=list(BACKEND_TO_MODELS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(DEFAULT_SIZES),
+                        help='Numbers of neurons (of each of the pre- and post-synaptic groups).')
+    parser.add_argument('--densities', nargs='+', type=float, default=list(DEFAULT_DENSITIES),
+                        help='Connection probabilities of the synapses.')
+    parser.add_argument('--storage', default='dense', choices=['dense', 'csr'],
+                        help='Synaptic storage of the tensor backend synapses.')
+    parser.add_argument('--dtype', default='float64', choices=['float32', 'float64'],
+                        help='Floating point dtype of the model states.')
+    parser.add_argument('--dt', type=float, default=0.1)
+    parser.add_argument('--duration', type=float, default=100., help='Timed simulation length (ms).')
+    parser.add_argument('--warmup', type=float, default=1., help='Simulation length of the compiling run (ms).')
+    parser.add_argument('--max-synapses', type=float, default=1e8)
+    parser.add_argument('--max-dense', type=float, default=1e8,
+                        help='Largest num_pre * num_post of the dense storage.')
+    parser.add_argument('--timeout', type=float, default=1800., help='Seconds per case.')
+    parser.add_argument('--output', default=None, help='JSON file, default stdout.')
+    parser.add_argument('--compare', default=None, help='JSON file of a baseline run.')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Relative slow-down of steps/sec reported as a regression.')
+    parser.add_argument('--case', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case is not None:
+        print(json.dumps(run_case(json.loads(args.case), args)))
+        return
+
+    cases, skipped = get_cases(args)
+    results = []
+    for i, case in enumerate(cases):
+        res = run_case_in_process(case, args)
+        results.append(res)
+        status = res.get('error') or f'{res["steps_per_sec"]:.1f} steps/s'
+        print(f'[{i + 1}/{len(cases)}] {case["backend"]} {case["name"]} size={case["size"]}'
+              f'{" density=%g" % case["density"] if "density" in case else ""}: {status}',
+              file=sys.stderr)
+    report = dict(meta=get_meta(args), results=results + skipped)
+
+    if args.output is None:
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f'REGRESSION {r["backend"]} {r["name"]} size={r["size"]} density={r.get("density")}: '
+                  f'{r["steps_per_sec"]:.1f} vs {r["baseline_steps_per_sec"]:.1f} steps/s',
+                  file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,9 @@ from . import tensor_backend
 from .tensor_backend import neurons
 from .tensor_backend import synapses
 from .utils import ops_buffer
+from .utils.conn_cache import set_conn_cache
+from .utils.dtype import get_dtype, set_dtype
+from .utils.param_sweep import sweep
 
 
 def set_backend(backend):
@@ -3,6 +3,9 @@
 import brainpy as bp
 from numba import prange
 
+from ...utils.dtype import get_dtype
+from ...utils.jit import jit_kernel
+
 __all__ = [
     'AdExIF'
 ]
@@ -46,6 +49,10 @@ class AdExIF(bp.NeuGroup):
     t_refractory  0              ms       Refractory period length.
 
     noise         0.             \        the noise fluctuation.
+
+    fastmath      None           \        Compile the update with the fast floating point math. None for the backend default.
+
+    parallel      None           \        Run the update loop in parallel. None for the backend default.
     ============= ============== ======== ========================================================================================================================
 
     **Neuron Variables**
@@ -69,7 +76,7 @@ class AdExIF(bp.NeuGroup):
      
                                       Can be seen as bool.
                              
-    t_last_spike    -1e7              Last spike time stamp.
+    ref_count       0                 Remaining time steps of the refractory period.
     =============== ================= =========================================================
     
     References:
@@ -88,7 +95,7 @@ class AdExIF(bp.NeuGroup):
     def __init__(self, size, V_rest=-65., V_reset=-68.,
                  V_th=-30., V_T=-59.9, delta_T=3.48,
                  a=1., b=1., R=10., tau=10., tau_w=30.,
-                 t_refractory=0., **kwargs):
+                 t_refractory=0., fastmath=None, parallel=None, **kwargs):
 
         # parameters
         self.V_rest = V_rest
@@ -102,35 +109,43 @@ class AdExIF(bp.NeuGroup):
         self.tau = tau
         self.tau_w = tau_w
         self.t_refractory = t_refractory
+        self.ref_steps = int(t_refractory / bp.backend.get_dt() + 1e-9)
 
         # variables
         num = bp.size2len(size)
-        self.V = bp.ops.ones(num) * V_reset
-        self.w = bp.ops.zeros(size)
-        self.input = bp.ops.zeros(num)
+        self.V = bp.ops.ones(num, dtype=get_dtype()) * V_reset
+        self.w = bp.ops.zeros(size, dtype=get_dtype())
+        self.input = bp.ops.zeros(num, dtype=get_dtype())
         self.spike = bp.ops.zeros(num, dtype=bool)
         self.refractory = bp.ops.zeros(num, dtype=bool)
-        self.t_last_spike = bp.ops.ones(num) * -1e7
+        self.ref_count = bp.ops.zeros(num, dtype=bp.ops.int32)
 
         self.integral = bp.odeint(f=self.derivative, method='euler')
 
+        self.kernel = jit_kernel(_update, fastmath=fastmath, parallel=parallel)
         super(AdExIF, self).__init__(size=size, **kwargs)
 
+
     def update(self, _t):
-        for i in prange(self.size[0]):
-            spike = 0.
-            refractory = (_t - self.t_last_spike[i] <= self.t_refractory)
-            if not refractory:
-                V, w = self.integral(self.V[i], self.w[i], _t, self.input[i],
-                                     self.V_rest, self.delta_T,
-                                     self.V_T, self.R, self.tau, self.tau_w, self.a)
-                spike = (V >= self.V_th)
-                if spike:
-                    V = self.V_rest
-                    w += self.b
-                    self.t_last_spike[i] = _t
-                self.V[i] = V
-                self.w[i] = w
-            self.spike[i] = spike
-            self.refractory[i] = refractory or spike
-            self.input[i] = 0.  # reset input here or it will be brought to next step
+        self.kernel(_t, self.integral, self.V, self.w, self.ref_count, self.refractory, self.spike, self.input,
+                    self.V_rest, self.delta_T, self.V_T, self.V_th, self.R, self.tau, self.tau_w,
+                    self.a, self.b, self.ref_steps)
+
+
+def _update(_t, integral, V, w, ref_count, refractory, spike, Iext, V_rest, delta_T, V_T, V_th, R, tau, tau_w,
+            a, b, ref_steps):
+    for i in prange(V.shape[0]):
+        count = ref_count[i]
+        spiking = False
+        if count > 0:
+            ref_count[i] = count - 1
+        else:
+            V_new, w_new = integral(V[i], w[i], _t, Iext[i], V_rest, delta_T, V_T, R, tau, tau_w, a)
+            spiking = V_new >= V_th
+            V[i] = V_rest if spiking else V_new
+            w[i] = w_new + b if spiking else w_new
+            if spiking:
+                ref_count[i] = ref_steps
+        spike[i] = spiking
+        refractory[i] = (count > 0) | spiking
+        Iext[i] = 0.
@@ -3,6 +3,9 @@
 import brainpy as bp
 from numba import prange
 
+from ...utils.dtype import get_dtype
+from ...utils.jit import jit_kernel
+
 class ExpIF(bp.NeuGroup):
     """Exponential Integrate-and-Fire neuron model.
 
@@ -32,6 +35,10 @@ class ExpIF(bp.NeuGroup):
     tau           10.            \        Membrane time constant. Compute by R * C.
 
     t_refractory  1.7            \        Refractory period length.
+
+    fastmath      None           \        Compile the update with the fast floating point math. None for the backend default.
+
+    parallel      None           \        Run the update loop in parallel. None for the backend default.
     ============= ============== ======== ===================================================
 
     **Neuron Variables**    
@@ -53,7 +60,7 @@ class ExpIF(bp.NeuGroup):
 
                                          Can be seen as bool.
 
-    t_last_spike       -1e7              Last spike time stamp.
+    ref_count          0                 Remaining time steps of the refractory period.
     ================== ================= =========================================================
 
     References:
@@ -74,7 +81,7 @@ class ExpIF(bp.NeuGroup):
     def __init__(self, size, V_rest=-65., V_reset=-68., 
                  V_th=-30., V_T=-59.9, delta_T=3.48, 
                  R=10., C=1., tau=10., t_refractory=1.7, 
-                 **kwargs):
+                 fastmath=None, parallel=None, **kwargs):
         
         # parameters
         self.V_rest = V_rest
@@ -86,31 +93,36 @@ class ExpIF(bp.NeuGroup):
         self.C = C
         self.tau = tau
         self.t_refractory = t_refractory
+        self.ref_steps = int(t_refractory / bp.backend.get_dt() + 1e-9)
 
         # variables
-        self.V = bp.ops.ones(size) * V_rest
-        self.input = bp.ops.zeros(size)
+        self.V = bp.ops.ones(size, dtype=get_dtype()) * V_rest
+        self.input = bp.ops.zeros(size, dtype=get_dtype())
         self.spike = bp.ops.zeros(size, dtype = bool)
         self.refractory = bp.ops.zeros(size, dtype = bool)
-        self.t_last_spike = bp.ops.ones(size) * -1e7
+        self.ref_count = bp.ops.zeros(size, dtype=bp.ops.int32)
 
         self.integral = bp.odeint(self.derivative)
+        self.kernel = jit_kernel(_update, fastmath=fastmath, parallel=parallel)
         super(ExpIF, self).__init__(size = size, **kwargs)
 
-    def update(self, _t):            
-        for i in prange(self.num):
-            spike = 0.
-            refractory = (_t - self.t_last_spike[i] <= self.t_refractory)
-            if not refractory:
-                V = self.integral(
-                    self.V[i], _t, self.input[i], self.V_rest, 
-                    self.delta_T, self.V_T, self.R, self.tau
-                )
-                spike = (V >= self.V_th)
-                if spike:
-                    V = self.V_reset
-                    self.t_last_spike[i] = _t
-                self.V[i] = V
-            self.spike[i] = spike
-            self.refractory[i] = refractory or spike
-        self.input[:] = 0.
+    def update(self, _t):
+        self.kernel(_t, self.integral, self.V, self.ref_count, self.refractory, self.spike, self.input,
+                    self.V_rest, self.V_reset, self.delta_T, self.V_T, self.V_th, self.R, self.tau, self.ref_steps)
+
+
+def _update(_t, integral, V, ref_count, refractory, spike, Iext, V_rest, V_reset, delta_T, V_T, V_th, R, tau, ref_steps):
+    for i in prange(V.shape[0]):
+        count = ref_count[i]
+        spiking = False
+        if count > 0:
+            ref_count[i] = count - 1
+        else:
+            V_new = integral(V[i], _t, Iext[i], V_rest, delta_T, V_T, R, tau)
+            spiking = V_new >= V_th
+            V[i] = V_reset if spiking else V_new
+            if spiking:
+                ref_count[i] = ref_steps
+        spike[i] = spiking
+        refractory[i] = (count > 0) | spiking
+        Iext[i] = 0.
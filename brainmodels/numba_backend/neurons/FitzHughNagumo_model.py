@@ -4,6 +4,9 @@
 import brainpy as bp
 from numba import prange
 
+from ...utils.dtype import get_dtype
+from ...utils.jit import jit_kernel
+
 __all__ = [
     'FitzHughNagumo'
 ]
@@ -21,25 +24,30 @@ class FitzHughNagumo(bp.NeuGroup):
         dV = V - V * V * V / 3 - w + Iext
         return dV, dw
 
-    def __init__(self, size, a=0.7, b=0.8, tau=12.5, Vth=1.9, **kwargs):
+    def __init__(self, size, a=0.7, b=0.8, tau=12.5, Vth=1.9, fastmath=None, parallel=None, **kwargs):
         self.a = a
         self.b = b
         self.tau = tau
         self.Vth = Vth
 
         num = bp.size2len(size)
-        self.V = bp.ops.zeros(num)
-        self.w = bp.ops.zeros(num)
+        self.V = bp.ops.zeros(num, dtype=get_dtype())
+        self.w = bp.ops.zeros(num, dtype=get_dtype())
         self.spike = bp.ops.zeros(num, dtype=bool)
-        self.input = bp.ops.zeros(num)
+        self.input = bp.ops.zeros(num, dtype=get_dtype())
 
         self.integral = bp.odeint(self.derivative)
+        self.kernel = jit_kernel(_update, fastmath=fastmath, parallel=parallel)
         super(FitzHughNagumo, self).__init__(size=size, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.num):
-            V, w = self.integral(self.V[i], self.w[i], _t, self.input[i], self.a, self.b, self.tau)
-            self.spike[i] = (V >= self.Vth) * (self.V[i] < self.Vth)
-            self.V[i] = V
-            self.w[i] = w
-            self.input[i] = 0.
+        self.kernel(_t, self.integral, self.V, self.w, self.spike, self.input, self.a, self.b, self.tau, self.Vth)
+
+
+def _update(_t, integral, V, w, spike, Iext, a, b, tau, Vth):
+    for i in prange(V.shape[0]):
+        V_new, w_new = integral(V[i], w[i], _t, Iext[i], a, b, tau)
+        spike[i] = (V_new >= Vth) & (V[i] < Vth)
+        V[i] = V_new
+        w[i] = w_new
+        Iext[i] = 0.
@@ -4,6 +4,9 @@ import brainpy as bp
 import numpy as np
 from numba import prange
 
+from ...utils.dtype import get_dtype
+from ...utils.jit import jit_kernel
+
 
 class GeneralizedIF(bp.NeuGroup):
     """
@@ -75,6 +78,10 @@ class GeneralizedIF(bp.NeuGroup):
     noise         0.             \        noise.
 
     mode          'scalar'       \        Data structure of ST members.
+
+    fastmath      None           \        Compile the update with the fast floating point math. None for the backend default.
+
+    parallel      None           \        Run the update loop in parallel. None for the backend default.
     ============= ============== ======== ====================================================================
 
     **Neuron Variables**    
@@ -123,7 +130,7 @@ class GeneralizedIF(bp.NeuGroup):
                  V_th_inf=-50., V_th_reset=-60., R=20., tau=20.,
                  a=0., b=0.01, k1=0.2, k2=0.02,
                  R1=0., R2=1., A1=0., A2=0.,
-                 **kwargs):
+                 fastmath=None, parallel=None, **kwargs):
         # params
         self.V_rest = V_rest
         self.V_reset = V_reset
@@ -141,33 +148,32 @@ class GeneralizedIF(bp.NeuGroup):
         self.A2 = A2
 
         # vars
-        self.input = bp.ops.zeros(size)
+        self.input = bp.ops.zeros(size, dtype=get_dtype())
         self.spike = bp.ops.zeros(size, dtype=bool)
-        self.I1 = bp.ops.zeros(size)
-        self.I2 = bp.ops.zeros(size)
-        self.V = bp.ops.ones(size) * -70.
-        self.V_th = bp.ops.ones(size) * -50.
+        self.I1 = bp.ops.zeros(size, dtype=get_dtype())
+        self.I2 = bp.ops.zeros(size, dtype=get_dtype())
+        self.V = bp.ops.ones(size, dtype=get_dtype()) * -70.
+        self.V_th = bp.ops.ones(size, dtype=get_dtype()) * -50.
 
         self.integral = bp.odeint(self.derivative)
+        self.kernel = jit_kernel(_update, fastmath=fastmath, parallel=parallel)
         super(GeneralizedIF, self).__init__(size=size, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.size[0]):
-            I1, I2, V_th, V = self.integral(
-                self.I1[i], self.I2[i], self.V_th[i], self.V[i], _t,
-                self.k1, self.k2, self.a, self.V_rest,
-                self.b, self.V_th_inf,
-                self.R, self.input[i], self.tau
-            )
-            self.spike[i] = self.V_th[i] < V
-            if self.spike[i]:
-                V = self.V_reset
-                I1 = self.R1 * I1 + self.A1
-                I2 = self.R2 * I2 + self.A2
-                V_th = max(V_th, self.V_th_reset)
-            self.I1[i] = I1
-            self.I2[i] = I2
-            self.V_th[i] = V_th
-            self.V[i] = V
-        self.f = 0.
-        self.input[:] = self.f
+        self.kernel(_t, self.integral, self.I1, self.I2, self.V_th, self.V, self.spike, self.input,
+                    self.k1, self.k2, self.a, self.V_rest, self.b, self.V_th_inf, self.R, self.tau,
+                    self.R1, self.R2, self.A1, self.A2, self.V_th_reset, self.V_reset)
+
+
+def _update(_t, integral, I1, I2, V_th, V, spike, Iext, k1, k2, a, V_rest, b, V_th_inf, R, tau,
+            R1, R2, A1, A2, V_th_reset, V_reset):
+    for i in prange(V.shape[0]):
+        I1_new, I2_new, V_th_new, V_new = integral(I1[i], I2[i], V_th[i], V[i], _t, k1, k2, a, V_rest,
+                                                   b, V_th_inf, R, Iext[i], tau)
+        spiking = V_th[i] < V_new
+        I1[i] = R1 * I1_new + A1 if spiking else I1_new
+        I2[i] = R2 * I2_new + A2 if spiking else I2_new
+        V_th[i] = max(V_th_new, V_th_reset) if spiking else V_th_new
+        V[i] = V_reset if spiking else V_new
+        spike[i] = spiking
+    Iext[:] = 0.
@@ -4,6 +4,9 @@
 import brainpy as bp
 from numba import prange
 
+from ...utils.dtype import get_dtype
+from ...utils.jit import jit_kernel
+
 __all__ = [
     'HindmarshRose'
 ]
@@ -53,6 +56,10 @@ class HindmarshRose(bp.NeuGroup):
        s             4.             \         Model parameter. Governs adaption.
 
        noise         0.             \         noise.
+
+       fastmath      None           \         Compile the update with the fast floating point math. None for the backend default.
+
+       parallel      None           \         Run the update loop in parallel. None for the backend default.
        ============= ============== ========= ============================================================
 
        **Neuron State**
@@ -94,7 +101,7 @@ class HindmarshRose(bp.NeuGroup):
 
     def __init__(self, size, a=1., b=3.,
                  c=1., d=5., r=0.01, s=4.,
-                 V_rest=-1.6, **kwargs):
+                 V_rest=-1.6, fastmath=None, parallel=None, **kwargs):
         # parameters
         self.a = a
         self.b = b
@@ -106,21 +113,22 @@ class HindmarshRose(bp.NeuGroup):
 
         # variables
         num = bp.size2len(size)
-        self.z = bp.ops.zeros(num)
-        self.input = bp.ops.zeros(num)
-        self.V = bp.ops.ones(num) * -1.6
-        self.y = bp.ops.ones(num) * -10.
+        self.z = bp.ops.zeros(num, dtype=get_dtype())
+        self.input = bp.ops.zeros(num, dtype=get_dtype())
+        self.V = bp.ops.ones(num, dtype=get_dtype()) * -1.6
+        self.y = bp.ops.ones(num, dtype=get_dtype()) * -10.
         self.spike = bp.ops.zeros(num, dtype=bool)
 
         self.integral = bp.odeint(f=self.derivative)
+        self.kernel = jit_kernel(_update, fastmath=fastmath, parallel=parallel)
         super(HindmarshRose, self).__init__(size=size, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.num):
-            V, self.y[i], self.z[i] = self.integral(
-                self.V[i], self.y[i], self.z[i], _t,
-                self.a, self.b, self.input[i],
-                self.c, self.d, self.r, self.s,
-                self.V_rest)
-            self.V[i] = V
-            self.input[i] = 0.
+        self.kernel(_t, self.integral, self.V, self.y, self.z, self.input,
+                    self.a, self.b, self.c, self.d, self.r, self.s, self.V_rest)
+
+
+def _update(_t, integral, V, y, z, Iext, a, b, c, d, r, s, V_rest):
+    for i in prange(V.shape[0]):
+        V[i], y[i], z[i] = integral(V[i], y[i], z[i], _t, a, b, Iext[i], c, d, r, s, V_rest)
+        Iext[i] = 0.
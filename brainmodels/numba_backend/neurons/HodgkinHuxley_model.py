@@ -1,7 +1,12 @@
 # -*- coding: utf-8 -*-
 
 import brainpy as bp
-from numba import prange
+import numpy as np
+from numba import njit, prange
+
+from ...utils.dtype import get_dtype
+from ...utils.jit import jit_kernel
+from ...utils.rate_table import RateTable
 
 __all__ = [
     'HH'
@@ -55,6 +60,17 @@ class HH(bp.NeuGroup):
     noise         0.             \        the noise fluctuation.
 
     mode          'vector'       \        Data structure of ST members.
+
+    rate_table    False          \        Whether to look up the gating rates in a
+                                          precomputed voltage table.
+
+    V_range       (-100., 100.)  mV       Voltage range of the rate table.
+
+    dV            0.01           mV       Voltage resolution of the rate table.
+
+    fastmath      None           \        Compile the update with the fast floating point math. None for the backend default.
+
+    parallel      None           \        Run the update loop in parallel. None for the backend default.
     ============= ============== ======== ====================================
 
     **Neuron Variables**
@@ -108,8 +124,28 @@ class HH(bp.NeuGroup):
 
         return dVdt, dmdt, dhdt, dndt
 
+    @staticmethod
+    def gates(V, dt):
+        """The steady state ``x_inf`` and the exponential Euler decay factor
+        ``exp(-dt * (alpha_x + beta_x))`` of the gates ``x`` in ``m, h, n``,
+        evaluated on the NumPy array ``V`` to build the rate table."""
+        alpha = 0.1 * (V + 40) / -np.expm1(-(V + 40) / 10)
+        beta = 4.0 * np.exp(-(V + 65) / 18)
+        m_inf, m_decay = alpha / (alpha + beta), np.exp(-dt * (alpha + beta))
+
+        alpha = 0.07 * np.exp(-(V + 65) / 20.)
+        beta = 1 / (1 + np.exp(-(V + 35) / 10))
+        h_inf, h_decay = alpha / (alpha + beta), np.exp(-dt * (alpha + beta))
+
+        alpha = 0.01 * (V + 55) / -np.expm1(-(V + 55) / 10)
+        beta = 0.125 * np.exp(-(V + 65) / 80)
+        n_inf, n_decay = alpha / (alpha + beta), np.exp(-dt * (alpha + beta))
+
+        return m_inf, m_decay, h_inf, h_decay, n_inf, n_decay
+
     def __init__(self, size, ENa=50., gNa=120., EK=-77., gK=36.,
-                 EL=-54.387, gL=0.03, V_th=20., C=1.0, **kwargs):
+                 EL=-54.387, gL=0.03, V_th=20., C=1.0, rate_table=False,
+                 V_range=(-100., 100.), dV=0.01, fastmath=None, parallel=None, **kwargs):
         # parameters
         self.ENa = ENa
         self.EK = EK
@@ -122,25 +158,56 @@ class HH(bp.NeuGroup):
 
         # variables
         num = bp.size2len(size)
-        self.V = -65. * bp.ops.ones(num)
-        self.m = 0.5 * bp.ops.ones(num)
-        self.h = 0.6 * bp.ops.ones(num)
-        self.n = 0.32 * bp.ops.ones(num)
+        self.V = -65. * bp.ops.ones(num, dtype=get_dtype())
+        self.m = 0.5 * bp.ops.ones(num, dtype=get_dtype())
+        self.h = 0.6 * bp.ops.ones(num, dtype=get_dtype())
+        self.n = 0.32 * bp.ops.ones(num, dtype=get_dtype())
         self.spike = bp.ops.zeros(num, dtype=bool)
-        self.input = bp.ops.zeros(num)
+        self.input = bp.ops.zeros(num, dtype=get_dtype())
 
         # numerical solver
-        self.integral = bp.odeint(f=self.derivative, method='exponential_euler')
+        if rate_table:
+            dt = bp.backend.get_dt()
+            self.rate_table = RateTable(lambda V: self.gates(V, dt), V_range, dV)
+            table = self.rate_table.data
+            V_min = self.rate_table.V_min
+            pos_max = self.rate_table.pos_max
+
+            def integral(V, m, h, n, t, C, gNa, ENa, gK, EK, gL, EL, Iext):
+                pos = min(max((V - V_min) / dV, 0.), pos_max)
+                j = int(pos)
+                a, b = 1. - (pos - j), pos - j
+                m_inf = a * table[j, 0] + b * table[j + 1, 0]
+                m_decay = a * table[j, 1] + b * table[j + 1, 1]
+                h_inf = a * table[j, 2] + b * table[j + 1, 2]
+                h_decay = a * table[j, 3] + b * table[j + 1, 3]
+                n_inf = a * table[j, 4] + b * table[j + 1, 4]
+                n_decay = a * table[j, 5] + b * table[j + 1, 5]
+
+                g_Na = gNa * m ** 3.0 * h
+                g_K = gK * n ** 4.0
+                g = g_Na + g_K + gL
+                V_inf = (g_Na * ENa + g_K * EK + gL * EL + Iext) / g
+                V = V_inf + (V - V_inf) * np.exp(-dt * g / C)
+                m = m_inf + (m - m_inf) * m_decay
+                h = h_inf + (h - h_inf) * h_decay
+                n = n_inf + (n - n_inf) * n_decay
+                return V, m, h, n
+
+            self.integral = njit(integral)
+        else:
+            self.integral = bp.odeint(f=self.derivative, method='exponential_euler')
+        self.kernel = jit_kernel(_update, fastmath=fastmath, parallel=parallel)
         super(HH, self).__init__(size=size, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.num):
-            V, m, h, n = self.integral(self.V[i], self.m[i], self.h[i], self.n[i],
-                                       _t, self.C, self.gNa, self.ENa, self.gK,
-                                       self.EK, self.gL, self.EL, self.input[i])
-            self.spike[i] = (self.V[i] < self.V_th) * (V >= self.V_th)
-            self.V[i] = V
-            self.m[i] = m
-            self.h[i] = h
-            self.n[i] = n
-            self.input[i] = 0.
+        self.kernel(_t, self.integral, self.V, self.m, self.h, self.n, self.spike, self.input,
+                    self.C, self.gNa, self.ENa, self.gK, self.EK, self.gL, self.EL, self.V_th)
+
+
+def _update(_t, integral, V, m, h, n, spike, Iext, C, gNa, ENa, gK, EK, gL, EL, V_th):
+    for i in prange(V.shape[0]):
+        V_new, m[i], h[i], n[i] = integral(V[i], m[i], h[i], n[i], _t, C, gNa, ENa, gK, EK, gL, EL, Iext[i])
+        spike[i] = (V[i] < V_th) & (V_new >= V_th)
+        V[i] = V_new
+        Iext[i] = 0.
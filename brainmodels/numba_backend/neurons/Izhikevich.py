@@ -3,6 +3,9 @@
 import brainpy as bp
 from numba import prange
 
+from ...utils.dtype import get_dtype
+from ...utils.jit import jit_kernel
+
 __all__ = [
     'Izhikevich'
 ]
@@ -47,6 +50,10 @@ class Izhikevich(bp.NeuGroup):
     t_refractory  0.             ms       Refractory period length. [ms]
 
     V_th          30.            mV       The membrane potential threshold.
+
+    fastmath      None           \        Compile the update with the fast floating point math. None for the backend default.
+
+    parallel      None           \        Run the update loop in parallel. None for the backend default.
     ============= ============== ======== ================================================================================
 
     **Neuron Variables**
@@ -66,7 +73,7 @@ class Izhikevich(bp.NeuGroup):
 
                                                    Can be seen as bool.
 
-    t_last_spike       float            -1e7       Last spike time stamp.
+    ref_count          int              0          Remaining time steps of the refractory period.
     ================== ======== ================== ===========================================
 
     References:
@@ -85,45 +92,32 @@ class Izhikevich(bp.NeuGroup):
         return dVdt, dudt
 
     def __init__(self, size, a=0.02, b=0.20, c=-65., d=8.,
-                 t_refractory=0., V_th=30., **kwargs):
+                 t_refractory=0., V_th=30., fastmath=None, parallel=None, **kwargs):
         # params
         self.a = a
         self.b = b
         self.c = c
         self.d = d
         self.t_refractory = t_refractory
+        self.ref_steps = int(t_refractory / bp.backend.get_dt() + 1e-9)
         self.V_th = V_th
 
         # vars
         num = bp.size2len(size)
-        self.V = bp.ops.ones(num) * -65.
-        self.u = bp.ops.ones(num) * 1.
-        self.input = bp.ops.zeros(num)
+        self.V = bp.ops.ones(num, dtype=get_dtype()) * -65.
+        self.u = bp.ops.ones(num, dtype=get_dtype()) * 1.
+        self.input = bp.ops.zeros(num, dtype=get_dtype())
         self.spike = bp.ops.zeros(num, dtype=bool)
         self.refractory = bp.ops.zeros(num, dtype=bool)
-        self.t_last_spike = bp.ops.ones(num) * -1e7
+        self.ref_count = bp.ops.zeros(num, dtype=bp.ops.int32)
 
         self.integral = bp.odeint(self.derivative)
+        self.kernel = jit_kernel(_update, fastmath=fastmath, parallel=parallel)
         super(Izhikevich, self).__init__(size=size, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.size[0]):
-            spike = 0.
-            refractory = (_t - self.t_last_spike[i] <= self.t_refractory)
-            if not refractory:
-                V, u = self.integral(
-                    self.V[i], self.u[i], _t,
-                    self.input[i], self.a, self.b)
-                spike = (V >= self.V_th)
-                if spike:
-                    V = self.c
-                    u += self.d
-                    self.t_last_spike[i] = _t
-                self.V[i] = V
-                self.u[i] = u
-            self.spike[i] = spike
-            self.refractory[i] = refractory | spike
-            self.input[i] = 0.
+        self.kernel(_t, self.integral, self.V, self.u, self.ref_count, self.refractory, self.spike, self.input,
+                    self.a, self.b, self.c, self.d, self.V_th, self.ref_steps)
 
 
 '''
@@ -146,3 +140,21 @@ class Izhikevich(bp.NeuGroup):
             ST['spike'] = is_spike
             ST['input'] = 0.  # reset input here or it will be brought to next step
 '''
+
+
+def _update(_t, integral, V, u, ref_count, refractory, spike, Iext, a, b, c, d, V_th, ref_steps):
+    for i in prange(V.shape[0]):
+        count = ref_count[i]
+        spiking = False
+        if count > 0:
+            ref_count[i] = count - 1
+        else:
+            V_new, u_new = integral(V[i], u[i], _t, Iext[i], a, b)
+            spiking = V_new >= V_th
+            V[i] = c if spiking else V_new
+            u[i] = u_new + d if spiking else u_new
+            if spiking:
+                ref_count[i] = ref_steps
+        spike[i] = spiking
+        refractory[i] = (count > 0) | spiking
+        Iext[i] = 0.
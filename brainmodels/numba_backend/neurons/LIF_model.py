@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
 
 import brainpy as bp
-from numba import prange
+from numba import njit, prange
+
+from ...utils.dtype import get_dtype
+from ...utils.jit import jit_kernel
+from ...utils.propagators import exp_decay
 
 __all__ = [
     'LIF'
@@ -32,6 +36,12 @@ class LIF(bp.NeuGroup):
     tau           10.            \        Membrane time constant. Compute by R * C.
 
     t_refractory  5.             ms       Refractory period length.(ms)
+
+    method        None           \        Integration method, or 'exact' for the exact propagator.
+
+    fastmath      None           \        Compile the update with the fast floating point math. None for the backend default.
+
+    parallel      None           \        Run the update loop in parallel. None for the backend default.
     ============= ============== ======== =========================================
 
     **Neuron Variables**
@@ -53,7 +63,7 @@ class LIF(bp.NeuGroup):
 
                                          Can be seen as bool.
 
-    t_last_spike       -1e7              Last spike time stamp.
+    ref_count          0                 Remaining time steps of the refractory period.
     ================== ================= =========================================================
 
     References:
@@ -70,7 +80,7 @@ class LIF(bp.NeuGroup):
         return dvdt
 
     def __init__(self, size, t_refractory=1., V_rest=0.,
-                 V_reset=-5., V_th=20., R=1., tau=10., **kwargs):
+                 V_reset=-5., V_th=20., R=1., tau=10., method=None, fastmath=None, parallel=None, **kwargs):
         # parameters
         self.V_rest = V_rest
         self.V_reset = V_reset
@@ -78,29 +88,42 @@ class LIF(bp.NeuGroup):
         self.R = R
         self.tau = tau
         self.t_refractory = t_refractory
+        self.ref_steps = int(t_refractory / bp.backend.get_dt() + 1e-9)
 
         # variables
         num = bp.size2len(size)
-        self.t_last_spike = bp.ops.ones(num) * -1e7
-        self.input = bp.ops.zeros(num)
+        self.ref_count = bp.ops.zeros(num, dtype=bp.ops.int32)
+        self.input = bp.ops.zeros(num, dtype=get_dtype())
         self.refractory = bp.ops.zeros(num, dtype=bool)
         self.spike = bp.ops.zeros(num, dtype=bool)
-        self.V = bp.ops.ones(num) * V_rest
+        self.V = bp.ops.ones(num, dtype=get_dtype()) * V_rest
+
+        if method == 'exact':
+            P = exp_decay(tau)
+
+            def integral(V, t, Iext, V_rest, R, tau):
+                return V * P + (V_rest + R * Iext) * (1. - P)
 
-        self.integral = bp.odeint(self.derivative)
+            self.integral = njit(integral)
+        else:
+            self.integral = bp.odeint(self.derivative, method=method)
+        self.kernel = jit_kernel(_update, fastmath=fastmath, parallel=parallel)
         super(LIF, self).__init__(size=size, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.size[0]):
-            spike = 0.
-            refractory = (_t - self.t_last_spike[i] <= self.t_refractory)
-            if not refractory:
-                V = self.integral(self.V[i], _t, self.input[i], self.V_rest, self.R, self.tau)
-                spike = (V >= self.V_th)
-                if spike:
-                    V = self.V_reset
-                    self.t_last_spike[i] = _t
-                self.V[i] = V
-            self.spike[i] = spike
-            self.refractory[i] = refractory or spike
-            self.input[i] = 0.
+        self.kernel(_t, self.integral, self.V, self.ref_count, self.refractory, self.spike, self.input,
+                    self.V_rest, self.V_reset, self.V_th, self.R, self.tau, self.ref_steps)
+
+
+def _update(_t, integral, V, ref_count, refractory, spike, Iext, V_rest, V_reset, V_th, R, tau, ref_steps):
+    for i in prange(V.shape[0]):
+        count = ref_count[i]
+        V_new = integral(V[i], _t, Iext[i], V_rest, R, tau)
+        V_new = V[i] if count > 0 else V_new
+        spiking = V_new >= V_th
+        V[i] = V_reset if spiking else V_new
+        ref_count[i] = ref_steps if spiking else max(count - 1, 0)
+        refractory[i] = (count > 0) | spiking
+    for i in prange(V.shape[0]):
+        spike[i] = refractory[i] & (ref_count[i] == ref_steps)
+    Iext[:] = 0.
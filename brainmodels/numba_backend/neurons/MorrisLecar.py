@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
 
 import brainpy as bp
-from numba import prange
+from numba import njit, prange
+
+from ...utils.dtype import get_dtype
+from ...utils.jit import jit_kernel
+from ...utils.rate_table import RateTable
 import numpy as np
 
 __all__ = [
@@ -38,6 +42,13 @@ class MorrisLecar(bp.NeuGroup):
     V4            30.            \        Reciprocal of slope of voltage dependence of W_inf.(mV)
     phi           0.04           \        A temperature factor.(1/s)
     mode          'vector'       \        Data structure of ST members.
+    rate_table    False          \        Whether to look up M_inf, W_inf and tau_W in a voltage table.
+    V_range       (-100., 150.)  mV       Voltage range of the rate table.
+    dV            0.01           mV       Voltage resolution of the rate table.
+
+    fastmath      None           \        Compile the update with the fast floating point math. None for the backend default.
+
+    parallel      None           \        Run the update loop in parallel. None for the backend default.
     ============= ============== ======== =======================================================
 
     **Neuron Variables**
@@ -78,9 +89,19 @@ class MorrisLecar(bp.NeuGroup):
         dWdt = (W_inf - W) / tau_W
         return dVdt, dWdt
 
+    @staticmethod
+    def gates(V, V1, V2, V3, V4, phi):
+        """``M_inf``, ``W_inf`` and ``1 / tau_W`` evaluated on the NumPy
+        array ``V`` to build the rate table."""
+        M_inf = (1 / 2) * (1 + np.tanh((V - V1) / V2))
+        W_inf = (1 / 2) * (1 + np.tanh((V - V3) / V4))
+        W_rate = phi * np.cosh((V - V3) / (2 * V4))
+        return M_inf, W_inf, W_rate
+
     def __init__(self, size, V_Ca=130., g_Ca=4.4, V_K=-84., g_K=8.,
                  V_leak=-60., g_leak=2., C=20., V1=-1.2, V2=18.,
-                 V3=2., V4=30., phi=0.04, **kwargs):
+                 V3=2., V4=30., phi=0.04, rate_table=False,
+                 V_range=(-100., 150.), dV=0.01, fastmath=None, parallel=None, **kwargs):
         # params
         self.V_Ca = V_Ca
         self.g_Ca = g_Ca
@@ -97,19 +118,46 @@ class MorrisLecar(bp.NeuGroup):
 
         # vars
         num = bp.size2len(size)
-        self.input = bp.ops.zeros(num)
-        self.V = bp.ops.ones(num) * -20.
-        self.W = bp.ops.ones(num) * 0.02
-
-        self.integral = bp.odeint(f=self.derivative)
+        self.input = bp.ops.zeros(num, dtype=get_dtype())
+        self.V = bp.ops.ones(num, dtype=get_dtype()) * -20.
+        self.W = bp.ops.ones(num, dtype=get_dtype()) * 0.02
+
+        if rate_table:
+            self.rate_table = RateTable(lambda V: self.gates(V, V1, V2, V3, V4, phi), V_range, dV)
+            table = self.rate_table.data
+            V_min = self.rate_table.V_min
+            pos_max = self.rate_table.pos_max
+            dt = bp.backend.get_dt()
+
+            def integral(V, W, t, V1, V2, g_Ca, V_Ca, g_K, V_K,
+                         g_leak, V_leak, C, I_ext, phi, V3, V4):
+                pos = min(max((V - V_min) / dV, 0.), pos_max)
+                j = int(pos)
+                a, b = 1. - (pos - j), pos - j
+                M_inf = a * table[j, 0] + b * table[j + 1, 0]
+                W_inf = a * table[j, 1] + b * table[j + 1, 1]
+                W_rate = a * table[j, 2] + b * table[j + 1, 2]
+                I_Ca = g_Ca * M_inf * (V - V_Ca)
+                I_K = g_K * W * (V - V_K)
+                I_Leak = g_leak * (V - V_leak)
+                dVdt = (- I_Ca - I_K - I_Leak + I_ext) / C
+                dWdt = (W_inf - W) * W_rate
+                return V + dVdt * dt, W + dWdt * dt
+
+            self.integral = njit(integral)
+        else:
+            self.integral = bp.odeint(f=self.derivative)
+        self.kernel = jit_kernel(_update, fastmath=fastmath, parallel=parallel)
         super(MorrisLecar, self).__init__(size=size, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.size[0]):
-            self.V[i], self.W[i] = self.integral(
-                self.V[i], self.W[i], _t, self.V1, self.V2,
-                self.g_Ca, self.V_Ca, self.g_K, self.V_K,
-                self.g_leak, self.V_leak, self.C, self.input[i],
-                self.phi, self.V3, self.V4
-            )
-            self.input[i] = 0.
+        self.kernel(_t, self.integral, self.V, self.W, self.input, self.V1, self.V2,
+                    self.g_Ca, self.V_Ca, self.g_K, self.V_K, self.g_leak, self.V_leak, self.C,
+                    self.phi, self.V3, self.V4)
+
+
+def _update(_t, integral, V, W, Iext, V1, V2, g_Ca, V_Ca, g_K, V_K, g_leak, V_leak, C, phi, V3, V4):
+    for i in prange(V.shape[0]):
+        V[i], W[i] = integral(V[i], W[i], _t, V1, V2, g_Ca, V_Ca, g_K, V_K,
+                              g_leak, V_leak, C, Iext[i], phi, V3, V4)
+        Iext[i] = 0.
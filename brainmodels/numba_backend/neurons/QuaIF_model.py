@@ -3,6 +3,9 @@
 import brainpy as bp
 from numba import prange
 
+from ...utils.dtype import get_dtype
+from ...utils.jit import jit_kernel
+
 __all__ = [
     'QuaIF'
 ]
@@ -43,6 +46,10 @@ class QuaIF(bp.NeuGroup):
     noise         0.             \        the noise fluctuation.
 
     mode          'scalar'       \        Data structure of ST members.
+
+    fastmath      None           \        Compile the update with the fast floating point math. None for the backend default.
+
+    parallel      None           \        Run the update loop in parallel. None for the backend default.
     ============= ============== ======== ========================================================================================================================    
     
     Returns:
@@ -67,7 +74,7 @@ class QuaIF(bp.NeuGroup):
      
                                       Can be seen as bool.
                              
-    t_last_spike    -1e7              Last spike time stamp.
+    ref_count       0                 Remaining time steps of the refractory period.
     =============== ================= =========================================================
     
     References:
@@ -88,7 +95,7 @@ class QuaIF(bp.NeuGroup):
 
     def __init__(self, size, V_rest=-65., V_reset=-68.,
                  V_th=-30., V_c=-50.0, a_0=.07,
-                 R=1., tau=10., t_refractory=0., **kwargs):
+                 R=1., tau=10., t_refractory=0., fastmath=None, parallel=None, **kwargs):
 
         # parameters
         self.V_rest = V_rest
@@ -99,32 +106,36 @@ class QuaIF(bp.NeuGroup):
         self.R = R
         self.tau = tau
         self.t_refractory = t_refractory
+        self.ref_steps = int(t_refractory / bp.backend.get_dt() + 1e-9)
 
         # variables
         num = bp.size2len(size)
-        self.V = bp.ops.ones(num) * V_reset
-        self.input = bp.ops.zeros(num)
+        self.V = bp.ops.ones(num, dtype=get_dtype()) * V_reset
+        self.input = bp.ops.zeros(num, dtype=get_dtype())
         self.spike = bp.ops.zeros(num, dtype=bool)
         self.refractory = bp.ops.zeros(num, dtype=bool)
-        self.t_last_spike = bp.ops.ones(num) * -1e7
+        self.ref_count = bp.ops.zeros(num, dtype=bp.ops.int32)
 
         self.integral = bp.odeint(f=self.derivative, method='euler')
 
+        self.kernel = jit_kernel(_update, fastmath=fastmath, parallel=parallel)
         super(QuaIF, self).__init__(size=size, **kwargs)
 
+
     def update(self, _t):
-        for i in prange(self.size[0]):
-            spike = 0.
-            refractory = (_t - self.t_last_spike[i] <= self.t_refractory)
-            if not refractory:
-                V = self.integral(self.V[i], _t, self.input[i],
-                                  self.V_rest, self.V_c, self.R,
-                                  self.tau, self.a_0)
-                spike = (V >= self.V_th)
-                if spike:
-                    V = self.V_rest
-                    self.t_last_spike[i] = _t
-                self.V[i] = V
-            self.spike[i] = spike
-            self.refractory[i] = refractory or spike
-            self.input[i] = 0.  # reset input here or it will be brought to next step
+        self.kernel(_t, self.integral, self.V, self.ref_count, self.refractory, self.spike, self.input,
+                    self.V_rest, self.V_c, self.V_th, self.R, self.tau, self.a_0, self.ref_steps)
+
+
+def _update(_t, integral, V, ref_count, refractory, spike, Iext, V_rest, V_c, V_th, R, tau, a_0, ref_steps):
+    for i in prange(V.shape[0]):
+        count = ref_count[i]
+        V_new = integral(V[i], _t, Iext[i], V_rest, V_c, R, tau, a_0)
+        V_new = V[i] if count > 0 else V_new
+        spiking = V_new >= V_th
+        V[i] = V_rest if spiking else V_new
+        ref_count[i] = ref_steps if spiking else max(count - 1, 0)
+        refractory[i] = (count > 0) | spiking
+    for i in prange(V.shape[0]):
+        spike[i] = refractory[i] & (ref_count[i] == ref_steps)
+    Iext[:] = 0.
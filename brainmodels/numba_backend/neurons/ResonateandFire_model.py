@@ -3,6 +3,9 @@
 import brainpy as bp
 from numba import prange
 
+from ...utils.dtype import get_dtype
+from ...utils.jit import jit_kernel
+
 class ResonateandFire(bp.NeuGroup):
     """Resonate-and-fire neuron model.
 
@@ -49,6 +52,10 @@ class ResonateandFire(bp.NeuGroup):
     V_reset       1.             \        Reset value for voltage-like variable after spike.
 
     x_reset       0.             \        Reset value for current-like variable after spike.
+
+    fastmath      None           \        Compile the update with the fast floating point math. None for the backend default.
+
+    parallel      None           \        Run the update loop in parallel. None for the backend default.
     ============= ============== ======== =========================================================
 
     **Neuron Variables**    
@@ -87,7 +94,7 @@ class ResonateandFire(bp.NeuGroup):
 
     def __init__(self, size, b=-1., omega=10., 
                  V_th=1., V_reset=1., x_reset=0.,
-                 **kwargs):
+                 fastmath=None, parallel=None, **kwargs):
         #parameters
         self.b = b
         self.omega = omega
@@ -96,22 +103,25 @@ class ResonateandFire(bp.NeuGroup):
         self.x_reset = x_reset
 
         #variables
-        self.V = bp.ops.zeros(size)
-        self.x = bp.ops.zeros(size)
-        self.input = bp.ops.zeros(size)
+        self.V = bp.ops.zeros(size, dtype=get_dtype())
+        self.x = bp.ops.zeros(size, dtype=get_dtype())
+        self.input = bp.ops.zeros(size, dtype=get_dtype())
         self.spike = bp.ops.zeros(size, dtype = bool)
 
         self.integral = bp.odeint(self.derivative)
+        self.kernel = jit_kernel(_update, fastmath=fastmath, parallel=parallel)
         super(ResonateandFire, self).__init__(size = size, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.size[0]):
-            x = self.x[i] + self.input[i]
-            V, x = self.integral(self.V[i], x, _t, self.b, self.omega)
-            self.spike[i]= (V > self.V_th)
-            if self.spike[i]:
-                V = self.V_reset
-                x = self.x_reset
-            self.V[i] = V
-            self.x[i] = x
-        self.input[:] = 0
+        self.kernel(_t, self.integral, self.V, self.x, self.spike, self.input,
+                    self.b, self.omega, self.V_th, self.V_reset, self.x_reset)
+
+
+def _update(_t, integral, V, x, spike, Iext, b, omega, V_th, V_reset, x_reset):
+    for i in prange(V.shape[0]):
+        V_new, x_new = integral(V[i], x[i] + Iext[i], _t, b, omega)
+        spiking = V_new > V_th
+        V[i] = V_reset if spiking else V_new
+        x[i] = x_reset if spiking else x_new
+        spike[i] = spiking
+    Iext[:] = 0.
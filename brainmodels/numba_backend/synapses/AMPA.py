@@ -3,6 +3,11 @@
 import brainpy as bp
 from numba import prange
 
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.spike_queue import check_scalar_delay
+from ...utils.storage import csc_index, sort_synapses
+
 __all__ = [
     'AMPA1',
     'AMPA2',
@@ -31,6 +36,10 @@ class AMPA1(bp.TwoEndConn):
     E             0.             mV       The reversal potential for the synaptic current. (only for conductance-based model)
 
     mode          'scalar'       \        Data structure of ST members.
+
+    lumped        False          \        Integrate one state per post-synaptic neuron.
+
+    order         None           \        Synapse order, None, 'post' or 'pre'.
     ============= ============== ======== ===================================================================================
 
     Returns:
@@ -64,33 +73,51 @@ class AMPA1(bp.TwoEndConn):
         ds = - s / tau
         return ds
 
-    def __init__(self, pre, post, conn, delay=0., g_max=0.10, E=0., tau=2.0, **kwargs):
+    def __init__(self, pre, post, conn, delay=0., g_max=0.10, E=0., tau=2.0, lumped=False, order=None, **kwargs):
         # parameters
         self.g_max = g_max
         self.E = E
         self.tau = tau
-        self.delay = delay
+        self.delay = check_scalar_delay(delay, 'AMPA1')
+        self.lumped = lumped
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.pre_ids, self.post_ids = conn.requires('pre_ids', 'post_ids')
+        self.conn = build_conn(conn, pre.size, post.size)
+        pre_ids, post_ids = self.conn.requires('pre_ids', 'post_ids')
+        self.pre_ids, self.post_ids, self.perm = sort_synapses(pre_ids, post_ids, order)
         self.size = len(self.pre_ids)
+        self.num_post = self.conn.num_post
+        self.post2syn, self.post_indptr = csc_index(self.post_ids, self.num_post)
 
         # data
-        self.s = bp.ops.zeros(self.size)
-        self.g = self.register_constant_delay('g', size=self.size, delay_time=delay)
+        self.s = bp.ops.zeros(post.size if lumped else self.size, dtype=get_dtype())
+        self.g = self.register_constant_delay('g', size=post.size, delay_time=delay)
 
         self.int_s = bp.odeint(f=self.derivative, method='exponential_euler')
+        if lumped:
+            kwargs.setdefault('steps', self.update_lumped)
         super(AMPA1, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.size):
-            pre_id = self.pre_ids[i]
-            self.s[i] = self.int_s(self.s[i], _t, self.tau)
-            self.s[i] += self.pre.spike[pre_id]
-            self.g.push(i, self.g_max * self.s[i])
-            post_id = self.post_ids[i]
-            self.post.input[post_id] -= self.g.pull(i) * (self.post.V[post_id] - self.E)
+        for post_id in prange(self.num_post):
+            g = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                pre_id = self.pre_ids[i]
+                self.s[i] = self.int_s(self.s[i], _t, self.tau)
+                self.s[i] += self.pre.spike[pre_id]
+                g += self.g_max * self.s[i]
+            self.g.push(post_id, g)
+            self.post.input[post_id] -= self.g.pull(post_id) * (self.post.V[post_id] - self.E)
+
+    def update_lumped(self, _t):
+        for post_id in prange(self.num_post):
+            s = self.int_s(self.s[post_id], _t, self.tau)
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                s += self.pre.spike[self.pre_ids[self.post2syn[j]]]
+            self.s[post_id] = s
+            self.g.push(post_id, self.g_max * s)
+            self.post.input[post_id] -= self.g.pull(post_id) * (self.post.V[post_id] - self.E)
 
 
 class AMPA2(bp.TwoEndConn):
@@ -120,6 +147,8 @@ class AMPA2(bp.TwoEndConn):
     T_duration    .5             ms       Duration of the neurotransmitter concentration.
 
     mode          'scalar'       \        Data structure of ST members.
+
+    order         None           \        Synapse order, None, 'post' or 'pre'.
     ============= ============== ======== ================================================    
     
     Returns:
@@ -156,9 +185,9 @@ class AMPA2(bp.TwoEndConn):
         return ds
 
     def __init__(self, pre, post, conn, delay=0., g_max=0.42, E=0.,
-                 alpha=0.98, beta=0.18, T=0.5, T_duration=0.5, **kwargs):
+                 alpha=0.98, beta=0.18, T=0.5, T_duration=0.5, order=None, **kwargs):
         # parameters
-        self.delay = delay
+        self.delay = check_scalar_delay(delay, 'AMPA2')
         self.g_max = g_max
         self.E = E
         self.alpha = alpha
@@ -167,26 +196,31 @@ class AMPA2(bp.TwoEndConn):
         self.T_duration = T_duration
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.pre_ids, self.post_ids = conn.requires('pre_ids', 'post_ids')
+        self.conn = build_conn(conn, pre.size, post.size)
+        pre_ids, post_ids = self.conn.requires('pre_ids', 'post_ids')
+        self.pre_ids, self.post_ids, self.perm = sort_synapses(pre_ids, post_ids, order)
         self.size = len(self.pre_ids)
+        self.num_post = self.conn.num_post
+        self.post2syn, self.post_indptr = csc_index(self.post_ids, self.num_post)
 
         # variables
-        self.s = bp.ops.zeros(self.size)
-        self.g = self.register_constant_delay('g', size=self.size, delay_time=delay)
+        self.s = bp.ops.zeros(self.size, dtype=get_dtype())
+        self.g = self.register_constant_delay('g', size=post.size, delay_time=delay)
         self.t_last_pre_spike = -1e7 * bp.ops.ones(self.size)
 
         self.int_s = bp.odeint(f=self.derivative, method='exponential_euler')
         super(AMPA2, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.size):
-            pre_id = self.pre_ids[i]
-            post_id = self.post_ids[i]
-
-            if self.pre.spike[pre_id]:
-                self.t_last_pre_spike[pre_id] = _t
-            TT = ((_t - self.t_last_pre_spike[pre_id]) < self.T_duration) * self.T
-            self.s[i] = self.int_s(self.s[i], _t, TT, self.alpha, self.beta)
-            self.g.push(i, self.g_max * self.s[i])
-            self.post.input[post_id] -= self.g.pull(i) * (self.post.V[post_id] - self.E)
+        for post_id in prange(self.num_post):
+            g = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                pre_id = self.pre_ids[i]
+                if self.pre.spike[pre_id]:
+                    self.t_last_pre_spike[i] = _t
+                TT = ((_t - self.t_last_pre_spike[i]) < self.T_duration) * self.T
+                self.s[i] = self.int_s(self.s[i], _t, TT, self.alpha, self.beta)
+                g += self.g_max * self.s[i]
+            self.g.push(post_id, g)
+            self.post.input[post_id] -= self.g.pull(post_id) * (self.post.V[post_id] - self.E)
@@ -2,6 +2,10 @@
 import brainpy as bp
 from numba import prange
 
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.storage import csc_index, sort_synapses
+
 __all__ = [
     'BCM'
 ]
@@ -35,6 +39,8 @@ class BCM(bp.TwoEndConn):
     w_max         2.             \        Maximal possible synapse weight.
 
     w_min         0.             \        Minimal possible synapse weight.
+
+    order         None           \        Synapse order, None, 'post' or 'pre'.
     ============= ============== ======== ================================
 
     Returns:
@@ -62,7 +68,7 @@ class BCM(bp.TwoEndConn):
         dwdt = lr * r_post * (r_post - r_th) * r_pre
         return dwdt
 
-    def __init__(self, pre, post, conn, lr=0.005, w_max=2., w_min=0., **kwargs):
+    def __init__(self, pre, post, conn, lr=0.005, w_max=2., w_min=0., order=None, **kwargs):
         # parameters
         self.lr = lr
         self.w_max = w_max
@@ -70,13 +76,16 @@ class BCM(bp.TwoEndConn):
         self.dt = bp.backend._dt
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.pre_ids, self.post_ids = self.conn.requires('pre_ids', 'post_ids')
+        self.conn = build_conn(conn, pre.size, post.size)
+        pre_ids, post_ids = self.conn.requires('pre_ids', 'post_ids')
+        self.pre_ids, self.post_ids, self.perm = sort_synapses(pre_ids, post_ids, order)
         self.size = len(self.pre_ids)
+        self.num_post = self.conn.num_post
+        self.post2syn, self.post_indptr = csc_index(self.post_ids, self.num_post)
 
         # variables
-        self.w = bp.ops.ones(self.size)
-        self.sum_post_r = bp.ops.zeros(post.size[0])
+        self.w = bp.ops.ones(self.size, dtype=get_dtype())
+        self.sum_post_r = bp.ops.zeros(post.size[0], dtype=get_dtype())
 
         self.int_w = bp.odeint(f=self.derivative, method='rk4')
 
@@ -90,17 +99,20 @@ class BCM(bp.TwoEndConn):
         # update w and post_r
         post_r = bp.ops.zeros(self.post.size[0])
 
-        for i in prange(self.size):
-            pre_id = self.pre_ids[i]
-            post_id = self.post_ids[i]
+        for post_id in prange(self.num_post):
+            r = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                pre_id = self.pre_ids[i]
 
-            post_r[post_id] += self.w[i] * self.pre.r[pre_id]
+                r += self.w[i] * self.pre.r[pre_id]
 
-            self.w[i] = self.int_w(self.w[i], _t, self.lr, self.pre.r[pre_id], self.post.r[post_id], r_th[post_id])
+                self.w[i] = self.int_w(self.w[i], _t, self.lr, self.pre.r[pre_id], self.post.r[post_id], r_th[post_id])
 
-            if self.w[i] > self.w_max:
-                self.w[i] = self.w_max
-            if self.w[i] < self.w_min:
-                self.w[i] = self.w_min
+                if self.w[i] > self.w_max:
+                    self.w[i] = self.w_max
+                if self.w[i] < self.w_min:
+                    self.w[i] = self.w_min
+            post_r[post_id] = r
 
         self.post.r = post_r
@@ -2,6 +2,11 @@
 import brainpy as bp
 from numba import prange
 
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.spike_queue import check_scalar_delay
+from ...utils.storage import csc_index, sort_synapses
+
 __all__ = [
     'GABAa1',
     'GABAa2',
@@ -28,6 +33,10 @@ class GABAa1(bp.TwoEndConn):
     E             -80.           \        Reversal potential of synapse.
 
     tau_decay     6.             ms       Time constant of gating variable decay.
+
+    lumped        False          \        Integrate one state per post-synaptic neuron.
+
+    order         None           \        Synapse order, None, 'post' or 'pre'.
     ============= ============== ======== =======================================
 
     **Synapse Variables**    
@@ -55,41 +64,58 @@ class GABAa1(bp.TwoEndConn):
         return dsdt
 
     def __init__(self, pre, post, conn, delay=0., 
-                 g_max=0.4, E=-80., tau_decay=6., 
-                 **kwargs):
+                 g_max=0.4, E=-80., tau_decay=6., lumped=False, 
+                 order=None, **kwargs):
         # parameters
         self.g_max = g_max
         self.E = E
         self.tau_decay = tau_decay
-        self.delay = delay
+        self.delay = check_scalar_delay(delay, 'GABAa1')
+        self.lumped = lumped
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.pre_ids, self.post_ids = conn.requires('pre_ids', 'post_ids')
+        self.conn = build_conn(conn, pre.size, post.size)
+        pre_ids, post_ids = self.conn.requires('pre_ids', 'post_ids')
+        self.pre_ids, self.post_ids, self.perm = sort_synapses(pre_ids, post_ids, order)
         self.size = len(self.pre_ids)
+        self.num_post = self.conn.num_post
+        self.post2syn, self.post_indptr = csc_index(self.post_ids, self.num_post)
 
         # data
-        self.s = bp.ops.zeros(self.size)
+        self.s = bp.ops.zeros(post.size if lumped else self.size, dtype=get_dtype())
         self.g = self.register_constant_delay(
-            'g', size=self.size, delay_time=delay
+            'g', size=post.size, delay_time=delay
         )
 
         self.integral = bp.odeint(
             f=self.derivative, method='exponential_euler'
         )
+        if lumped:
+            kwargs.setdefault('steps', self.update_lumped)
         super(GABAa1, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.size):
-            pre_id = self.pre_ids[i]
-            self.s[i] = self.integral(self.s[i], _t, self.tau_decay)
-            self.s[i] += self.pre.spike[pre_id]
-            self.g.push(i, self.g_max * self.s[i])
-            post_id = self.post_ids[i]
-            self.post.input[post_id] -= self.g.pull(i) \
-                                        * (self.post.V[post_id] - self.E)
-            
-            
+        for post_id in prange(self.num_post):
+            g = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                pre_id = self.pre_ids[i]
+                self.s[i] = self.integral(self.s[i], _t, self.tau_decay)
+                self.s[i] += self.pre.spike[pre_id]
+                g += self.g_max * self.s[i]
+            self.g.push(post_id, g)
+            self.post.input[post_id] -= self.g.pull(post_id) * (self.post.V[post_id] - self.E)
+
+    def update_lumped(self, _t):
+        for post_id in prange(self.num_post):
+            s = self.integral(self.s[post_id], _t, self.tau_decay)
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                s += self.pre.spike[self.pre_ids[self.post2syn[j]]]
+            self.s[post_id] = s
+            self.g.push(post_id, self.g_max * s)
+            self.post.input[post_id] -= self.g.pull(post_id) * (self.post.V[post_id] - self.E)
+
+
 class GABAa2(bp.TwoEndConn):
     """
     GABAa conductance-based synapse model (markov form).
@@ -122,6 +148,8 @@ class GABAa2(bp.TwoEndConn):
     T_duration    1.             \        Transmitter concentration duration time
 
                                           after being triggered.
+
+    order         None           \        Synapse order, None, 'post' or 'pre'.
     ============= ============== ======== =======================================
 
     **Synapse Variables**
@@ -153,7 +181,8 @@ class GABAa2(bp.TwoEndConn):
     def __init__(self, pre, post, conn, delay = 0.,
                  g_max=0.04, E=-80., alpha=0.53, 
                  beta=0.18, T=1., T_duration=1.,
-                 **kwargs):
+                 order=None, **kwargs):
+        check_scalar_delay(delay, 'GABAa2')
         self.g_max = g_max
         self.E = E
         self.alpha = alpha
@@ -161,14 +190,16 @@ class GABAa2(bp.TwoEndConn):
         self.T = T
         self.T_duration = T_duration
 
-        self.conn = conn(pre.size, post.size)
-        self.pre_ids, self.post_ids = self.conn.requires(
-            'pre_ids', 'post_ids')
+        self.conn = build_conn(conn, pre.size, post.size)
+        pre_ids, post_ids = self.conn.requires('pre_ids', 'post_ids')
+        self.pre_ids, self.post_ids, self.perm = sort_synapses(pre_ids, post_ids, order)
         self.size = len(self.pre_ids)
+        self.num_post = self.conn.num_post
+        self.post2syn, self.post_indptr = csc_index(self.post_ids, self.num_post)
 
-        self.s = bp.ops.zeros(self.size)
+        self.s = bp.ops.zeros(self.size, dtype=get_dtype())
         self.g = self.register_constant_delay(
-            'g', size = self.size, delay_time = delay
+            'g', size = post.size, delay_time = delay
         )
         self.t_last_pre_spike = bp.ops.ones(self.size) * -1e7
 
@@ -178,13 +209,15 @@ class GABAa2(bp.TwoEndConn):
         super(GABAa2, self).__init__(pre = pre, post = post, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.size):
-            pre_id = self.pre_ids[i]
-            post_id = self.post_ids[i]
-            if self.pre.spike[pre_id]:
-                self.t_last_pre_spike[i] = _t
-            T = ((_t - self.t_last_pre_spike[i]) < self.T_duration) * self.T
-            self.s[i] = self.integral(self.s[i], _t, T, self.alpha, self.beta)
-            self.g.push(i, self.s[i] * self.g_max)
-            self.post.input[post_id] -= self.g.pull(i) \
-                                        * (self.post.V[post_id] - self.E)
+        for post_id in prange(self.num_post):
+            g = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                pre_id = self.pre_ids[i]
+                if self.pre.spike[pre_id]:
+                    self.t_last_pre_spike[i] = _t
+                T = ((_t - self.t_last_pre_spike[i]) < self.T_duration) * self.T
+                self.s[i] = self.integral(self.s[i], _t, T, self.alpha, self.beta)
+                g += self.s[i] * self.g_max
+            self.g.push(post_id, g)
+            self.post.input[post_id] -= self.g.pull(post_id) * (self.post.V[post_id] - self.E)
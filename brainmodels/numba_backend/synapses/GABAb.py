@@ -3,6 +3,11 @@
 import brainpy as bp
 from numba import prange
 
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.spike_queue import check_scalar_delay
+from ...utils.storage import csc_index, sort_synapses
+
 __all__ = [
     'GABAb1',
     'GABAb2',
@@ -54,6 +59,8 @@ class GABAb1(bp.TwoEndConn):
     T_duration    0.3            \        Transmitter concentration duration time 
 
                                           after being triggered.
+
+    order         None           \        Synapse order, None, 'post' or 'pre'.
     ============= ============== ======== ============================================================================
 
     **Synapse Variables**    
@@ -88,7 +95,8 @@ class GABAb1(bp.TwoEndConn):
     def __init__(self, pre, post, conn, delay = 0., 
                  g_max=0.02, E=-95., 
                  k1=0.18, k2=0.034, k3=0.09, k4=0.0012,
-                 kd=100., T=0.5, T_duration=0.3, **kwargs):
+                 kd=100., T=0.5, T_duration=0.3, order=None, **kwargs):
+        check_scalar_delay(delay, 'GABAb1')
         #params
         self.g_max = g_max
         self.E = E
@@ -101,37 +109,42 @@ class GABAb1(bp.TwoEndConn):
         self.T_duration = T_duration
 
         #conns
-        self.conn = conn(pre.size, post.size)
-        self.pre_ids, self.post_ids = conn.requires('pre_ids', 'post_ids')
+        self.conn = build_conn(conn, pre.size, post.size)
+        pre_ids, post_ids = self.conn.requires('pre_ids', 'post_ids')
+        self.pre_ids, self.post_ids, self.perm = sort_synapses(pre_ids, post_ids, order)
         self.size = len(self.pre_ids)
+        self.num_post = self.conn.num_post
+        self.post2syn, self.post_indptr = csc_index(self.post_ids, self.num_post)
 
         #data
-        self.R = bp.ops.zeros(self.size)
-        self.G = bp.ops.zeros(self.size)
+        self.R = bp.ops.zeros(self.size, dtype=get_dtype())
+        self.G = bp.ops.zeros(self.size, dtype=get_dtype())
         self.t_last_pre_spike = bp.ops.ones(self.size) * -1e7
-        self.s = bp.ops.zeros(self.size)
-        self.g = self.register_constant_delay('g', size=self.size, delay_time=delay)
+        self.s = bp.ops.zeros(self.size, dtype=get_dtype())
+        self.g = self.register_constant_delay('g', size=post.size, delay_time=delay)
 
         self.integral = bp.odeint(f=self.derivative)
         super(GABAb1, self).__init__(pre = pre, post = post, **kwargs)
 
     def update(self, _t):
-        #pdb.set_trace()
-        for i in prange(self.size): #i is the No. of syn
-            pre_id = self.pre_ids[i]  #pre_id is the No. of pre neu
-            if self.pre.spike[pre_id]:
-                self.t_last_pre_spike[i] = _t
-            TT = ((_t - self.t_last_pre_spike[i]) < self.T_duration) * self.T
-            R, G = self.integral(self.R[i], self.G[i], _t,
-                                 self.k3, TT, self.k4, 
-                                 self.k1, self.k2)
-            self.R[i] = R
-            self.G[i] = G
-            self.s[i] = G ** 4 / (G ** 4 + self.kd)
-            self.g.push(i, self.g_max * self.s[i])
-            post_id = self.post_ids[i]
-            self.post.input[post_id] -= self.g.pull(i) * (self.post.V[post_id] - self.E)
-            
+        for post_id in prange(self.num_post):
+            g = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]  # i is the No. of syn
+                pre_id = self.pre_ids[i]  # pre_id is the No. of pre neu
+                if self.pre.spike[pre_id]:
+                    self.t_last_pre_spike[i] = _t
+                TT = ((_t - self.t_last_pre_spike[i]) < self.T_duration) * self.T
+                R, G = self.integral(self.R[i], self.G[i], _t,
+                                     self.k3, TT, self.k4,
+                                     self.k1, self.k2)
+                self.R[i] = R
+                self.G[i] = G
+                self.s[i] = G ** 4 / (G ** 4 + self.kd)
+                g += self.g_max * self.s[i]
+            self.g.push(post_id, g)
+            self.post.input[post_id] -= self.g.pull(post_id) * (self.post.V[post_id] - self.E)
+
 
 class GABAb2(bp.TwoEndConn):
     """
@@ -193,6 +206,8 @@ class GABAb2(bp.TwoEndConn):
     T_duration    0.5            \        Transmitter concentration duration time 
 
                                           after being triggered.
+
+    order         None           \        Synapse order, None, 'post' or 'pre'.
     ============= ============== ======== ============================================================================
 
     **Synapse Variables**    
@@ -233,7 +248,8 @@ class GABAb2(bp.TwoEndConn):
                  g_max=0.02, E=-95., k1=0.66, k2=0.02, 
                  k3=0.0053, k4=0.017, k5=8.3e-5, k6=7.9e-3, 
                  kd=100., T=0.5, T_duration=0.5,
-                 **kwargs):
+                 order=None, **kwargs):
+        check_scalar_delay(delay, 'GABAb2')
         #params
         self.g_max = g_max
         self.E = E
@@ -248,34 +264,40 @@ class GABAb2(bp.TwoEndConn):
         self.T_duration = T_duration
 
         #conns
-        self.conn = conn(pre.size, post.size)
-        self.pre_ids, self.post_ids = conn.requires('pre_ids', 'post_ids')
+        self.conn = build_conn(conn, pre.size, post.size)
+        pre_ids, post_ids = self.conn.requires('pre_ids', 'post_ids')
+        self.pre_ids, self.post_ids, self.perm = sort_synapses(pre_ids, post_ids, order)
         self.size = len(self.pre_ids)
+        self.num_post = self.conn.num_post
+        self.post2syn, self.post_indptr = csc_index(self.post_ids, self.num_post)
 
         #vars
-        self.D = bp.ops.zeros(self.size)
-        self.R = bp.ops.zeros(self.size)
-        self.G = bp.ops.zeros(self.size)
-        self.s = bp.ops.zeros(self.size)
-        self.g = self.register_constant_delay('g', size=self.size, delay_time = delay)
+        self.D = bp.ops.zeros(self.size, dtype=get_dtype())
+        self.R = bp.ops.zeros(self.size, dtype=get_dtype())
+        self.G = bp.ops.zeros(self.size, dtype=get_dtype())
+        self.s = bp.ops.zeros(self.size, dtype=get_dtype())
+        self.g = self.register_constant_delay('g', size=post.size, delay_time = delay)
         self.t_last_pre_spike = bp.ops.ones(self.size) * -1e7
 
         self.integral = bp.odeint(f=self.derivative)
         super(GABAb2, self).__init__(pre = pre, post = post, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.size):
-            pre_id = self.pre_ids[i]
-            post_id = self.post_ids[i]
-            if self.pre.spike[pre_id]:
-                self.t_last_pre_spike[i] = _t
-            T = ((_t - self.t_last_pre_spike[i]) < self.T_duration) * self.T
-            self.R[i], self.D[i], G = self.integral(
-                self.R[i], self.D[i], self.G[i], _t,
-                self.k1, self.k2, self.k3, T, self.k4, self.k5, self.k6
-            )
-            self.s[i] = (G ** 4 / (G ** 4 + self.kd))
-            self.G[i] = G
-            self.g.push(i, self.g_max * self.s[i])
-            self.post.input[post_id] -= self.g.pull(i) * (self.post.V[post_id] - self.E)
+        for post_id in prange(self.num_post):
+            g = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                pre_id = self.pre_ids[i]
+                if self.pre.spike[pre_id]:
+                    self.t_last_pre_spike[i] = _t
+                T = ((_t - self.t_last_pre_spike[i]) < self.T_duration) * self.T
+                self.R[i], self.D[i], G = self.integral(
+                    self.R[i], self.D[i], self.G[i], _t,
+                    self.k1, self.k2, self.k3, T, self.k4, self.k5, self.k6
+                )
+                self.s[i] = (G ** 4 / (G ** 4 + self.kd))
+                self.G[i] = G
+                g += self.g_max * self.s[i]
+            self.g.push(post_id, g)
+            self.post.input[post_id] -= self.g.pull(post_id) * (self.post.V[post_id] - self.E)
 
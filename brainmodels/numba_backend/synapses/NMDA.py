@@ -2,6 +2,11 @@
 import brainpy as bp
 from numba import prange
 
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.spike_queue import check_scalar_delay
+from ...utils.storage import csc_index, sort_synapses
+
 __all__ = [
     'NMDA'
 ]
@@ -50,6 +55,8 @@ class NMDA(bp.TwoEndConn):
     a             .5             1/ms 
 
     mode          'scalar'       \               Data structure of ST members.
+
+    order         None           \        Synapse order, None, 'post' or 'pre'.
     ============= ============== =============== ================================================    
     
     
@@ -90,7 +97,7 @@ class NMDA(bp.TwoEndConn):
         return dsdt, dxdt
 
     def __init__(self, pre, post, conn, delay=0., g_max=0.15, E=0., cc_Mg=1.2,
-                 alpha=0.062, beta=3.57, tau=100, a=0.5, tau_rise=2., **kwargs):
+                 alpha=0.062, beta=3.57, tau=100, a=0.5, tau_rise=2., order=None, **kwargs):
         # parameters
         self.g_max = g_max
         self.E = E
@@ -100,34 +107,39 @@ class NMDA(bp.TwoEndConn):
         self.tau = tau
         self.tau_rise = tau_rise
         self.a = a
-        self.delay = delay
+        self.delay = check_scalar_delay(delay, 'NMDA')
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.pre_ids, self.post_ids = conn.requires('pre_ids', 'post_ids')
+        self.conn = build_conn(conn, pre.size, post.size)
+        pre_ids, post_ids = self.conn.requires('pre_ids', 'post_ids')
+        self.pre_ids, self.post_ids, self.perm = sort_synapses(pre_ids, post_ids, order)
         self.size = len(self.pre_ids)
+        self.num_post = self.conn.num_post
+        self.post2syn, self.post_indptr = csc_index(self.post_ids, self.num_post)
 
         # variables
-        self.s = bp.ops.zeros(self.size)
-        self.x = bp.ops.zeros(self.size)
-        self.g = self.register_constant_delay('g', size=self.size, delay_time=delay)
+        self.s = bp.ops.zeros(self.size, dtype=get_dtype())
+        self.x = bp.ops.zeros(self.size, dtype=get_dtype())
+        self.g = self.register_constant_delay('g', size=post.size, delay_time=delay)
 
         self.integral = bp.odeint(f=self.derivative, method='euler')
 
         super(NMDA, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.size):
-            pre_id = self.pre_ids[i]
-
-            self.x[i] += self.pre.spike[pre_id]
-            self.s[i], self.x[i] = self.integral(self.s[i], self.x[i], _t, self.tau_rise, self.tau, self.a)
+        for post_id in prange(self.num_post):
+            g = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                pre_id = self.pre_ids[i]
 
-            # output
-            self.g.push(i, self.g_max * self.s[i])
+                self.x[i] += self.pre.spike[pre_id]
+                self.s[i], self.x[i] = self.integral(self.s[i], self.x[i], _t, self.tau_rise, self.tau, self.a)
 
-            post_id = self.post_ids[i]
+                # output
+                g += self.g_max * self.s[i]
 
+            self.g.push(post_id, g)
             g_inf = 1 + self.cc_Mg / self.beta * bp.ops.exp(-self.alpha * self.post.V[post_id])
 
-            self.post.input[post_id] -= self.g.pull(i) * (self.post.V[post_id] - self.E) / g_inf
+            self.post.input[post_id] -= self.g.pull(post_id) * (self.post.V[post_id] - self.E) / g_inf
@@ -4,6 +4,11 @@ import matplotlib.pyplot as plt
 import numpy as np
 from numba import prange
 
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.spike_queue import check_scalar_delay
+from ...utils.storage import csc_index, sort_synapses
+
 
 class Oja(bp.TwoEndConn):
     target_backend = 'general'
@@ -15,7 +20,8 @@ class Oja(bp.TwoEndConn):
 
     def __init__(self, pre, post, conn, delay=0.,
                  gamma=0.005, w_max=1., w_min=0.,
-                 **kwargs):
+                 order=None, **kwargs):
+        check_scalar_delay(delay, 'Oja')
         # params
         self.gamma = gamma
         self.w_max = w_max
@@ -23,26 +29,29 @@ class Oja(bp.TwoEndConn):
         # no delay in firing rate models
 
         # conns
-        self.conn = conn(pre.size, post.size)
-        self.pre_ids, self.post_ids = self.conn.requires(
-            'pre_ids', 'post_ids'
-        )
+        self.conn = build_conn(conn, pre.size, post.size)
+        pre_ids, post_ids = self.conn.requires('pre_ids', 'post_ids')
+        self.pre_ids, self.post_ids, self.perm = sort_synapses(pre_ids, post_ids, order)
         self.size = len(self.pre_ids)
+        self.num_post = self.conn.num_post
+        self.post2syn, self.post_indptr = csc_index(self.post_ids, self.num_post)
 
         # data
-        self.w = bp.ops.ones(self.size) * 0.05
+        self.w = bp.ops.ones(self.size, dtype=get_dtype()) * 0.05
 
         self.integral = bp.odeint(f=self.derivative)
         super(Oja, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
         post_r = bp.ops.zeros(self.post.size[0])
-        for i in prange(self.size):
-            pre_id = self.pre_ids[i]
-            post_id = self.post_ids[i]
-            add = self.w[i] * self.pre.r[pre_id]
-            post_r[post_id] += add
-            self.w[i] = self.integral(
-                self.w[i], _t, self.gamma,
-                self.pre.r[pre_id], self.post.r[post_id])
+        for post_id in prange(self.num_post):
+            r = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                pre_id = self.pre_ids[i]
+                r += self.w[i] * self.pre.r[pre_id]
+                self.w[i] = self.integral(
+                    self.w[i], _t, self.gamma,
+                    self.pre.r[pre_id], self.post.r[post_id])
+            post_r[post_id] = r
         self.post.r = post_r
@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
 import brainpy as bp
-from numba import prange
+import numpy as np
+from numba import njit, prange
+
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.propagators import exp_decay
+from ...utils.spike_queue import check_scalar_delay
+from ...utils.storage import csc_index, sort_synapses
 
 __all__ = [
     'STDP'
@@ -35,6 +42,11 @@ class STDP(bp.TwoEndConn):
 
         w&= min([w+A_{source}]^+, w_{max})
 
+    The traces are only read at the spikes. With ``lazy=True``, they are not
+    integrated at each step, but decayed in closed form from the time of
+    their last update ``t_last`` when a spike reaches the synapse, so that
+    their cost scales with the spike rate instead of with the steps.
+
     **Learning Rule Parameters**
 
     ============= ============== ======== =================================================================
@@ -62,6 +74,12 @@ class STDP(bp.TwoEndConn):
 
                                           a target neuron spike.
 
+    order         None           \        Synapse order, None, 'post' or 'pre'.
+
+    method        \              \        Integration method, 'exponential_euler' by default, or 'exact'.
+
+    lazy          False          \        Decay the traces at the spikes only, in closed form.
+
     ============= ============== ======== =================================================================
 
     Returns:
@@ -83,6 +101,8 @@ class STDP(bp.TwoEndConn):
     s                0.                Gating variable on post-synaptic neuron.
 
     w                0.                Synapse weight.
+
+    t_last           0.                Last update time of the traces.
     ================ ================= =========================================================
 
     Note that all ST members are saved as floating point type in BrainPy, 
@@ -104,7 +124,8 @@ class STDP(bp.TwoEndConn):
 
     def __init__(self, pre, post, conn, delay=0.,
                  delta_A_s=0.5, delta_A_t=0.5, w_min=0., w_max=20.,
-                 tau_s=10., tau_t=10., tau=10., **kwargs):
+                 tau_s=10., tau_t=10., tau=10., order=None, method='exponential_euler',
+                 lazy=False, **kwargs):
         # parameters
         self.tau_s = tau_s
         self.tau_t = tau_t
@@ -113,50 +134,106 @@ class STDP(bp.TwoEndConn):
         self.delta_A_t = delta_A_t
         self.w_min = w_min
         self.w_max = w_max
-        self.delay = delay
+        self.delay = check_scalar_delay(delay, 'STDP')
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.pre_ids, self.post_ids = self.conn.requires('pre_ids', 'post_ids')
+        self.conn = build_conn(conn, pre.size, post.size)
+        pre_ids, post_ids = self.conn.requires('pre_ids', 'post_ids')
+        self.pre_ids, self.post_ids, self.perm = sort_synapses(pre_ids, post_ids, order)
         self.size = len(self.pre_ids)
+        self.num_post = self.conn.num_post
+        self.post2syn, self.post_indptr = csc_index(self.post_ids, self.num_post)
 
         # variables
-        self.s = bp.ops.zeros(self.size)
-        self.A_s = bp.ops.zeros(self.size)
-        self.A_t = bp.ops.zeros(self.size)
-        self.w = bp.ops.ones(self.size) * 1.
-        self.I_syn = self.register_constant_delay('I_syn', size=self.size, delay_time=delay)
-
-        self.integral = bp.odeint(f=self.derivative, method='exponential_euler')
-
+        self.s = bp.ops.zeros(self.size, dtype=get_dtype())
+        self.A_s = bp.ops.zeros(self.size, dtype=get_dtype())
+        self.A_t = bp.ops.zeros(self.size, dtype=get_dtype())
+        self.w = bp.ops.ones(self.size, dtype=get_dtype()) * 1.
+        self.t_last = bp.ops.zeros(self.size)
+        self.I_syn = self.register_constant_delay('I_syn', size=post.size, delay_time=delay)
+
+        if method == 'exact':
+            P, P_s, P_t = exp_decay(tau), exp_decay(tau_s), exp_decay(tau_t)
+
+            def integral(s, A_s, A_t, t, tau, tau_s, tau_t):
+                return s * P, A_s * P_s, A_t * P_t
+
+            self.integral = njit(integral)
+        else:
+            self.integral = bp.odeint(f=self.derivative, method=method)
+
+        if lazy:
+            self.s_decay = exp_decay(tau)
+            kwargs.setdefault('steps', self.update_lazy)
         super(STDP, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.size):
-            pre_id = self.pre_ids[i]
-            post_id = self.post_ids[i]
-
-            self.s[i], A_s, A_t = self.integral(self.s[i], self.A_s[i], self.A_t[i],
-                                                _t, self.tau, self.tau_s, self.tau_t)
-
-            w = self.w[i]
-            if self.pre.spike[pre_id] > 0:
-                self.s[i] += w
-                A_s += self.delta_A_s
-                w -= A_t
-
-            if self.post.spike[post_id] > 0:
-                A_t += self.delta_A_t
-                w += A_s
-
-            self.A_s[i] = A_s
-            self.A_t[i] = A_t
-            if w > self.w_max:
-                w = self.w_max
-            if w < self.w_min:
-                w = self.w_min
-            self.w[i] = w
-
-            # output
-            self.I_syn.push(i, self.s[i])
-            self.post.input[post_id] += self.I_syn.pull(i)
+        for post_id in prange(self.num_post):
+            I_syn = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                pre_id = self.pre_ids[i]
+
+                self.s[i], A_s, A_t = self.integral(self.s[i], self.A_s[i], self.A_t[i],
+                                                    _t, self.tau, self.tau_s, self.tau_t)
+
+                w = self.w[i]
+                if self.pre.spike[pre_id] > 0:
+                    self.s[i] += w
+                    A_s += self.delta_A_s
+                    w -= A_t
+
+                if self.post.spike[post_id] > 0:
+                    A_t += self.delta_A_t
+                    w += A_s
+
+                self.A_s[i] = A_s
+                self.A_t[i] = A_t
+                if w > self.w_max:
+                    w = self.w_max
+                if w < self.w_min:
+                    w = self.w_min
+                self.w[i] = w
+
+                # output
+                I_syn += self.s[i]
+            self.I_syn.push(post_id, I_syn)
+            self.post.input[post_id] += self.I_syn.pull(post_id)
+
+    def update_lazy(self, _t):
+        for post_id in prange(self.num_post):
+            I_syn = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                pre_id = self.pre_ids[i]
+
+                self.s[i] *= self.s_decay
+                if self.pre.spike[pre_id] > 0 or self.post.spike[post_id] > 0:
+                    # decay the traces since their last update
+                    elapsed = _t - self.t_last[i]
+                    A_s = self.A_s[i] * np.exp(-elapsed / self.tau_s)
+                    A_t = self.A_t[i] * np.exp(-elapsed / self.tau_t)
+                    self.t_last[i] = _t
+
+                    w = self.w[i]
+                    if self.pre.spike[pre_id] > 0:
+                        self.s[i] += w
+                        A_s += self.delta_A_s
+                        w -= A_t
+
+                    if self.post.spike[post_id] > 0:
+                        A_t += self.delta_A_t
+                        w += A_s
+
+                    self.A_s[i] = A_s
+                    self.A_t[i] = A_t
+                    if w > self.w_max:
+                        w = self.w_max
+                    if w < self.w_min:
+                        w = self.w_min
+                    self.w[i] = w
+
+                # output
+                I_syn += self.s[i]
+            self.I_syn.push(post_id, I_syn)
+            self.post.input[post_id] += self.I_syn.pull(post_id)
@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
 import brainpy as bp
-from numba import prange
+import numpy as np
+from numba import njit, prange
+
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.propagators import exp_decay
+from ...utils.spike_queue import SpikeQueue, queue_pop, queue_push
+from ...utils.storage import csc_index, sort_synapses
 
 __all__ = [
     'STP'
@@ -32,6 +39,23 @@ class STP(bp.TwoEndConn):
     by total release of all the neurotransmitter (:math:`u=x=1`), called
     absolute synaptic efficacy of the connections.
 
+    With homogeneous :math:`U`, :math:`\\tau_f` and :math:`\\tau_d`, :math:`u`
+    and :math:`x` only depend on the pre-synaptic spike train, so that they are
+    integrated once per pre-synaptic neuron and shared by its outgoing synapses.
+    Heterogeneous parameters, i.e. arrays with one value per synapse in the
+    connector order, fall back to the per-synapse :math:`u` and :math:`x`.
+
+    :math:`u` and :math:`x` are only read at the pre-synaptic spikes. With
+    ``lazy=True`` and homogeneous parameters, they are not integrated at each
+    step, but decayed in closed form from the time of their last update
+    ``t_last`` when the pre-synaptic neuron spikes, so that their cost scales
+    with the spike rate instead of with the steps.
+
+    With the heterogeneous delays of the synapses, the spikes are queued,
+    and the per-synapse :math:`u` and :math:`x` are updated when the spike
+    of the synapse arrives, which gives the same current as delaying the
+    output.
+
 
     **Synapse Parameters**
 
@@ -44,7 +68,19 @@ class STP(bp.TwoEndConn):
 
     U             .15            \        The increment of :math:`u` produced by a spike.
 
+                                          U, tau_d and tau_f can be arrays of the synapses.
+
+    delay         0.             ms       Synaptic delay, or an array of the delays of the synapses
+
+                                          in the connector order, which are queued as spike events.
+
     mode          'scalar'       \        Data structure of ST members.
+
+    order         None           \        Synapse order, None, 'post' or 'pre'.
+
+    method        \              \        Integration method, 'exponential_euler' by default, or 'exact'.
+
+    lazy          False          \        Decay u and x at the spikes only, in closed form.
     ============= ============== ======== ===========================================    
     
     Returns:
@@ -61,6 +97,10 @@ class STP(bp.TwoEndConn):
 
     x                 1                 A Normalized variable denoting the fraction of remain neurotransmitters.
 
+    release           0                 Released fraction :math:`u^+x^-` at the last step.
+
+    t_last            0                 Last update time of u and x.
+
     w                 1                 Synapse weight.
 
     g                 0                 Synapse conductance.
@@ -84,44 +124,188 @@ class STP(bp.TwoEndConn):
         dxdt = (1 - x) / tau_d
         return dsdt, dudt, dxdt
 
-    def __init__(self, pre, post, conn, delay=0., U=0.15, tau_f=1500., tau_d=200., tau=8., **kwargs):
+    def __init__(self, pre, post, conn, delay=0., U=0.15, tau_f=1500., tau_d=200., tau=8., order=None, method='exponential_euler',
+                 lazy=False, **kwargs):
+        # connections
+        self.conn = build_conn(conn, pre.size, post.size)
+        pre_ids, post_ids = self.conn.requires('pre_ids', 'post_ids')
+        self.pre_ids, self.post_ids, self.perm = sort_synapses(pre_ids, post_ids, order)
+        self.size = len(self.pre_ids)
+        self.num_pre = self.conn.num_pre
+        self.num_post = self.conn.num_post
+        self.post2syn, self.post_indptr = csc_index(self.post_ids, self.num_post)
+
         # parameters
-        self.tau_d = tau_d
-        self.tau_f = tau_f
         self.tau = tau
-        self.U = U
         self.delay = delay
-
-        # connections
-        self.conn = conn(pre.size, post.size)
-        self.pre_ids, self.post_ids = conn.requires('pre_ids', 'post_ids')
-        self.size = len(self.pre_ids)
+        self.homogeneous = all(np.size(p) == 1 or np.all(p == np.ravel(p)[0]) for p in (U, tau_f, tau_d))
+
+        # heterogeneous delays, with the per-synapse u and x
+        if np.ndim(delay) > 0:
+            if lazy:
+                raise ValueError('Lazy decay does not support the heterogeneous delays.')
+            syn_ids = np.empty(self.size, dtype=np.int64)
+            syn_ids[self.perm] = np.arange(self.size)
+            self.queue = SpikeQueue(pre_ids, delay, self.num_pre, index=(syn_ids,))
+            self.arrived = bp.ops.zeros(self.size)
+            kwargs.setdefault('steps', self.update_queue)
+            self.homogeneous = False
+            delay = 0.
+
+        if self.homogeneous:
+            self.U = float(np.ravel(U)[0])
+            self.tau_f = float(np.ravel(tau_f)[0])
+            self.tau_d = float(np.ravel(tau_d)[0])
+        else:
+            self.U = np.ones(self.size) * U
+            self.tau_f = np.ones(self.size) * tau_f
+            self.tau_d = np.ones(self.size) * tau_d
+            # connector order to the synapse order
+            self.U, self.tau_f, self.tau_d = self.U[self.perm], self.tau_f[self.perm], self.tau_d[self.perm]
 
         # variables
-        self.s = bp.ops.zeros(self.size)
-        self.x = bp.ops.ones(self.size)
-        self.u = bp.ops.zeros(self.size)
-        self.w = bp.ops.ones(self.size)
-        self.I_syn = self.register_constant_delay('I_syn', size=self.size, delay_time=delay)
-
-        self.integral = bp.odeint(f=self.derivative, method='exponential_euler')
-
+        num = self.num_pre if self.homogeneous else self.size
+        self.s = bp.ops.zeros(self.size, dtype=get_dtype())
+        self.x = bp.ops.ones(num, dtype=get_dtype())
+        self.u = bp.ops.zeros(num, dtype=get_dtype())
+        self.release = bp.ops.zeros(num, dtype=get_dtype())
+        self.w = bp.ops.ones(self.size, dtype=get_dtype())
+        self.t_last = bp.ops.zeros(num)
+        self.I_syn = self.register_constant_delay('I_syn', size=post.size, delay_time=delay)
+
+        if method == 'exact':
+            dt = bp.backend.get_dt()
+            P = exp_decay(tau)
+            if self.homogeneous:
+                P_d, P_f = exp_decay(self.tau_d), exp_decay(self.tau_f)
+
+                def integral(s, u, x, t, tau, tau_d, tau_f):
+                    return s * P, u * P_f, 1. + (x - 1.) * P_d
+            else:
+                def integral(s, u, x, t, tau, tau_d, tau_f):
+                    return s * P, u * np.exp(-dt / tau_f), 1. + (x - 1.) * np.exp(-dt / tau_d)
+
+            self.integral = njit(integral)
+        else:
+            self.integral = bp.odeint(f=self.derivative, method=method)
+
+        if lazy:
+            if not self.homogeneous:
+                raise ValueError('Lazy decay requires homogeneous "U", "tau_f" and "tau_d".')
+            self.dt = bp.backend.get_dt()
+            self.s_decay = exp_decay(tau)
+            self.f_decay = exp_decay(self.tau_f)
+            self.d_decay = exp_decay(self.tau_d)
+            kwargs.setdefault('steps', self.update_lazy)
+        elif not self.homogeneous:
+            kwargs.setdefault('steps', self.update_heterogeneous)
         super(STP, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.size):
-            pre_id = self.pre_ids[i]
-
-            self.s[i], u, x = self.integral(self.s[i], self.u[i], self.x[i], _t, self.tau, self.tau_d, self.tau_f)
+        # u and x of each pre-synaptic neuron
+        for pre_id in prange(self.num_pre):
+            _, u, x = self.integral(0., self.u[pre_id], self.x[pre_id], _t, self.tau, self.tau_d, self.tau_f)
 
+            self.release[pre_id] = 0.
+            if self.pre.spike[pre_id] > 0:
+                u += self.U * (1 - self.u[pre_id])
+                self.release[pre_id] = u * self.x[pre_id]
+                x -= self.release[pre_id]
+            self.u[pre_id] = u
+            self.x[pre_id] = x
+
+        for post_id in prange(self.num_post):
+            I_syn = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                pre_id = self.pre_ids[i]
+
+                self.s[i], _, _ = self.integral(self.s[i], 0., 1., _t, self.tau, self.tau_d, self.tau_f)
+                self.s[i] += self.w[i] * self.release[pre_id]
+
+                # output
+                I_syn += self.s[i]
+            self.I_syn.push(post_id, I_syn)
+            self.post.input[post_id] += self.I_syn.pull(post_id)
+
+    def update_lazy(self, _t):
+        for pre_id in prange(self.num_pre):
+            self.release[pre_id] = 0.
             if self.pre.spike[pre_id] > 0:
-                u += self.U * (1 - self.u[i])
-                self.s[i] += self.w[i] * u * self.x[i]
-                x -= u * self.x[i]
-            self.u[i] = u
-            self.x[i] = x
-
-            # output
-            post_id = self.post_ids[i]
-            self.I_syn.push(i, self.s[i])
-            self.post.input[post_id] += self.I_syn.pull(i)
+                # decay u and x to the previous step, then take the step
+                elapsed = _t - self.dt - self.t_last[pre_id]
+                u0 = self.u[pre_id] * np.exp(-elapsed / self.tau_f)
+                x0 = 1. + (self.x[pre_id] - 1.) * np.exp(-elapsed / self.tau_d)
+                u = u0 * self.f_decay + self.U * (1 - u0)
+                self.release[pre_id] = u * x0
+                self.u[pre_id] = u
+                self.x[pre_id] = 1. + (x0 - 1.) * self.d_decay - self.release[pre_id]
+                self.t_last[pre_id] = _t
+
+        for post_id in prange(self.num_post):
+            I_syn = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                pre_id = self.pre_ids[i]
+
+                self.s[i] = self.s[i] * self.s_decay + self.w[i] * self.release[pre_id]
+
+                # output
+                I_syn += self.s[i]
+            self.I_syn.push(post_id, I_syn)
+            self.post.input[post_id] += self.I_syn.pull(post_id)
+
+    def update_heterogeneous(self, _t):
+        for post_id in prange(self.num_post):
+            I_syn = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                pre_id = self.pre_ids[i]
+
+                self.s[i], u, x = self.integral(self.s[i], self.u[i], self.x[i], _t,
+                                                self.tau, self.tau_d[i], self.tau_f[i])
+
+                self.release[i] = 0.
+                if self.pre.spike[pre_id] > 0:
+                    u += self.U[i] * (1 - self.u[i])
+                    self.release[i] = u * self.x[i]
+                    self.s[i] += self.w[i] * self.release[i]
+                    x -= self.release[i]
+                self.u[i] = u
+                self.x[i] = x
+
+                # output
+                I_syn += self.s[i]
+            self.I_syn.push(post_id, I_syn)
+            self.post.input[post_id] += self.I_syn.pull(post_id)
+
+    def update_queue(self, _t):
+        self.queue.events = queue_push(self.queue.events, self.queue.counts, self.queue.cursor,
+                                       self.queue.pre_gptr, self.queue.group_delay, self.pre.spike)
+        syn_ids = queue_pop(self.queue.events, self.queue.counts, self.queue.cursor,
+                            self.queue.gptr, self.queue.syn_index[0])
+        for k in range(syn_ids.shape[0]):
+            self.arrived[syn_ids[k]] = 1.
+
+        for post_id in prange(self.num_post):
+            I_syn = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+
+                self.s[i], u, x = self.integral(self.s[i], self.u[i], self.x[i], _t,
+                                                self.tau, self.tau_d[i], self.tau_f[i])
+
+                self.release[i] = 0.
+                if self.arrived[i] > 0:
+                    u += self.U[i] * (1 - self.u[i])
+                    self.release[i] = u * self.x[i]
+                    self.s[i] += self.w[i] * self.release[i]
+                    x -= self.release[i]
+                    self.arrived[i] = 0.
+                self.u[i] = u
+                self.x[i] = x
+
+                # output
+                I_syn += self.s[i]
+            self.I_syn.push(post_id, I_syn)
+            self.post.input[post_id] += self.I_syn.pull(post_id)
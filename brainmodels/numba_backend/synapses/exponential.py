@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
 import brainpy as bp
-from numba import prange
+import numpy as np
+from numba import njit, prange
+
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.propagators import exp_decay
+from ...utils.spike_queue import SpikeQueue, queue_pop, queue_push
+from ...utils.storage import csc_index, sort_synapses
 
 __all__ = [
     'Exponential'
@@ -36,6 +43,16 @@ class Exponential(bp.TwoEndConn):
     ------------- -------------- -------- -----------------------------------------------------------------------------------
     tau_decay     8.             ms       The time constant of decay.
 
+    delay         0.             ms       Synaptic delay, or an array of the delays of the synapses
+
+                                          in the connector order, which are queued as spike events.
+
+    lumped        False          \        Integrate one state per post-synaptic neuron.
+
+    order         None           \        Synapse order, None, 'post' or 'pre'.
+
+    method        \              \        Integration method, 'exponential_euler' by default, or 'exact'.
+
     ============= ============== ======== ===================================================================================  
     
     Returns:
@@ -65,33 +82,105 @@ class Exponential(bp.TwoEndConn):
         ds = -s / tau
         return ds
 
-    def __init__(self, pre, post, conn, delay=0., tau=8.0, **kwargs):
+    def __init__(self, pre, post, conn, delay=0., tau=8.0, lumped=False, order=None, method='exponential_euler', **kwargs):
         # parameters
         self.tau = tau
         self.delay = delay
+        self.lumped = lumped
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.pre_ids, self.post_ids = conn.requires('pre_ids', 'post_ids')
+        self.conn = build_conn(conn, pre.size, post.size)
+        pre_ids, post_ids = self.conn.requires('pre_ids', 'post_ids')
+        self.pre_ids, self.post_ids, self.perm = sort_synapses(pre_ids, post_ids, order)
         self.size = len(self.pre_ids)
+        self.num_post = self.conn.num_post
+        self.post2syn, self.post_indptr = csc_index(self.post_ids, self.num_post)
+
+        # heterogeneous delays
+        if np.ndim(delay) > 0:
+            syn_ids = np.empty(self.size, dtype=np.int64)
+            syn_ids[self.perm] = np.arange(self.size)
+            self.queue = SpikeQueue(pre_ids, delay, self.conn.num_pre, index=(syn_ids,))
+            kwargs.setdefault('steps', self.update_lumped_queue if lumped else self.update_queue)
+            delay = 0.
 
         # variables
-        self.s = bp.ops.zeros(self.size)
-        self.w = bp.ops.ones(self.size) * .1
-        self.I_syn = self.register_constant_delay('I_syn', size=self.size, delay_time=delay)
+        self.s = bp.ops.zeros(post.size if lumped else self.size, dtype=get_dtype())
+        self.w = bp.ops.ones(self.size, dtype=get_dtype()) * .1
+        self.I_syn = self.register_constant_delay('I_syn', size=post.size, delay_time=delay)
+
+        if method == 'exact':
+            P = exp_decay(tau)
 
-        self.integral = bp.odeint(f=self.derivative, method='exponential_euler')
+            def integral(s, t, tau):
+                return s * P
 
+            self.integral = njit(integral)
+        else:
+            self.integral = bp.odeint(f=self.derivative, method=method)
+
+        if lumped:
+            kwargs.setdefault('steps', self.update_lumped)
         super(Exponential, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.size):
-            pre_id = self.pre_ids[i]
+        for post_id in prange(self.num_post):
+            I_syn = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                pre_id = self.pre_ids[i]
 
+                self.s[i] = self.integral(self.s[i], _t, self.tau)
+                self.s[i] += self.pre.spike[pre_id]
+                I_syn += self.w[i] * self.s[i]
+
+            # output
+            self.I_syn.push(post_id, I_syn)
+            self.post.input[post_id] += self.I_syn.pull(post_id)
+
+    def update_lumped(self, _t):
+        for post_id in prange(self.num_post):
+            s = self.integral(self.s[post_id], _t, self.tau)
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                s += self.w[i] * self.pre.spike[self.pre_ids[i]]
+            self.s[post_id] = s
+            self.I_syn.push(post_id, s)
+            self.post.input[post_id] += self.I_syn.pull(post_id)
+
+    def update_queue(self, _t):
+        self.queue.events = queue_push(self.queue.events, self.queue.counts, self.queue.cursor,
+                                       self.queue.pre_gptr, self.queue.group_delay, self.pre.spike)
+        syn_ids = queue_pop(self.queue.events, self.queue.counts, self.queue.cursor,
+                            self.queue.gptr, self.queue.syn_index[0])
+
+        for i in prange(self.size):
             self.s[i] = self.integral(self.s[i], _t, self.tau)
-            self.s[i] += self.pre.spike[pre_id]
-            self.I_syn.push(i, self.w[i] * self.s[i])
+        for k in range(syn_ids.shape[0]):
+            self.s[syn_ids[k]] += 1.
+
+        for post_id in prange(self.num_post):
+            I_syn = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                I_syn += self.w[i] * self.s[i]
 
             # output
-            post_id = self.post_ids[i]
-            self.post.input[post_id] += self.I_syn.pull(i)
+            self.I_syn.push(post_id, I_syn)
+            self.post.input[post_id] += self.I_syn.pull(post_id)
+
+    def update_lumped_queue(self, _t):
+        self.queue.events = queue_push(self.queue.events, self.queue.counts, self.queue.cursor,
+                                       self.queue.pre_gptr, self.queue.group_delay, self.pre.spike)
+        syn_ids = queue_pop(self.queue.events, self.queue.counts, self.queue.cursor,
+                            self.queue.gptr, self.queue.syn_index[0])
+
+        for post_id in prange(self.num_post):
+            self.s[post_id] = self.integral(self.s[post_id], _t, self.tau)
+        for k in range(syn_ids.shape[0]):
+            i = syn_ids[k]
+            self.s[self.post_ids[i]] += self.w[i]
+
+        for post_id in prange(self.num_post):
+            self.I_syn.push(post_id, self.s[post_id])
+            self.post.input[post_id] += self.I_syn.pull(post_id)
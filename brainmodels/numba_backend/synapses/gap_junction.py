@@ -2,6 +2,11 @@
 import brainpy as bp
 from numba import prange
 
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.spike_queue import check_scalar_delay
+from ...utils.storage import csc_index, sort_synapses
+
 __all__ = [
     'Gap_junction',
     'Gap_junction_lif',
@@ -44,24 +49,30 @@ class Gap_junction(bp.TwoEndConn):
 
     target_backend = ['numpy', 'numba', 'numba-parallel', 'numba-cuda']
 
-    def __init__(self, pre, post, conn, delay=0., **kwargs):
-        self.delay = delay
+    def __init__(self, pre, post, conn, delay=0., order=None, **kwargs):
+        self.delay = check_scalar_delay(delay, 'Gap_junction')
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.pre_ids, self.post_ids = conn.requires('pre_ids', 'post_ids')
+        self.conn = build_conn(conn, pre.size, post.size)
+        pre_ids, post_ids = self.conn.requires('pre_ids', 'post_ids')
+        self.pre_ids, self.post_ids, self.perm = sort_synapses(pre_ids, post_ids, order)
         self.size = len(self.pre_ids)
+        self.num_post = self.conn.num_post
+        self.post2syn, self.post_indptr = csc_index(self.post_ids, self.num_post)
 
         # variables
-        self.w = bp.ops.ones(self.size)
+        self.w = bp.ops.ones(self.size, dtype=get_dtype())
 
         super(Gap_junction, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.size):
-            pre_id = self.pre_ids[i]
-            post_id = self.post_ids[i]
+        for post_id in prange(self.num_post):
+            I_syn = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                pre_id = self.pre_ids[i]
 
-            self.post.input[post_id] += self.w[i] * (self.pre.V[pre_id] - self.post.V[post_id])
+                I_syn += self.w[i] * (self.pre.V[pre_id] - self.post.V[post_id])
+            self.post.input[post_id] += I_syn
 
 
 class Gap_junction_lif(bp.TwoEndConn):
@@ -78,6 +89,8 @@ class Gap_junction_lif(bp.TwoEndConn):
     **Member name** **Initial Value** **Explanation**
     --------------- ----------------- ---------------------------------------------------------
     w                0.                Synapse weights.
+
+    I_syn            0.                Coupling current of each post-synaptic neuron.
     
     spikelet         0.                conductance for post-synaptic neuron
     =============== ================= =========================================================
@@ -100,33 +113,45 @@ class Gap_junction_lif(bp.TwoEndConn):
 
     target_backend = ['numpy', 'numba', 'numba-parallel', 'numba-cuda']
 
-    def __init__(self, pre, post, conn, delay=0., k_spikelet=0.1, post_refractory=False, **kwargs):
-        self.delay = delay
+    def __init__(self, pre, post, conn, delay=0., k_spikelet=0.1, post_refractory=False, order=None, **kwargs):
+        self.delay = check_scalar_delay(delay, 'Gap_junction_lif')
         self.k_spikelet = k_spikelet
         self.post_has_refractory = post_refractory
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.pre_ids, self.post_ids = conn.requires('pre_ids', 'post_ids')
+        self.conn = build_conn(conn, pre.size, post.size)
+        pre_ids, post_ids = self.conn.requires('pre_ids', 'post_ids')
+        self.pre_ids, self.post_ids, self.perm = sort_synapses(pre_ids, post_ids, order)
         self.size = len(self.pre_ids)
+        self.num_post = self.conn.num_post
+        self.post2syn, self.post_indptr = csc_index(self.post_ids, self.num_post)
 
         # variables
-        self.w = bp.ops.ones(self.size)
-        self.spikelet = self.register_constant_delay('spikelet', size=self.size, delay_time=self.delay)
+        self.w = bp.ops.ones(self.size, dtype=get_dtype())
+        self.I_syn = bp.ops.zeros(post.size, dtype=get_dtype())
+        self.spikelet = self.register_constant_delay('spikelet', size=post.size, delay_time=self.delay)
 
         super(Gap_junction_lif, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.size):
-            pre_id = self.pre_ids[i]
-            post_id = self.post_ids[i]
+        for post_id in prange(self.num_post):
+            I_syn = 0.
+            spikelet = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                pre_id = self.pre_ids[i]
+
+                I_syn += self.w[i] * (self.pre.V[pre_id] - self.post.V[post_id])
 
-            self.post.input[post_id] += self.w[i] * (self.pre.V[pre_id] - self.post.V[post_id])
+                spikelet += self.w[i] * self.k_spikelet * self.pre.spike[pre_id]
 
-            self.spikelet.push(i, self.w[i] * self.k_spikelet * self.pre.spike[pre_id])
+            self.spikelet.push(post_id, spikelet)
+            self.I_syn[post_id] = I_syn
 
-            out = self.spikelet.pull(i)
+        # the post-synaptic V, read by the loop above when pre is post, is changed afterwards
+        for post_id in prange(self.num_post):
+            self.post.input[post_id] += self.I_syn[post_id]
             if self.post_has_refractory:
-                self.post.V[post_id] += out * (1. - self.post.refractory[post_id])
+                self.post.V[post_id] += self.spikelet.pull(post_id) * (1. - self.post.refractory[post_id])
             else:
-                self.post.V[post_id] += out
+                self.post.V[post_id] += self.spikelet.pull(post_id)
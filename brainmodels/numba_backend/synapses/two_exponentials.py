@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 import brainpy as bp
-from numba import prange
+from numba import njit, prange
+
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.propagators import linear_propagator
+from ...utils.spike_queue import check_scalar_delay
+from ...utils.storage import csc_index, sort_synapses
 
 __all__ = [
     'Two_exponentials'
@@ -49,6 +55,12 @@ class Two_exponentials(bp.TwoEndConn):
     co_base       False          \        Whether to return Conductance-based model. If False: return current-based model.
 
     mode          'scalar'       \        Data structure of ST members.
+
+    lumped        False          \        Integrate one state per post-synaptic neuron.
+
+    order         None           \        Synapse order, None, 'post' or 'pre'.
+
+    method        'euler'        \        Integration method, or 'exact' for the exact propagator.
     ============= ============== ======== ===================================================================================  
     
     Returns:
@@ -85,36 +97,65 @@ class Two_exponentials(bp.TwoEndConn):
         dsdt = x
         return dsdt, dxdt
 
-    def __init__(self, pre, post, conn, delay=0., tau1=1.0, tau2=3.0, **kwargs):
+    def __init__(self, pre, post, conn, delay=0., tau1=1.0, tau2=3.0, lumped=False, order=None, method='euler', **kwargs):
         # parameters
         self.tau1 = tau1
         self.tau2 = tau2
-        self.delay = delay
+        self.delay = check_scalar_delay(delay, 'Two_exponentials')
+        self.lumped = lumped
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.pre_ids, self.post_ids = conn.requires('pre_ids', 'post_ids')
+        self.conn = build_conn(conn, pre.size, post.size)
+        pre_ids, post_ids = self.conn.requires('pre_ids', 'post_ids')
+        self.pre_ids, self.post_ids, self.perm = sort_synapses(pre_ids, post_ids, order)
         self.size = len(self.pre_ids)
+        self.num_post = self.conn.num_post
+        self.post2syn, self.post_indptr = csc_index(self.post_ids, self.num_post)
 
         # variables
-        self.s = bp.ops.zeros(self.size)
-        self.x = bp.ops.zeros(self.size)
-        self.w = bp.ops.ones(self.size) * .2
-        self.I_syn = self.register_constant_delay('I_syn', size=self.size, delay_time=delay)
+        self.s = bp.ops.zeros(post.size if lumped else self.size, dtype=get_dtype())
+        self.x = bp.ops.zeros(post.size if lumped else self.size, dtype=get_dtype())
+        self.w = bp.ops.ones(self.size, dtype=get_dtype()) * .2
+        self.I_syn = self.register_constant_delay('I_syn', size=post.size, delay_time=delay)
+
+        if method == 'exact':
+            A = [[0., 1.], [-1. / (tau1 * tau2), -(tau1 + tau2) / (tau1 * tau2)]]
+            (P_ss, P_sx), (P_xs, P_xx) = linear_propagator(A)
+
+            def integral(s, x, t, tau1, tau2):
+                return P_ss * s + P_sx * x, P_xs * s + P_xx * x
 
-        self.integral = bp.odeint(f=self.derivative, method='euler')
+            self.integral = njit(integral)
+        else:
+            self.integral = bp.odeint(f=self.derivative, method=method)
 
+        if lumped:
+            kwargs.setdefault('steps', self.update_lumped)
         super(Two_exponentials, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.size):
-            pre_id = self.pre_ids[i]
+        for post_id in prange(self.num_post):
+            I_syn = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                pre_id = self.pre_ids[i]
 
-            self.s[i], self.x[i] = self.integral(self.s[i], self.x[i], _t, self.tau1, self.tau2)
-            self.x[i] += self.pre.spike[pre_id]
+                self.s[i], self.x[i] = self.integral(self.s[i], self.x[i], _t, self.tau1, self.tau2)
+                self.x[i] += self.pre.spike[pre_id]
 
-            self.I_syn.push(i, self.w[i] * self.s[i])
+                I_syn += self.w[i] * self.s[i]
 
             # output
-            post_id = self.post_ids[i]
-            self.post.input[post_id] += self.I_syn.pull(i)
+            self.I_syn.push(post_id, I_syn)
+            self.post.input[post_id] += self.I_syn.pull(post_id)
+
+    def update_lumped(self, _t):
+        for post_id in prange(self.num_post):
+            s, x = self.integral(self.s[post_id], self.x[post_id], _t, self.tau1, self.tau2)
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                x += self.w[i] * self.pre.spike[self.pre_ids[i]]
+            self.s[post_id] = s
+            self.x[post_id] = x
+            self.I_syn.push(post_id, s)
+            self.post.input[post_id] += self.I_syn.pull(post_id)
@@ -2,6 +2,11 @@
 import brainpy as bp
 from numba import prange
 
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.spike_queue import check_scalar_delay
+from ...utils.storage import csc_index, sort_synapses
+
 __all__ = [
     'Voltage_jump'
 ]
@@ -36,35 +41,39 @@ class Voltage_jump(bp.TwoEndConn):
 
     target_backend = ['numpy', 'numba', 'numba-parallel', 'numba-cuda']
 
-    def __init__(self, pre, post, conn, delay=0., post_refractory=False, weight=1., **kwargs):
+    def __init__(self, pre, post, conn, delay=0., post_refractory=False, weight=1., order=None, **kwargs):
         # parameters
-        self.delay = delay
+        self.delay = check_scalar_delay(delay, 'Voltage_jump')
         self.post_has_refractory = post_refractory
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.pre_ids, self.post_ids = conn.requires('pre_ids', 'post_ids')
+        self.conn = build_conn(conn, pre.size, post.size)
+        pre_ids, post_ids = self.conn.requires('pre_ids', 'post_ids')
+        self.pre_ids, self.post_ids, self.perm = sort_synapses(pre_ids, post_ids, order)
         self.size = len(self.pre_ids)
+        self.num_post = self.conn.num_post
+        self.post2syn, self.post_indptr = csc_index(self.post_ids, self.num_post)
 
         # variables
-        self.s = bp.ops.zeros(self.size)
-        self.w = bp.ops.ones(self.size) * weight
-        self.I_syn = self.register_constant_delay('I_syn', size=self.size, delay_time=delay)
+        self.s = bp.ops.zeros(self.size, dtype=get_dtype())
+        self.w = bp.ops.ones(self.size, dtype=get_dtype()) * weight
+        self.I_syn = self.register_constant_delay('I_syn', size=post.size, delay_time=delay)
 
         super(Voltage_jump, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
-        for i in prange(self.size):
-            pre_id = self.pre_ids[i]
-            self.s[i] = self.pre.spike[pre_id]
-
-            # output
-            post_id = self.post_ids[i]
+        for post_id in prange(self.num_post):
+            I_syn = 0.
+            for j in range(self.post_indptr[post_id], self.post_indptr[post_id + 1]):
+                i = self.post2syn[j]
+                pre_id = self.pre_ids[i]
+                self.s[i] = self.pre.spike[pre_id]
 
-            self.I_syn.push(i, self.s[i] * self.w[i])
-            I_syn = self.I_syn.pull(i)
+                I_syn += self.s[i] * self.w[i]
 
+            # output
+            self.I_syn.push(post_id, I_syn)
             if self.post_has_refractory:
-                self.post.V += I_syn * (1. - self.post.refractory[post_id])
+                self.post.V[post_id] += self.I_syn.pull(post_id) * (1. - self.post.refractory[post_id])
             else:
-                self.post.V += I_syn
+                self.post.V[post_id] += self.I_syn.pull(post_id)
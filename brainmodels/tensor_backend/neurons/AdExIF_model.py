@@ -2,6 +2,9 @@
 
 import brainpy as bp
 
+from ...utils.batch import batch_shape
+from ...utils.dtype import get_dtype
+
 __all__ = [
     'AdExIF'
 ]
@@ -45,6 +48,10 @@ class AdExIF(bp.NeuGroup):
     t_refractory  0              ms       Refractory period length.
 
     noise         0.             \        the noise fluctuation.
+
+    batch         None           \        Number of the independent trials, or None.
+
+    fused         False          \        Update in place with fused operations, see ``update_fused``.
     ============= ============== ======== ========================================================================================================================
 
     **Neuron Variables**
@@ -68,7 +75,7 @@ class AdExIF(bp.NeuGroup):
      
                                           Can be seen as bool.
                              
-    t_last_spike        -1e7              Last spike time stamp.
+    ref_count           0                 Remaining time steps of the refractory period.
     ================== ================= ===========================================================
     
     References:
@@ -87,7 +94,7 @@ class AdExIF(bp.NeuGroup):
     def __init__(self, size, V_rest=-65., V_reset=-68.,
                  V_th=-30., V_T=-59.9, delta_T=3.48,
                  a=1., b=1., R=10., tau=10., tau_w=30.,
-                 t_refractory=0., **kwargs):
+                 t_refractory=0., batch=None, fused=False, **kwargs):
         # parameters
         self.V_rest = V_rest
         self.V_reset = V_reset
@@ -100,30 +107,76 @@ class AdExIF(bp.NeuGroup):
         self.tau = tau
         self.tau_w = tau_w
         self.t_refractory = t_refractory
+        self.ref_steps = int(t_refractory / bp.backend.get_dt() + 1e-9)
 
         # variables
         num = bp.size2len(size)
-        self.V = bp.ops.ones(num) * V_reset
-        self.w = bp.ops.zeros(size)
-        self.input = bp.ops.zeros(num)
-        self.spike = bp.ops.zeros(num, dtype=bool)
-        self.refractory = bp.ops.zeros(num, dtype=bool)
-        self.t_last_spike = bp.ops.ones(num) * -1e7
+        self.batch = batch
+        shape = batch_shape(num, batch)
+        self.V = bp.ops.ones(shape, dtype=get_dtype()) * V_reset
+        self.w = bp.ops.zeros(shape, dtype=get_dtype())
+        self.input = bp.ops.zeros(shape, dtype=get_dtype())
+        self.spike = bp.ops.zeros(shape, dtype=bool)
+        self.refractory = bp.ops.zeros(shape, dtype=bool)
+        self.ref_count = bp.ops.zeros(shape, dtype=bp.ops.int32)
 
         self.integral = bp.odeint(f=self.derivative, method='euler')
+        if fused:
+            self.dt = bp.backend.get_dt()
+            self.scratch = bp.ops.zeros(shape, dtype=get_dtype())
+            kwargs.setdefault('steps', self.update_fused)
 
         super(AdExIF, self).__init__(size=size, **kwargs)
 
     def update(self, _t):
-        refractory = (_t - self.t_last_spike) <= self.t_refractory
+        refractory = self.ref_count > 0
         V, w = self.integral(self.V, self.w, _t, self.input, self.V_rest,
                              self.delta_T, self.V_T, self.R, self.tau,
                              self.tau_w, self.a)
         V = bp.ops.where(refractory, self.V, V)
         spike = self.V_th <= V
-        self.t_last_spike = bp.ops.where(spike, _t, self.t_last_spike)
+        self.ref_count = bp.ops.where(spike, self.ref_steps,
+                                      bp.ops.where(refractory, self.ref_count - 1, 0))
         self.V = bp.ops.where(spike, self.V_reset, V)
         self.w = bp.ops.where(spike, w + self.b, w)
         self.refractory = refractory | spike
         self.input[:] = 0.
         self.spike = spike
+
+    def update_fused(self, _t):
+        """The update in place, with the Euler step.
+
+        The new potential is computed in the ``input`` buffer, and the
+        other intermediate results in the ``scratch`` buffer, so that a
+        step allocates no temporary arrays.
+        """
+        # delta_T * exp((V - V_T) / delta_T)
+        dV = bp.ops.subtract(self.V, self.V_T, out=self.scratch)
+        dV = bp.ops.multiply(dV, 1. / self.delta_T, out=dV)
+        dV = bp.ops.exp(dV, out=dV)
+        dV = bp.ops.multiply(dV, self.delta_T, out=dV)
+        # the new potential, in the input buffer
+        V = bp.ops.subtract(self.input, self.w, out=self.input)
+        V = bp.ops.multiply(V, self.R, out=V)
+        V = bp.ops.add(V, dV, out=V)
+        V = bp.ops.add(V, self.V_rest, out=V)
+        V = bp.ops.subtract(V, self.V, out=V)
+        V = bp.ops.multiply(V, self.dt / self.tau, out=V)
+        V = bp.ops.add(V, self.V, out=V)
+        # the new adaptation current, in the scratch buffer
+        w = bp.ops.subtract(self.V, self.V_rest, out=self.scratch)
+        w = bp.ops.multiply(w, self.a, out=w)
+        w = bp.ops.subtract(w, self.w, out=w)
+        w = bp.ops.multiply(w, self.dt / self.tau_w, out=w)
+        w = bp.ops.add(w, self.w, out=w)
+        refractory = bp.ops.greater_equal(self.ref_count, 1, out=self.refractory)
+        V = bp.ops.copyto(V, self.V, where=refractory)
+        spike = bp.ops.greater_equal(V, self.V_th, out=self.spike)
+        V = bp.ops.copyto(V, self.V_reset, where=spike)
+        self.V[:] = V
+        # w + b at the spikes, with the freed input buffer for the increments
+        self.w[:] = bp.ops.add(w, bp.ops.multiply(spike, self.b, out=self.input), out=w)
+        self.ref_count = bp.ops.subtract(self.ref_count, refractory, out=self.ref_count)
+        self.ref_count = bp.ops.copyto(self.ref_count, self.ref_steps, where=spike)
+        self.refractory = bp.ops.logical_or(refractory, spike, out=self.refractory)
+        self.input[:] = 0.
@@ -2,6 +2,9 @@
 
 import brainpy as bp
 
+from ...utils.batch import batch_shape
+from ...utils.dtype import get_dtype
+
 
 class ExpIF(bp.NeuGroup):
     """Exponential Integrate-and-Fire neuron model.
@@ -32,6 +35,10 @@ class ExpIF(bp.NeuGroup):
     tau           10.            \        Membrane time constant. Compute by R * C.
 
     t_refractory  1.7            \        Refractory period length.
+
+    batch         None           \        Number of the independent trials, or None.
+
+    fused         False          \        Update in place with fused operations, see ``update_fused``.
     ============= ============== ======== ===================================================
 
     **Neuron Variables**    
@@ -53,7 +60,7 @@ class ExpIF(bp.NeuGroup):
 
                                          Can be seen as bool.
 
-    t_last_spike       -1e7              Last spike time stamp.
+    ref_count          0                 Remaining time steps of the refractory period.
     ================== ================= =========================================================
 
     References:
@@ -73,7 +80,7 @@ class ExpIF(bp.NeuGroup):
     def __init__(self, size, V_rest=-65., V_reset=-68.,
                  V_th=-30., V_T=-59.9, delta_T=3.48,
                  R=10., C=1., tau=10., t_refractory=1.7,
-                 **kwargs):
+                 batch=None, fused=False, **kwargs):
         # parameters
         self.V_rest = V_rest
         self.V_reset = V_reset
@@ -84,24 +91,61 @@ class ExpIF(bp.NeuGroup):
         self.C = C
         self.tau = tau
         self.t_refractory = t_refractory
+        self.ref_steps = int(t_refractory / bp.backend.get_dt() + 1e-9)
 
         # variables
-        self.V = bp.ops.zeros(size)
-        self.input = bp.ops.zeros(size)
-        self.spike = bp.ops.zeros(size, dtype=bool)
-        self.refractory = bp.ops.zeros(size, dtype=bool)
-        self.t_last_spike = bp.ops.ones(size) * -1e7
+        self.batch = batch
+        shape = batch_shape(size, batch)
+        self.V = bp.ops.zeros(shape, dtype=get_dtype())
+        self.input = bp.ops.zeros(shape, dtype=get_dtype())
+        self.spike = bp.ops.zeros(shape, dtype=bool)
+        self.refractory = bp.ops.zeros(shape, dtype=bool)
+        self.ref_count = bp.ops.zeros(shape, dtype=bp.ops.int32)
 
         self.integral = bp.odeint(self.derivative)
+        if fused:
+            self.dt = bp.backend.get_dt()
+            self.scratch = bp.ops.zeros(shape, dtype=get_dtype())
+            kwargs.setdefault('steps', self.update_fused)
         super(ExpIF, self).__init__(size=size, **kwargs)
 
     def update(self, _t):
-        refractory = (_t - self.t_last_spike) <= self.t_refractory
+        refractory = self.ref_count > 0
         V = self.integral(self.V, _t, self.input, self.V_rest, self.delta_T, self.V_T, self.R, self.tau)
         V = bp.ops.where(refractory, self.V, V)
         spike = self.V_th <= V
-        self.t_last_spike = bp.ops.where(spike, _t, self.t_last_spike)
+        self.ref_count = bp.ops.where(spike, self.ref_steps,
+                                      bp.ops.where(refractory, self.ref_count - 1, 0))
         self.V = bp.ops.where(spike, self.V_reset, V)
         self.refractory = refractory | spike
         self.input[:] = 0.
         self.spike = spike
+
+    def update_fused(self, _t):
+        """The update in place, with the Euler step.
+
+        The new potential is computed in the ``input`` buffer, and the
+        other intermediate results in the ``scratch`` buffer, so that a
+        step allocates no temporary arrays.
+        """
+        # delta_T * exp((V - V_T) / delta_T)
+        dV = bp.ops.subtract(self.V, self.V_T, out=self.scratch)
+        dV = bp.ops.multiply(dV, 1. / self.delta_T, out=dV)
+        dV = bp.ops.exp(dV, out=dV)
+        dV = bp.ops.multiply(dV, self.delta_T, out=dV)
+        # the new potential, in the input buffer
+        V = bp.ops.multiply(self.input, self.R, out=self.input)
+        V = bp.ops.add(V, dV, out=V)
+        V = bp.ops.add(V, self.V_rest, out=V)
+        V = bp.ops.subtract(V, self.V, out=V)
+        V = bp.ops.multiply(V, self.dt / self.tau, out=V)
+        V = bp.ops.add(V, self.V, out=V)
+        refractory = bp.ops.greater_equal(self.ref_count, 1, out=self.refractory)
+        V = bp.ops.copyto(V, self.V, where=refractory)
+        spike = bp.ops.greater_equal(V, self.V_th, out=self.spike)
+        V = bp.ops.copyto(V, self.V_reset, where=spike)
+        self.V[:] = V
+        self.ref_count = bp.ops.subtract(self.ref_count, refractory, out=self.ref_count)
+        self.ref_count = bp.ops.copyto(self.ref_count, self.ref_steps, where=spike)
+        self.refractory = bp.ops.logical_or(refractory, spike, out=self.refractory)
+        self.input[:] = 0.
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 import brainpy as bp
 
+from ...utils.batch import batch_shape
+from ...utils.dtype import get_dtype
+
 bp.backend.set('numba', dt=0.01)
 
 
@@ -65,6 +68,8 @@ class FiringRateUnit(bp.NeuGroup):
     theta_i       4.             \        I-neurons' sigmoid function phase parameter.
 
     mode          'scalar'       \        Data structure of ST members.
+
+    batch         None           \        Number of the independent trials, or None.
     ============= ============== ======== ========================================================================
 
     **Neuron Variables**    
@@ -109,7 +114,7 @@ class FiringRateUnit(bp.NeuGroup):
     def __init__(self, size, c1=12., c2=4., c3=13., c4=11.,
                  k_e=1., k_i=1., tau_e=1., tau_i=1., r_e=1., r_i=1.,
                  slope_e=1.2, slope_i=1., theta_e=2.8, theta_i=4.,
-                 **kwargs):
+                 batch=None, **kwargs):
         # params
         self.c1 = c1
         self.c2 = c2
@@ -127,10 +132,12 @@ class FiringRateUnit(bp.NeuGroup):
         self.theta_i = theta_i
 
         # vars
-        self.input_e = bp.backend.zeros(size)
-        self.input_i = bp.backend.zeros(size)
-        self.a_e = bp.backend.ones(size) * 0.1
-        self.a_i = bp.backend.ones(size) * 0.05
+        self.batch = batch
+        shape = batch_shape(size, batch)
+        self.input_e = bp.ops.zeros(shape, dtype=get_dtype())
+        self.input_i = bp.ops.zeros(shape, dtype=get_dtype())
+        self.a_e = bp.ops.ones(shape, dtype=get_dtype()) * 0.1
+        self.a_i = bp.ops.ones(shape, dtype=get_dtype()) * 0.05
 
         self.integral = bp.odeint(self.derivative)
         super(FiringRateUnit, self).__init__(size=size, **kwargs)
@@ -2,6 +2,9 @@
 
 import brainpy as bp
 
+from ...utils.batch import batch_shape
+from ...utils.dtype import get_dtype
+
 
 __all__ = [
     'FitzHughNagumo'
@@ -20,17 +23,19 @@ class FitzHughNagumo(bp.NeuGroup):
         dV = V - V * V * V / 3 - w + Iext
         return dV, dw
 
-    def __init__(self, size, a=0.7, b=0.8, tau=12.5, Vth=1.9, **kwargs):
+    def __init__(self, size, a=0.7, b=0.8, tau=12.5, Vth=1.9, batch=None, **kwargs):
         self.a = a
         self.b = b
         self.tau = tau
         self.Vth = Vth
 
         num = bp.size2len(size)
-        self.V = bp.ops.zeros(num)
-        self.w = bp.ops.zeros(num)
-        self.spike = bp.ops.zeros(num, dtype=bool)
-        self.input = bp.ops.zeros(num)
+        self.batch = batch
+        shape = batch_shape(num, batch)
+        self.V = bp.ops.zeros(shape, dtype=get_dtype())
+        self.w = bp.ops.zeros(shape, dtype=get_dtype())
+        self.spike = bp.ops.zeros(shape, dtype=bool)
+        self.input = bp.ops.zeros(shape, dtype=get_dtype())
 
         self.integral = bp.odeint(self.derivative)
         super(FitzHughNagumo, self).__init__(size=size, **kwargs)
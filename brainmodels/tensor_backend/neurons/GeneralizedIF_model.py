@@ -3,6 +3,9 @@
 import brainpy as bp
 import numpy as np
 
+from ...utils.batch import batch_shape
+from ...utils.dtype import get_dtype
+
 
 class GeneralizedIF(bp.NeuGroup):
     """
@@ -74,6 +77,8 @@ class GeneralizedIF(bp.NeuGroup):
     noise         0.             \        noise.
 
     mode          'scalar'       \        Data structure of ST members.
+
+    batch         None           \        Number of the independent trials, or None.
     ============= ============== ======== ====================================================================
 
     **Neuron Variables**    
@@ -122,7 +127,7 @@ class GeneralizedIF(bp.NeuGroup):
                  V_th_inf=-50., V_th_reset=-60., R=20., tau=20.,
                  a=0., b=0.01, k1=0.2, k2=0.02,
                  R1=0., R2=1., A1=0., A2=0.,
-                 **kwargs):
+                 batch=None, **kwargs):
         # params
         self.V_rest = V_rest
         self.V_reset = V_reset
@@ -140,12 +145,14 @@ class GeneralizedIF(bp.NeuGroup):
         self.A2 = A2
 
         # vars
-        self.input = bp.ops.zeros(size)
-        self.spike = bp.ops.zeros(size, dtype=bool)
-        self.I1 = bp.ops.zeros(size)
-        self.I2 = bp.ops.zeros(size)
-        self.V = bp.ops.ones(size) * -70.
-        self.V_th = bp.ops.ones(size) * -50.
+        self.batch = batch
+        shape = batch_shape(size, batch)
+        self.input = bp.ops.zeros(shape, dtype=get_dtype())
+        self.spike = bp.ops.zeros(shape, dtype=bool)
+        self.I1 = bp.ops.zeros(shape, dtype=get_dtype())
+        self.I2 = bp.ops.zeros(shape, dtype=get_dtype())
+        self.V = bp.ops.ones(shape, dtype=get_dtype()) * -70.
+        self.V_th = bp.ops.ones(shape, dtype=get_dtype()) * -50.
 
         self.integral = bp.odeint(self.derivative)
         super(GeneralizedIF, self).__init__(size=size, **kwargs)
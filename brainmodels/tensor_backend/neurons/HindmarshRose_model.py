@@ -2,6 +2,10 @@
 
 import brainpy as bp
 
+from ...utils.batch import batch_shape
+from ...utils.dtype import get_dtype
+
+
 class HindmarshRose(bp.NeuGroup):
     """
     Hindmarsh-Rose neuron model.
@@ -47,6 +51,8 @@ class HindmarshRose(bp.NeuGroup):
     s             4.             \         Model parameter. Governs adaption.
 
     V_rest        -1.6           \         Membrane resting potential.
+
+    batch         None           \         Number of the independent trials, or None.
     ============= ============== ========= ============================================================
 
     **Neuron Variables**
@@ -86,7 +92,7 @@ class HindmarshRose(bp.NeuGroup):
 
     def __init__(self, size, a=1., b=3.,
                  c=1., d=5., r=0.01, s=4.,
-                 V_rest=-1.6, **kwargs):
+                 V_rest=-1.6, batch=None, **kwargs):
         # parameters
         self.a = a
         self.b = b
@@ -97,10 +103,12 @@ class HindmarshRose(bp.NeuGroup):
         self.V_rest = V_rest
 
         # variables
-        self.z = bp.ops.zeros(size)
-        self.input = bp.ops.zeros(size)
-        self.V = bp.ops.ones(size) * -1.6
-        self.y = bp.ops.ones(size) * -10.
+        self.batch = batch
+        shape = batch_shape(size, batch)
+        self.z = bp.ops.zeros(shape, dtype=get_dtype())
+        self.input = bp.ops.zeros(shape, dtype=get_dtype())
+        self.V = bp.ops.ones(shape, dtype=get_dtype()) * -1.6
+        self.y = bp.ops.ones(shape, dtype=get_dtype()) * -10.
 
         self.integral = bp.odeint(self.derivative)
         super(HindmarshRose, self).__init__(size=size, **kwargs)
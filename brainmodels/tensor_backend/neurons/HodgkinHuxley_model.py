@@ -2,6 +2,11 @@
 
 
 import brainpy as bp
+import numpy as np
+
+from ...utils.batch import batch_shape
+from ...utils.dtype import get_dtype
+from ...utils.rate_table import RateTable
 
 __all__ = [
     'HH'
@@ -55,6 +60,15 @@ class HH(bp.NeuGroup):
     noise         0.             \        the noise fluctuation.
 
     mode          'vector'       \        Data structure of ST members.
+
+    rate_table    False          \        Whether to look up the gating rates in a
+                                          precomputed voltage table.
+
+    V_range       (-100., 100.)  mV       Voltage range of the rate table.
+
+    dV            0.01           mV       Voltage resolution of the rate table.
+
+    batch         None           \        Number of the independent trials, or None.
     ============= ============== ======== ====================================
 
     **Neuron Variables**
@@ -108,8 +122,28 @@ class HH(bp.NeuGroup):
 
         return dVdt, dmdt, dhdt, dndt
 
+    @staticmethod
+    def gates(V, dt):
+        """The steady state ``x_inf`` and the exponential Euler decay factor
+        ``exp(-dt * (alpha_x + beta_x))`` of the gates ``x`` in ``m, h, n``,
+        evaluated on the NumPy array ``V`` to build the rate table."""
+        alpha = 0.1 * (V + 40) / -np.expm1(-(V + 40) / 10)
+        beta = 4.0 * np.exp(-(V + 65) / 18)
+        m_inf, m_decay = alpha / (alpha + beta), np.exp(-dt * (alpha + beta))
+
+        alpha = 0.07 * np.exp(-(V + 65) / 20.)
+        beta = 1 / (1 + np.exp(-(V + 35) / 10))
+        h_inf, h_decay = alpha / (alpha + beta), np.exp(-dt * (alpha + beta))
+
+        alpha = 0.01 * (V + 55) / -np.expm1(-(V + 55) / 10)
+        beta = 0.125 * np.exp(-(V + 65) / 80)
+        n_inf, n_decay = alpha / (alpha + beta), np.exp(-dt * (alpha + beta))
+
+        return m_inf, m_decay, h_inf, h_decay, n_inf, n_decay
+
     def __init__(self, size, ENa=50., gNa=120., EK=-77., gK=36.,
-                 EL=-54.387, gL=0.03, V_th=20., C=1.0, **kwargs):
+                 EL=-54.387, gL=0.03, V_th=20., C=1.0, rate_table=False,
+                 V_range=(-100., 100.), dV=0.01, batch=None, **kwargs):
         # parameters
         self.ENa = ENa
         self.EK = EK
@@ -122,15 +156,40 @@ class HH(bp.NeuGroup):
 
         # variables
         num = bp.size2len(size)
-        self.V = -65. * bp.ops.ones(num)
-        self.m = 0.5 * bp.ops.ones(num)
-        self.h = 0.6 * bp.ops.ones(num)
-        self.n = 0.32 * bp.ops.ones(num)
-        self.spike = bp.ops.zeros(num, dtype=bool)
-        self.input = bp.ops.zeros(num)
+        self.batch = batch
+        shape = batch_shape(num, batch)
+        self.V = -65. * bp.ops.ones(shape, dtype=get_dtype())
+        self.m = 0.5 * bp.ops.ones(shape, dtype=get_dtype())
+        self.h = 0.6 * bp.ops.ones(shape, dtype=get_dtype())
+        self.n = 0.32 * bp.ops.ones(shape, dtype=get_dtype())
+        self.spike = bp.ops.zeros(shape, dtype=bool)
+        self.input = bp.ops.zeros(shape, dtype=get_dtype())
 
         # numerical solver
-        self.integral = bp.odeint(f=self.derivative, method='exponential_euler')
+        if rate_table:
+            dt = bp.backend.get_dt()
+            self.rate_table = RateTable(lambda V: self.gates(V, dt), V_range, dV)
+            table = self.rate_table
+
+            def integral(V, m, h, n, t, C, gNa, ENa, gK, EK, gL, EL, Iext):
+                rates = table(V)
+                m_inf, m_decay = rates[..., 0], rates[..., 1]
+                h_inf, h_decay = rates[..., 2], rates[..., 3]
+                n_inf, n_decay = rates[..., 4], rates[..., 5]
+
+                g_Na = gNa * m ** 3.0 * h
+                g_K = gK * n ** 4.0
+                g = g_Na + g_K + gL
+                V_inf = (g_Na * ENa + g_K * EK + gL * EL + Iext) / g
+                V = V_inf + (V - V_inf) * bp.ops.exp(-dt * g / C)
+                m = m_inf + (m - m_inf) * m_decay
+                h = h_inf + (h - h_inf) * h_decay
+                n = n_inf + (n - n_inf) * n_decay
+                return V, m, h, n
+
+            self.integral = integral
+        else:
+            self.integral = bp.odeint(f=self.derivative, method='exponential_euler')
         super(HH, self).__init__(size=size, **kwargs)
 
     def update(self, _t):
@@ -2,6 +2,9 @@
 
 import brainpy as bp
 
+from ...utils.batch import batch_shape
+from ...utils.dtype import get_dtype
+
 __all__ = [
     'Izhikevich'
 ]
@@ -46,6 +49,10 @@ class Izhikevich(bp.NeuGroup):
     t_refractory  0.             ms       Refractory period length. [ms]
 
     V_th          30.            mV       The membrane potential threshold.
+
+    batch         None           \        Number of the independent trials, or None.
+
+    fused         False          \        Update in place with fused operations, see ``update_fused``.
     ============= ============== ======== ================================================================================
 
     **Neuron Variables**
@@ -65,7 +72,7 @@ class Izhikevich(bp.NeuGroup):
 
                                           Can be seen as bool.
 
-    t_last_spike               -1e7       Last spike time stamp.
+    ref_count                  0          Remaining time steps of the refractory period.
     ================== ================= =========================================================
 
     References:
@@ -84,36 +91,79 @@ class Izhikevich(bp.NeuGroup):
         return dVdt, dudt
 
     def __init__(self, size, a=0.02, b=0.20, c=-65., d=8.,
-                 t_refractory=0., V_th=30., **kwargs):
+                 t_refractory=0., V_th=30., batch=None, fused=False, **kwargs):
         # params
         self.a = a
         self.b = b
         self.c = c
         self.d = d
         self.t_refractory = t_refractory
+        self.ref_steps = int(t_refractory / bp.backend.get_dt() + 1e-9)
         self.V_th = V_th
 
         # vars
         num = bp.size2len(size)
-        self.V = bp.ops.ones(num) * -65.
-        self.u = bp.ops.ones(num) * 1.
-        self.input = bp.ops.zeros(num)
-        self.spike = bp.ops.zeros(num, dtype=bool)
-        self.refractory = bp.ops.zeros(num, dtype=bool)
-        self.t_last_spike = bp.ops.ones(num) * -1e7
+        self.batch = batch
+        shape = batch_shape(num, batch)
+        self.V = bp.ops.ones(shape, dtype=get_dtype()) * -65.
+        self.u = bp.ops.ones(shape, dtype=get_dtype()) * 1.
+        self.input = bp.ops.zeros(shape, dtype=get_dtype())
+        self.spike = bp.ops.zeros(shape, dtype=bool)
+        self.refractory = bp.ops.zeros(shape, dtype=bool)
+        self.ref_count = bp.ops.zeros(shape, dtype=bp.ops.int32)
 
         self.integral = bp.odeint(self.derivative)
+        if fused:
+            self.dt = bp.backend.get_dt()
+            self.scratch = bp.ops.zeros(shape, dtype=get_dtype())
+            kwargs.setdefault('steps', self.update_fused)
         super(Izhikevich, self).__init__(size=size, **kwargs)
 
     def update(self, _t):
         V, u = self.integral(self.V, self.u, _t, self.input, self.a, self.b)
-        refractory = (_t - self.t_last_spike) <= self.t_refractory
+        refractory = self.ref_count > 0
         V = bp.ops.where(refractory, self.V, V)
         u = bp.ops.where(refractory, self.u, u)
         spike = self.V_th <= V
-        self.t_last_spike = bp.ops.where(spike, _t, self.t_last_spike)
+        self.ref_count = bp.ops.where(spike, self.ref_steps,
+                                      bp.ops.where(refractory, self.ref_count - 1, 0))
         self.V = bp.ops.where(spike, self.c, V)
         self.u = bp.ops.where(spike, u + self.d, u)
         self.refractory = refractory | spike
         self.input[:] = 0.
         self.spike = spike
+
+    def update_fused(self, _t):
+        """The update in place, with the Euler step.
+
+        The new potential is computed in the ``input`` buffer, and the
+        other intermediate results in the ``scratch`` buffer, so that a
+        step allocates no temporary arrays.
+        """
+        # 0.04 * V ** 2 + 5 * V, as (0.04 * V + 5) * V
+        dV = bp.ops.multiply(self.V, 0.04, out=self.scratch)
+        dV = bp.ops.add(dV, 5., out=dV)
+        dV = bp.ops.multiply(dV, self.V, out=dV)
+        # the new potential, in the input buffer
+        V = bp.ops.add(self.input, dV, out=self.input)
+        V = bp.ops.add(V, 140., out=V)
+        V = bp.ops.subtract(V, self.u, out=V)
+        V = bp.ops.multiply(V, self.dt, out=V)
+        V = bp.ops.add(V, self.V, out=V)
+        # the new recovery variable, in the scratch buffer
+        u = bp.ops.multiply(self.V, self.b, out=self.scratch)
+        u = bp.ops.subtract(u, self.u, out=u)
+        u = bp.ops.multiply(u, self.dt * self.a, out=u)
+        u = bp.ops.add(u, self.u, out=u)
+        refractory = bp.ops.greater_equal(self.ref_count, 1, out=self.refractory)
+        V = bp.ops.copyto(V, self.V, where=refractory)
+        u = bp.ops.copyto(u, self.u, where=refractory)
+        spike = bp.ops.greater_equal(V, self.V_th, out=self.spike)
+        V = bp.ops.copyto(V, self.c, where=spike)
+        self.V[:] = V
+        # u + d at the spikes, with the freed input buffer for the increments
+        self.u[:] = bp.ops.add(u, bp.ops.multiply(spike, self.d, out=self.input), out=u)
+        self.ref_count = bp.ops.subtract(self.ref_count, refractory, out=self.ref_count)
+        self.ref_count = bp.ops.copyto(self.ref_count, self.ref_steps, where=spike)
+        self.refractory = bp.ops.logical_or(refractory, spike, out=self.refractory)
+        self.input[:] = 0.
@@ -2,6 +2,10 @@
 
 import brainpy as bp
 
+from ...utils.batch import batch_shape
+from ...utils.dtype import get_dtype
+from ...utils.propagators import exp_decay
+
 
 class LIF(bp.NeuGroup):
     """
@@ -26,6 +30,12 @@ class LIF(bp.NeuGroup):
     tau           10.            \        Membrane time constant. Compute by R * C.
     
     t_refractory  5.             ms       Refractory period length.(ms)
+
+    method        None           \        Integration method, or 'exact' for the exact propagator.
+
+    batch         None           \        Number of the independent trials, or None.
+
+    fused         False          \        Update in place with fused operations, see ``update_fused``.
     ============= ============== ======== =========================================
     
     **Neuron Variables**    
@@ -47,7 +57,7 @@ class LIF(bp.NeuGroup):
      
                                          Can be seen as bool.
 
-    t_last_spike       -1e7              Last spike time stamp.
+    ref_count          0                 Remaining time steps of the refractory period.
     ================== ================= =========================================================
     
     References:
@@ -63,7 +73,8 @@ class LIF(bp.NeuGroup):
         return dvdt
 
     def __init__(self, size, t_refractory=1., V_rest=0.,
-                 V_reset=-5., V_th=20., R=1., tau=10., **kwargs):
+                 V_reset=-5., V_th=20., R=1., tau=10., method=None, batch=None,
+                 fused=False, **kwargs):
         # parameters
         self.V_rest = V_rest
         self.V_reset = V_reset
@@ -71,26 +82,68 @@ class LIF(bp.NeuGroup):
         self.R = R
         self.tau = tau
         self.t_refractory = t_refractory
+        self.ref_steps = int(t_refractory / bp.backend.get_dt() + 1e-9)
 
         # variables
         num = bp.size2len(size)
-        self.t_last_spike = bp.ops.ones(num) * -1e7
-        self.input = bp.ops.zeros(num)
-        self.V = bp.ops.ones(num) * V_rest
-        self.refractory = bp.ops.zeros(num, dtype=bool)
-        self.spike = bp.ops.zeros(num, dtype=bool)
+        self.batch = batch
+        shape = batch_shape(num, batch)
+        self.ref_count = bp.ops.zeros(shape, dtype=bp.ops.int32)
+        self.input = bp.ops.zeros(shape, dtype=get_dtype())
+        self.V = bp.ops.ones(shape, dtype=get_dtype()) * V_rest
+        self.refractory = bp.ops.zeros(shape, dtype=bool)
+        self.spike = bp.ops.zeros(shape, dtype=bool)
+
+        if method == 'exact':
+            P = exp_decay(tau)
 
-        self.integral = bp.odeint(self.derivative)
+            def integral(V, t, Iext, V_rest, R, tau):
+                return V * P + (V_rest + R * Iext) * (1. - P)
+
+            self.integral = integral
+        else:
+            self.integral = bp.odeint(self.derivative, method=method)
+
+        if fused:
+            if method not in [None, 'euler', 'exact']:
+                raise ValueError(f'Unknown fused integration method "{method}".')
+            # both the Euler and the exact steps are V + (1 - P) * (V_rest + R * I - V)
+            self.P = exp_decay(tau) if method == 'exact' else 1. - bp.backend.get_dt() / tau
+            kwargs.setdefault('steps', self.update_fused)
         super(LIF, self).__init__(size=size, **kwargs)
 
     def update(self, _t):
-        refractory = (_t - self.t_last_spike) <= self.t_refractory
+        refractory = self.ref_count > 0
         V = self.integral(self.V, _t, self.input, self.V_rest, self.R, self.tau)
         V = bp.ops.where(refractory, self.V, V)
         spike = self.V_th <= V
-        self.t_last_spike = bp.ops.where(spike, _t, self.t_last_spike)
+        self.ref_count = bp.ops.where(spike, self.ref_steps,
+                                      bp.ops.where(refractory, self.ref_count - 1, 0))
         self.V = bp.ops.where(spike, self.V_reset, V)
         self.refractory = refractory | spike
         self.input[:] = 0.
         self.spike = spike
 
+    def update_fused(self, _t):
+        """The update in place, with the Euler (or the exact) step.
+
+        The new potential is computed in the ``input`` buffer, which is
+        cleared at the end of the step anyway, and all the other operations
+        write into the state arrays. A step thus allocates no temporary
+        arrays, and passes over the float arrays far less often than
+        :meth:`update`.
+        """
+        V = bp.ops.multiply(self.input, self.R, out=self.input)
+        V = bp.ops.add(V, self.V_rest, out=V)
+        V = bp.ops.subtract(V, self.V, out=V)
+        V = bp.ops.multiply(V, 1. - self.P, out=V)
+        V = bp.ops.add(V, self.V, out=V)
+        refractory = bp.ops.greater_equal(self.ref_count, 1, out=self.refractory)
+        V = bp.ops.copyto(V, self.V, where=refractory)
+        spike = bp.ops.greater_equal(V, self.V_th, out=self.spike)
+        V = bp.ops.copyto(V, self.V_reset, where=spike)
+        self.V[:] = V
+        self.ref_count = bp.ops.subtract(self.ref_count, refractory, out=self.ref_count)
+        self.ref_count = bp.ops.copyto(self.ref_count, self.ref_steps, where=spike)
+        self.refractory = bp.ops.logical_or(refractory, spike, out=self.refractory)
+        self.input[:] = 0.
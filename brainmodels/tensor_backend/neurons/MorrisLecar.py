@@ -3,6 +3,10 @@
 import brainpy as bp
 import numpy as np
 
+from ...utils.batch import batch_shape
+from ...utils.dtype import get_dtype
+from ...utils.rate_table import RateTable
+
 __all__ = [
     'MorrisLecar'
 ]
@@ -37,6 +41,10 @@ class MorrisLecar(bp.NeuGroup):
     V4            30.            \        Reciprocal of slope of voltage dependence of W_inf.(mV)
     phi           0.04           \        A temperature factor.(1/s)
     mode          'vector'       \        Data structure of ST members.
+    rate_table    False          \        Whether to look up M_inf, W_inf and tau_W in a voltage table.
+    V_range       (-100., 150.)  mV       Voltage range of the rate table.
+    dV            0.01           mV       Voltage resolution of the rate table.
+    batch         None           \        Number of the independent trials, or None.
     ============= ============== ======== =======================================================
 
     **Neuron Variables**
@@ -75,9 +83,19 @@ class MorrisLecar(bp.NeuGroup):
         dWdt = (W_inf - W) / tau_W
         return dVdt, dWdt
 
+    @staticmethod
+    def gates(V, V1, V2, V3, V4, phi):
+        """``M_inf``, ``W_inf`` and ``1 / tau_W`` evaluated on the NumPy
+        array ``V`` to build the rate table."""
+        M_inf = (1 / 2) * (1 + np.tanh((V - V1) / V2))
+        W_inf = (1 / 2) * (1 + np.tanh((V - V3) / V4))
+        W_rate = phi * np.cosh((V - V3) / (2 * V4))
+        return M_inf, W_inf, W_rate
+
     def __init__(self, size, V_Ca=130., g_Ca=4.4, V_K=-84., g_K=8.,
                  V_leak=-60., g_leak=2., C=20., V1=-1.2, V2=18.,
-                 V3=2., V4=30., phi=0.04, **kwargs):
+                 V3=2., V4=30., phi=0.04, rate_table=False,
+                 V_range=(-100., 150.), dV=0.01, batch=None, **kwargs):
         # params
         self.V_Ca = V_Ca
         self.g_Ca = g_Ca
@@ -94,11 +112,31 @@ class MorrisLecar(bp.NeuGroup):
 
         # vars
         num = bp.size2len(size)
-        self.input = bp.ops.zeros(num)
-        self.V = bp.ops.ones(num) * -20.
-        self.W = bp.ops.ones(num) * 0.02
-
-        self.integral = bp.odeint(f=self.derivative)
+        self.batch = batch
+        shape = batch_shape(num, batch)
+        self.input = bp.ops.zeros(shape, dtype=get_dtype())
+        self.V = bp.ops.ones(shape, dtype=get_dtype()) * -20.
+        self.W = bp.ops.ones(shape, dtype=get_dtype()) * 0.02
+
+        if rate_table:
+            self.rate_table = RateTable(lambda V: self.gates(V, V1, V2, V3, V4, phi), V_range, dV)
+            table = self.rate_table
+            dt = bp.backend.get_dt()
+
+            def integral(V, W, t, V1, V2, g_Ca, V_Ca, g_K, V_K,
+                         g_leak, V_leak, C, I_ext, phi, V3, V4):
+                rates = table(V)
+                M_inf, W_inf, W_rate = rates[..., 0], rates[..., 1], rates[..., 2]
+                I_Ca = g_Ca * M_inf * (V - V_Ca)
+                I_K = g_K * W * (V - V_K)
+                I_Leak = g_leak * (V - V_leak)
+                dVdt = (- I_Ca - I_K - I_Leak + I_ext) / C
+                dWdt = (W_inf - W) * W_rate
+                return V + dVdt * dt, W + dWdt * dt
+
+            self.integral = integral
+        else:
+            self.integral = bp.odeint(f=self.derivative)
         super(MorrisLecar, self).__init__(size=size, **kwargs)
 
     def update(self, _t):
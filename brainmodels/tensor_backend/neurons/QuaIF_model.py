@@ -2,6 +2,9 @@
 
 import brainpy as bp
 
+from ...utils.batch import batch_shape
+from ...utils.dtype import get_dtype
+
 __all__ = [
     'QuaIF'
 ]
@@ -42,6 +45,10 @@ class QuaIF(bp.NeuGroup):
     noise         0.             \        the noise fluctuation.
 
     mode          'scalar'       \        Data structure of ST members.
+
+    batch         None           \        Number of the independent trials, or None.
+
+    fused         False          \        Update in place with fused operations, see ``update_fused``.
     ============= ============== ======== ========================================================================================================================    
     
     **Neuron Variables**
@@ -63,7 +70,7 @@ class QuaIF(bp.NeuGroup):
      
                                          Can be seen as bool.
                              
-    t_last_spike       -1e7              Last spike time stamp.
+    ref_count          0                 Remaining time steps of the refractory period.
     ================== ================= ===========================================================
     
     References:
@@ -84,7 +91,7 @@ class QuaIF(bp.NeuGroup):
 
     def __init__(self, size, V_rest=-65., V_reset=-68.,
                  V_th=-30., V_c=-50.0, a_0=.07,
-                 R=1., tau=10., t_refractory=0., **kwargs):
+                 R=1., tau=10., t_refractory=0., batch=None, fused=False, **kwargs):
         # parameters
         self.V_rest = V_rest
         self.V_reset = V_reset
@@ -94,27 +101,62 @@ class QuaIF(bp.NeuGroup):
         self.R = R
         self.tau = tau
         self.t_refractory = t_refractory
+        self.ref_steps = int(t_refractory / bp.backend.get_dt() + 1e-9)
 
         # variables
         num = bp.size2len(size)
-        self.V = bp.ops.ones(num) * V_reset
-        self.input = bp.ops.zeros(num)
-        self.spike = bp.ops.zeros(num, dtype=bool)
-        self.refractory = bp.ops.zeros(num, dtype=bool)
-        self.t_last_spike = bp.ops.ones(num) * -1e7
+        self.batch = batch
+        shape = batch_shape(num, batch)
+        self.V = bp.ops.ones(shape, dtype=get_dtype()) * V_reset
+        self.input = bp.ops.zeros(shape, dtype=get_dtype())
+        self.spike = bp.ops.zeros(shape, dtype=bool)
+        self.refractory = bp.ops.zeros(shape, dtype=bool)
+        self.ref_count = bp.ops.zeros(shape, dtype=bp.ops.int32)
 
         self.integral = bp.odeint(f=self.derivative, method='euler')
+        if fused:
+            self.dt = bp.backend.get_dt()
+            self.scratch = bp.ops.zeros(shape, dtype=get_dtype())
+            kwargs.setdefault('steps', self.update_fused)
 
         super(QuaIF, self).__init__(size=size, **kwargs)
 
     def update(self, _t):
-        refractory = (_t - self.t_last_spike) <= self.t_refractory
+        refractory = self.ref_count > 0
         V = self.integral(self.V, _t, self.input, self.V_rest,
                           self.V_c, self.R, self.tau, self.a_0)
         V = bp.ops.where(refractory, self.V, V)
         spike = self.V_th <= V
-        self.t_last_spike = bp.ops.where(spike, _t, self.t_last_spike)
+        self.ref_count = bp.ops.where(spike, self.ref_steps,
+                                      bp.ops.where(refractory, self.ref_count - 1, 0))
         self.V = bp.ops.where(spike, self.V_reset, V)
         self.refractory = refractory | spike
         self.input[:] = 0.
         self.spike = spike
+
+    def update_fused(self, _t):
+        """The update in place, with the Euler step.
+
+        The new potential is computed in the ``input`` buffer, and the
+        other intermediate results in the ``scratch`` buffer, so that a
+        step allocates no temporary arrays.
+        """
+        # a_0 * (V - V_rest) * (V - V_c), as a_0 * ((V - V_rest - V_c) * V + V_rest * V_c)
+        dV = bp.ops.subtract(self.V, self.V_rest + self.V_c, out=self.scratch)
+        dV = bp.ops.multiply(dV, self.V, out=dV)
+        dV = bp.ops.add(dV, self.V_rest * self.V_c, out=dV)
+        dV = bp.ops.multiply(dV, self.a_0, out=dV)
+        # the new potential, in the input buffer
+        V = bp.ops.multiply(self.input, self.R, out=self.input)
+        V = bp.ops.add(V, dV, out=V)
+        V = bp.ops.multiply(V, self.dt / self.tau, out=V)
+        V = bp.ops.add(V, self.V, out=V)
+        refractory = bp.ops.greater_equal(self.ref_count, 1, out=self.refractory)
+        V = bp.ops.copyto(V, self.V, where=refractory)
+        spike = bp.ops.greater_equal(V, self.V_th, out=self.spike)
+        V = bp.ops.copyto(V, self.V_reset, where=spike)
+        self.V[:] = V
+        self.ref_count = bp.ops.subtract(self.ref_count, refractory, out=self.ref_count)
+        self.ref_count = bp.ops.copyto(self.ref_count, self.ref_steps, where=spike)
+        self.refractory = bp.ops.logical_or(refractory, spike, out=self.refractory)
+        self.input[:] = 0.
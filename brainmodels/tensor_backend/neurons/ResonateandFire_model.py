@@ -2,6 +2,9 @@
 
 import brainpy as bp
 
+from ...utils.batch import batch_shape
+from ...utils.dtype import get_dtype
+
 
 class ResonateandFire(bp.NeuGroup):
     """Resonate-and-fire neuron model.
@@ -49,6 +52,8 @@ class ResonateandFire(bp.NeuGroup):
     V_reset       1.             \        Reset value for voltage-like variable after spike.
 
     x_reset       0.             \        Reset value for current-like variable after spike.
+
+    batch         None           \        Number of the independent trials, or None.
     ============= ============== ======== =========================================================
 
     **Neuron Variables**
@@ -87,7 +92,7 @@ class ResonateandFire(bp.NeuGroup):
 
     def __init__(self, size, b=-1., omega=10.,
                  V_th=1., V_reset=1., x_reset=0.,
-                 **kwargs):
+                 batch=None, **kwargs):
         # parameters
         self.b = b
         self.omega = omega
@@ -96,10 +101,12 @@ class ResonateandFire(bp.NeuGroup):
         self.x_reset = x_reset
 
         # variables
-        self.V = bp.ops.zeros(size)
-        self.x = bp.ops.zeros(size)
-        self.input = bp.ops.zeros(size)
-        self.spike = bp.ops.zeros(size, dtype=bool)
+        self.batch = batch
+        shape = batch_shape(size, batch)
+        self.V = bp.ops.zeros(shape, dtype=get_dtype())
+        self.x = bp.ops.zeros(shape, dtype=get_dtype())
+        self.input = bp.ops.zeros(shape, dtype=get_dtype())
+        self.spike = bp.ops.zeros(shape, dtype=bool)
 
         self.integral = bp.odeint(self.derivative)
         super(ResonateandFire, self).__init__(size=size, **kwargs)
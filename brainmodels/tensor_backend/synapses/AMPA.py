@@ -2,6 +2,12 @@
 
 import brainpy as bp
 
+from ...utils.batch import batch_shape, get_batch
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.spike_queue import check_scalar_delay
+from ...utils.storage import get_storage
+
 __all__ = [
     'AMPA1',
     'AMPA2',
@@ -30,6 +36,10 @@ class AMPA1(bp.TwoEndConn):
     E             0.             mV       The reversal potential for the synaptic current. (only for conductance-based model)
 
     mode          'scalar'       \        Data structure of ST members.
+
+    lumped        False          \        Integrate one state per post-synaptic neuron.
+
+    storage       'dense'        \        Synaptic storage layout, 'dense' or 'csr'.
     ============= ============== ======== ===================================================================================
 
 
@@ -60,30 +70,40 @@ class AMPA1(bp.TwoEndConn):
         ds = - s / tau
         return ds
 
-    def __init__(self, pre, post, conn, delay=0., g_max=0.10, E=0., tau=2.0, **kwargs):
+    def __init__(self, pre, post, conn, delay=0., g_max=0.10, E=0., tau=2.0, storage='dense', lumped=False, **kwargs):
         # parameters
         self.g_max = g_max
         self.E = E
         self.tau = tau
-        self.delay = delay
+        self.delay = check_scalar_delay(delay, 'AMPA1')
+        self.lumped = lumped
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.conn_mat = conn.requires('conn_mat')
-        self.size = bp.ops.shape(self.conn_mat)
+        self.conn = build_conn(conn, pre.size, post.size)
+        self.storage = get_storage(self.conn, storage)
+        self.size = self.storage.size
+        self.batch = get_batch(pre, post)
 
         # data
-        self.s = bp.ops.zeros(self.size)
-        self.g = self.register_constant_delay('g', size=self.size, delay_time=delay)
+        self.s = bp.ops.zeros(batch_shape(post.size if lumped else self.size, self.batch), dtype=get_dtype())
+        self.g = self.register_constant_delay('g', size=batch_shape(post.size, self.batch), delay_time=delay)
 
         self.int_s = bp.odeint(f=self.derivative, method='exponential_euler')
+        if lumped:
+            kwargs.setdefault('steps', self.update_lumped)
         super(AMPA1, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
         self.s = self.int_s(self.s, _t, self.tau)
-        self.s += bp.ops.unsqueeze(self.pre.spike, 1) * self.conn_mat
+        self.s[self.storage.pre_events(self.pre.spike)] += 1.
+        self.g.push(self.storage.to_post(self.g_max * self.s))
+        self.post.input -= self.g.pull() * (self.post.V - self.E)
+
+    def update_lumped(self, _t):
+        self.s = self.int_s(self.s, _t, self.tau)
+        self.s += self.storage.events_to_post(self.pre.spike)
         self.g.push(self.g_max * self.s)
-        self.post.input -= bp.ops.sum(self.g.pull(), 0) * (self.post.V - self.E)
+        self.post.input -= self.g.pull() * (self.post.V - self.E)
 
 
 class AMPA2(bp.TwoEndConn):
@@ -113,6 +133,8 @@ class AMPA2(bp.TwoEndConn):
     T_duration    .5             ms       Duration of the neurotransmitter concentration.
 
     mode          'scalar'       \        Data structure of ST members.
+
+    storage       'dense'        \        Synaptic storage layout, 'dense' or 'csr'.
     ============= ============== ======== ================================================    
     
 
@@ -146,9 +168,9 @@ class AMPA2(bp.TwoEndConn):
         return ds
 
     def __init__(self, pre, post, conn, delay=0., g_max=0.42, E=0.,
-                 alpha=0.98, beta=0.18, T=0.5, T_duration=0.5, **kwargs):
+                 alpha=0.98, beta=0.18, T=0.5, T_duration=0.5, storage='dense', **kwargs):
         # parameters
-        self.delay = delay
+        self.delay = check_scalar_delay(delay, 'AMPA2')
         self.g_max = g_max
         self.E = E
         self.alpha = alpha
@@ -157,23 +179,23 @@ class AMPA2(bp.TwoEndConn):
         self.T_duration = T_duration
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.conn_mat = conn.requires('conn_mat')
-        self.size = bp.ops.shape(self.conn_mat)
+        self.conn = build_conn(conn, pre.size, post.size)
+        self.storage = get_storage(self.conn, storage)
+        self.size = self.storage.size
+        self.batch = get_batch(pre, post)
 
         # variables
-        self.s = bp.ops.zeros(self.size)
-        self.g = self.register_constant_delay('g', size=self.size, delay_time=delay)
-        self.t_last_pre_spike = -1e7 * bp.ops.ones(self.size)
+        self.s = bp.ops.zeros(batch_shape(self.size, self.batch), dtype=get_dtype())
+        self.g = self.register_constant_delay('g', size=batch_shape(post.size, self.batch), delay_time=delay)
+        self.t_last_pre_spike = -1e7 * bp.ops.ones(batch_shape(self.size, self.batch))
 
         self.int_s = bp.odeint(f=self.derivative, method='exponential_euler')
         super(AMPA2, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
-        spike = bp.ops.unsqueeze(self.pre.spike, 1) * self.conn_mat
-        self.t_last_pre_spike = bp.ops.where(spike, _t, self.t_last_pre_spike)
-        TT = ((_t - self.t_last_pre_spike) < self.T_duration) * self.T
+        self.t_last_pre_spike[self.storage.pre_events(self.pre.spike)] = _t
+        TT = bp.ops.as_tensor((_t - self.t_last_pre_spike) < self.T_duration, dtype=self.s.dtype) * self.T
         self.s = self.int_s(self.s, _t, TT, self.alpha, self.beta)
-        self.g.push(self.g_max * self.s)
-        self.post.input -= bp.ops.sum(self.g.pull(), 0) * (self.post.V - self.E)
+        self.g.push(self.storage.to_post(self.g_max * self.s))
+        self.post.input -= self.g.pull() * (self.post.V - self.E)
 
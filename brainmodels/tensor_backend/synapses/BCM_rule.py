@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
 import brainpy as bp
 
+from ...utils.batch import batch_shape, get_batch
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.storage import get_storage
+
 __all__ = [
     'BCM'
 ]
@@ -24,6 +29,12 @@ class BCM(bp.TwoEndConn):
 
         r_{\\theta} = < r_i >
 
+    The right-hand side does not depend on :math:`w_{ij}`, so that the
+    weights are advanced exactly by :math:`dt \\frac d{dt} w_{ij}`, which is
+    the outer product of the pre-synaptic rates and a post-synaptic factor.
+    It is written in place into preallocated arrays, without a per-step
+    allocation of the synaptic size.
+
     **Learning Rule Parameters**
     
     ============= ============== ======== ================================
@@ -34,6 +45,8 @@ class BCM(bp.TwoEndConn):
     w_max         2.             \        Maximal possible synapse weight.
 
     w_min         0.             \        Minimal possible synapse weight.
+
+    storage       'dense'        \        Synaptic storage layout, 'dense' or 'csr'.
     ============= ============== ======== ================================
 
     
@@ -43,6 +56,8 @@ class BCM(bp.TwoEndConn):
     **Variables name** **Initial Value** **Explanation**
     ------------------ ----------------- ---------------------------------------------------------
     w                  1.                Synapse weights.
+
+    dw                 0.                Weight change of the last step.
     ================== ================= =========================================================
 
     References:
@@ -58,7 +73,7 @@ class BCM(bp.TwoEndConn):
         dwdt = lr * r_post * (r_post - r_th) * r_pre
         return dwdt
 
-    def __init__(self, pre, post, conn, lr=0.005, w_max=2., w_min=0., **kwargs):
+    def __init__(self, pre, post, conn, lr=0.005, w_max=2., w_min=0., storage='dense', **kwargs):
         # parameters
         self.lr = lr
         self.w_max = w_max
@@ -66,15 +81,15 @@ class BCM(bp.TwoEndConn):
         self.dt = bp.backend._dt
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.conn_mat = conn.requires('conn_mat')
-        self.size = bp.ops.shape(self.conn_mat)
+        self.conn = build_conn(conn, pre.size, post.size)
+        self.storage = get_storage(self.conn, storage)
+        self.size = self.storage.size
+        self.batch = get_batch(pre, post)
 
         # variables
-        self.w = bp.ops.ones(self.size)
-        self.sum_post_r = bp.ops.zeros(post.size[0])
-
-        self.int_w = bp.odeint(f=self.derivative, method='rk4')
+        self.w = self.storage.mask(bp.ops.ones(batch_shape(self.size, self.batch), dtype=get_dtype()))
+        self.dw = bp.ops.zeros(batch_shape(self.size, self.batch), dtype=get_dtype())
+        self.sum_post_r = bp.ops.zeros(batch_shape(post.size[0], self.batch), dtype=get_dtype())
 
         super(BCM, self).__init__(pre=pre, post=post, **kwargs)
 
@@ -83,16 +98,11 @@ class BCM(bp.TwoEndConn):
         self.sum_post_r += self.post.r
         r_th = self.sum_post_r / (_t / self.dt + 1)
 
-        # resize to matrix
-        w = self.w * self.conn_mat
-        dim = self.size
-        r_th = bp.ops.vstack((r_th,) * dim[0])
-        r_post = bp.ops.vstack((self.post.r,) * dim[0])
-        r_pre = bp.ops.vstack((self.pre.r,) * dim[1]).T
-
-        # update w
-        w = self.int_w(w, _t, self.lr, r_pre, r_post, r_th)
-        self.w = bp.ops.clip(w, self.w_min, self.w_max)
+        # update w, dw/dt is the pre-synaptic rate times a post-synaptic factor
+        post_rate = self.dt * self.derivative(1., _t, self.lr, 1., self.post.r, r_th)
+        self.dw = self.storage.outer(self.pre.r, post_rate, self.dw)
+        self.w += self.dw
+        self.w = self.storage.mask(bp.ops.clip(self.w, self.w_min, self.w_max, self.w))
 
         # output
-        self.post.r = bp.ops.sum(w.T * self.pre.r, axis=1)
+        self.post.r = self.storage.weighted_to_post(self.pre.r, self.w)
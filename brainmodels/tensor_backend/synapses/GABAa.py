@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 import brainpy as bp
 
+from ...utils.batch import batch_shape, get_batch
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.spike_queue import check_scalar_delay
+from ...utils.storage import get_storage
+
 __all__ = [
     'GABAa1',
     'GABAa2',
@@ -28,6 +34,10 @@ class GABAa1(bp.TwoEndConn):
     E             -80.           \        Reversal potential of synapse.
 
     tau_decay     6.             ms       Time constant of gating variable decay.
+
+    lumped        False          \        Integrate one state per post-synaptic neuron.
+
+    storage       'dense'        \        Synaptic storage layout, 'dense' or 'csr'.
     ============= ============== ======== =======================================
 
     **Synapse Variables**    
@@ -55,32 +65,43 @@ class GABAa1(bp.TwoEndConn):
         return dsdt
 
     def __init__(self, pre, post, conn, delay=0.,
-                 g_max=0.4, E=-80., tau=6.,
+                 g_max=0.4, E=-80., tau=6., storage='dense', lumped=False,
                  **kwargs):
         # parameters
         self.g_max = g_max
         self.E = E
         self.tau = tau
-        self.delay = delay
+        self.delay = check_scalar_delay(delay, 'GABAa1')
+        self.lumped = lumped
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.conn_mat = conn.requires('conn_mat')
-        self.size = bp.ops.shape(self.conn_mat)
+        self.conn = build_conn(conn, pre.size, post.size)
+        self.storage = get_storage(self.conn, storage)
+        self.size = self.storage.size
+        self.batch = get_batch(pre, post)
 
         # data
-        self.s = bp.ops.zeros(self.size)
-        self.g = self.register_constant_delay('g', size=self.size,
+        self.s = bp.ops.zeros(batch_shape(post.size if lumped else self.size, self.batch), dtype=get_dtype())
+        self.g = self.register_constant_delay('g', size=batch_shape(post.size, self.batch),
                                               delay_time=delay)
 
         self.integral = bp.odeint(f=self.derivative, method='euler')
+        if lumped:
+            kwargs.setdefault('steps', self.update_lumped)
         super(GABAa1, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
         self.s = self.integral(self.s, _t, self.tau)
-        self.s += bp.ops.unsqueeze(self.pre.spike, 1) * self.conn_mat
+        self.s[self.storage.pre_events(self.pre.spike)] += 1.
+        self.g.push(self.storage.to_post(self.g_max * self.s))
+        self.post.input -= self.g.pull() \
+                           * (self.post.V - self.E)
+
+    def update_lumped(self, _t):
+        self.s = self.integral(self.s, _t, self.tau)
+        self.s += self.storage.events_to_post(self.pre.spike)
         self.g.push(self.g_max * self.s)
-        self.post.input -= bp.ops.sum(self.g.pull(), axis=0) \
+        self.post.input -= self.g.pull() \
                            * (self.post.V - self.E)
 
 
@@ -116,6 +137,8 @@ class GABAa2(bp.TwoEndConn):
     T_duration    1.             \        Transmitter concentration duration time
 
                                           after being triggered.
+
+    storage       'dense'        \        Synaptic storage layout, 'dense' or 'csr'.
     ============= ============== ======== =======================================
 
     **Synapse Variables**
@@ -146,8 +169,9 @@ class GABAa2(bp.TwoEndConn):
 
     def __init__(self, pre, post, conn, delay=0.,
                  g_max=0.04, E=-80., alpha=0.53,
-                 beta=0.18, T=1., T_duration=1.,
+                 beta=0.18, T=1., T_duration=1., storage='dense',
                  **kwargs):
+        check_scalar_delay(delay, 'GABAa2')
         self.g_max = g_max
         self.E = E
         self.alpha = alpha
@@ -155,24 +179,23 @@ class GABAa2(bp.TwoEndConn):
         self.T = T
         self.T_duration = T_duration
 
-        self.conn = conn(pre.size, post.size)
-        self.conn_mat = self.conn.requires('conn_mat')
-        self.size = bp.ops.shape(self.conn_mat)
+        self.conn = build_conn(conn, pre.size, post.size)
+        self.storage = get_storage(self.conn, storage)
+        self.size = self.storage.size
+        self.batch = get_batch(pre, post)
 
-        self.s = bp.ops.zeros(self.size)
-        self.g = self.register_constant_delay('g', size=self.size,
+        self.s = bp.ops.zeros(batch_shape(self.size, self.batch), dtype=get_dtype())
+        self.g = self.register_constant_delay('g', size=batch_shape(post.size, self.batch),
                                               delay_time=delay)
-        self.t_last_pre_spike = bp.ops.ones(self.size) * -1e7
+        self.t_last_pre_spike = bp.ops.ones(batch_shape(self.size, self.batch)) * -1e7
 
         self.integral = bp.odeint(f=self.derivative, method='euler')
         super(GABAa2, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
-        spike = bp.ops.unsqueeze(self.pre.spike, 1) * self.conn_mat
-        self.t_last_pre_spike = bp.ops.where(spike, _t,
-                                                 self.t_last_pre_spike)
-        TT = ((_t - self.t_last_pre_spike) < self.T_duration) * self.T
+        self.t_last_pre_spike[self.storage.pre_events(self.pre.spike)] = _t
+        TT = bp.ops.as_tensor((_t - self.t_last_pre_spike) < self.T_duration, dtype=self.s.dtype) * self.T
         self.s = self.integral(self.s, _t, TT, self.alpha, self.beta)
-        self.g.push(self.g_max * self.s)
-        self.post.input -= bp.ops.sum(self.g.pull(), 0) \
+        self.g.push(self.storage.to_post(self.g_max * self.s))
+        self.post.input -= self.g.pull() \
                            * (self.post.V - self.E)
@@ -2,6 +2,12 @@
 
 import brainpy as bp
 
+from ...utils.batch import batch_shape, get_batch
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.spike_queue import check_scalar_delay
+from ...utils.storage import get_storage
+
 __all__ = [
     'GABAb1',
     'GABAb2',
@@ -54,6 +60,8 @@ class GABAb1(bp.TwoEndConn):
     T_duration    0.3            \        Transmitter concentration duration time 
 
                                           after being triggered.
+
+    storage       'dense'        \        Synaptic storage layout, 'dense' or 'csr'.
     ============= ============== ======== ============================================================================
 
     **Synapse Variables**    
@@ -88,7 +96,7 @@ class GABAb1(bp.TwoEndConn):
     def __init__(self, pre, post, conn, delay=0.,
                  g_max=0.02, E=-95., k1=0.18, k2=0.034,
                  k3=0.09, k4=0.0012, kd=100.,
-                 T=0.5, T_duration=0.3, **kwargs):
+                 T=0.5, T_duration=0.3, storage='dense', **kwargs):
         self.g_max = g_max
         self.E = E
         self.k1 = k1
@@ -98,32 +106,32 @@ class GABAb1(bp.TwoEndConn):
         self.kd = kd
         self.T = T
         self.T_duration = T_duration
-        self.delay = delay
+        self.delay = check_scalar_delay(delay, 'GABAb1')
 
-        self.conn = conn(pre.size, post.size)
-        self.conn_mat = self.conn.requires('conn_mat')
-        self.size = bp.ops.shape(self.conn_mat)
+        self.conn = build_conn(conn, pre.size, post.size)
+        self.storage = get_storage(self.conn, storage)
+        self.size = self.storage.size
+        self.batch = get_batch(pre, post)
 
-        self.R = bp.ops.zeros(self.size)
-        self.G = bp.ops.zeros(self.size)
-        self.s = bp.ops.zeros(self.size)
-        self.g = self.register_constant_delay('g', size=self.size, delay_time=delay)
-        self.t_last_pre_spike = bp.ops.ones(self.size) * -1e7
+        self.R = bp.ops.zeros(batch_shape(self.size, self.batch), dtype=get_dtype())
+        self.G = bp.ops.zeros(batch_shape(self.size, self.batch), dtype=get_dtype())
+        self.s = bp.ops.zeros(batch_shape(self.size, self.batch), dtype=get_dtype())
+        self.g = self.register_constant_delay('g', size=batch_shape(post.size, self.batch), delay_time=delay)
+        self.t_last_pre_spike = bp.ops.ones(batch_shape(self.size, self.batch)) * -1e7
 
         self.integral = bp.odeint(f=self.derivative, method='euler')
         super(GABAb1, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
-        spike = bp.ops.unsqueeze(self.pre.spike, 1) * self.conn_mat
-        self.t_last_pre_spike = bp.ops.where(spike, _t, self.t_last_pre_spike)
-        TT = ((_t - self.t_last_pre_spike) < self.T_duration) * self.T
+        self.t_last_pre_spike[self.storage.pre_events(self.pre.spike)] = _t
+        TT = bp.ops.as_tensor((_t - self.t_last_pre_spike) < self.T_duration, dtype=self.s.dtype) * self.T
         self.G, self.R = self.integral(
             self.G, self.R, _t,
             self.k1, self.k2,
             self.k2, self.k4, TT)
         self.s = self.G ** 4 / (self.G ** 4 + self.kd)
-        self.g.push(self.g_max * self.s)
-        self.post.input -= bp.ops.sum(self.g.pull(), 0) * (self.post.V - self.E)
+        self.g.push(self.storage.to_post(self.g_max * self.s))
+        self.post.input -= self.g.pull() * (self.post.V - self.E)
 
 
 class GABAb2(bp.TwoEndConn):
@@ -186,6 +194,8 @@ class GABAb2(bp.TwoEndConn):
     T_duration    0.5            \        Transmitter concentration duration time
 
                                           after being triggered.
+
+    storage       'dense'        \        Synaptic storage layout, 'dense' or 'csr'.
     ============= ============== ======== ============================================================================
 
     **Synapse Variables**
@@ -225,8 +235,9 @@ class GABAb2(bp.TwoEndConn):
     def __init__(self, pre, post, conn, delay=0.,
                  g_max=0.02, E=-95., k1=0.66, k2=0.02,
                  k3=0.0053, k4=0.017, k5=8.3e-5, k6=7.9e-3,
-                 kd=100., T=0.5, T_duration=0.5,
+                 kd=100., T=0.5, T_duration=0.5, storage='dense',
                  **kwargs):
+        check_scalar_delay(delay, 'GABAb2')
         # params
         self.g_max = g_max
         self.E = E
@@ -241,29 +252,29 @@ class GABAb2(bp.TwoEndConn):
         self.T_duration = T_duration
 
         # conns
-        self.conn = conn(pre.size, post.size)
-        self.conn_mat = conn.requires('conn_mat')
-        self.size = bp.ops.shape(self.conn_mat)
+        self.conn = build_conn(conn, pre.size, post.size)
+        self.storage = get_storage(self.conn, storage)
+        self.size = self.storage.size
+        self.batch = get_batch(pre, post)
 
         # vars
-        self.D = bp.ops.zeros(self.size)
-        self.R = bp.ops.zeros(self.size)
-        self.G = bp.ops.zeros(self.size)
-        self.s = bp.ops.zeros(self.size)
-        self.g = self.register_constant_delay('g', size=self.size, delay_time=delay)
-        self.t_last_pre_spike = bp.ops.ones(self.size) * -1e7
+        self.D = bp.ops.zeros(batch_shape(self.size, self.batch), dtype=get_dtype())
+        self.R = bp.ops.zeros(batch_shape(self.size, self.batch), dtype=get_dtype())
+        self.G = bp.ops.zeros(batch_shape(self.size, self.batch), dtype=get_dtype())
+        self.s = bp.ops.zeros(batch_shape(self.size, self.batch), dtype=get_dtype())
+        self.g = self.register_constant_delay('g', size=batch_shape(post.size, self.batch), delay_time=delay)
+        self.t_last_pre_spike = bp.ops.ones(batch_shape(self.size, self.batch)) * -1e7
 
         self.integral = bp.odeint(f=self.derivative, method='euler')
         super(GABAb2, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
-        spike = bp.ops.unsqueeze(self.pre.spike, 1) * self.conn_mat
-        self.t_last_pre_spike = bp.ops.where(spike, _t, self.t_last_pre_spike)
-        TT = ((_t - self.t_last_pre_spike) < self.T_duration) * self.T
+        self.t_last_pre_spike[self.storage.pre_events(self.pre.spike)] = _t
+        TT = bp.ops.as_tensor((_t - self.t_last_pre_spike) < self.T_duration, dtype=self.s.dtype) * self.T
         self.R, self.D, self.G = self.integral(
             self.R, self.D, self.G, _t,
             self.k1, self.k2, self.k3, TT,
             self.k4, self.k5, self.k6)
         self.s = (self.G ** 4 / (self.G ** 4 + self.kd))
-        self.g.push(self.g_max * self.s)
-        self.post.input -= bp.ops.sum(self.g.pull(), axis=0) * (self.post.V - self.E)
+        self.g.push(self.storage.to_post(self.g_max * self.s))
+        self.post.input -= self.g.pull() * (self.post.V - self.E)
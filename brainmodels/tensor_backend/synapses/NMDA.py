@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 import brainpy as bp
 
+from ...utils.batch import batch_shape, get_batch
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.spike_queue import check_scalar_delay
+from ...utils.storage import get_storage
+
 __all__ = [
     'NMDA'
 ]
@@ -49,6 +55,8 @@ class NMDA(bp.TwoEndConn):
     a             .5             1/ms 
 
     mode          'scalar'       \               Data structure of ST members.
+
+    storage       'dense'        \        Synaptic storage layout, 'dense' or 'csr'.
     ============= ============== =============== ================================================    
     
     
@@ -84,7 +92,7 @@ class NMDA(bp.TwoEndConn):
         return dsdt, dxdt
 
     def __init__(self, pre, post, conn, delay=0., g_max=0.15, E=0., cc_Mg=1.2,
-                 alpha=0.062, beta=3.57, tau=100, a=0.5, tau_rise=2., **kwargs):
+                 alpha=0.062, beta=3.57, tau=100, a=0.5, tau_rise=2., storage='dense', **kwargs):
         # parameters
         self.g_max = g_max
         self.E = E
@@ -94,27 +102,28 @@ class NMDA(bp.TwoEndConn):
         self.tau = tau
         self.tau_rise = tau_rise
         self.a = a
-        self.delay = delay
+        self.delay = check_scalar_delay(delay, 'NMDA')
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.conn_mat = conn.requires('conn_mat')
-        self.size = bp.ops.shape(self.conn_mat)
+        self.conn = build_conn(conn, pre.size, post.size)
+        self.storage = get_storage(self.conn, storage)
+        self.size = self.storage.size
+        self.batch = get_batch(pre, post)
 
         # variables
-        self.s = bp.ops.zeros(self.size)
-        self.x = bp.ops.zeros(self.size)
-        self.g = self.register_constant_delay('g', size=self.size, delay_time=delay)
+        self.s = bp.ops.zeros(batch_shape(self.size, self.batch), dtype=get_dtype())
+        self.x = bp.ops.zeros(batch_shape(self.size, self.batch), dtype=get_dtype())
+        self.g = self.register_constant_delay('g', size=batch_shape(post.size, self.batch), delay_time=delay)
 
         self.integral = bp.odeint(f=self.derivative, method='euler')
 
         super(NMDA, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
-        self.x += bp.ops.unsqueeze(self.pre.spike, 1) * self.conn_mat
+        self.x[self.storage.pre_events(self.pre.spike)] += 1.
         self.s, self.x = self.integral(self.s, self.x, _t, self.tau_rise, self.tau, self.a)
 
-        self.g.push(self.g_max * self.s)
+        self.g.push(self.storage.to_post(self.g_max * self.s))
         g_inf = 1 + self.cc_Mg / self.beta * bp.ops.exp(-self.alpha * self.post.V)
         g_inf = 1 / g_inf
-        self.post.input -= bp.ops.sum(self.g.pull(), axis=0) * (self.post.V - self.E) * g_inf
+        self.post.input -= self.g.pull() * (self.post.V - self.E) * g_inf
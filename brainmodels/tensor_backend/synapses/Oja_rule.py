@@ -1,9 +1,60 @@
 # -*- coding: utf-8 -*-
 import brainpy as bp
-import numpy as np
+
+from ...utils.batch import batch_shape, get_batch
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.spike_queue import check_scalar_delay
+from ...utils.storage import get_storage
 
 
 class Oja(bp.TwoEndConn):
+    """
+    Oja's rule.
+
+    .. math::
+
+        r_i = \\sum_j w_{ij} r_j
+
+        \\frac d{dt} w_{ij} = \\gamma (r_i r_j - r_i^2 w_{ij})
+
+    The right-hand side is linear in :math:`w_{ij}`, so that one step of
+    the integrator is :math:`w_{ij} \\leftarrow a_i w_{ij} + b_i r_j`, where
+    the factors :math:`a_i` and :math:`b_i` only depend on the post-synaptic
+    rate. The weights are updated in place with these factors, without a
+    per-step allocation of the synaptic size. ``method='exact'`` uses the
+    closed-form factors :math:`a_i = e^{-\\gamma r_i^2 dt}` and
+    :math:`b_i = (1 - a_i) / r_i`.
+
+    **Learning Rule Parameters**
+
+    ============= ============== ======== ================================================================
+    **Parameter** **Init Value** **Unit** **Explanation**
+    ------------- -------------- -------- ----------------------------------------------------------------
+    gamma         0.005          \        Learning rate.
+
+    storage       'dense'        \        Synaptic storage layout, 'dense' or 'csr'.
+
+    method        'euler'        \        Integration method, or 'exact'.
+
+    ============= ============== ======== ================================================================
+
+    **Learning Rule Variables**
+
+    ================== ================= =========================================================
+    **Variables name** **Initial Value** **Explanation**
+    ------------------ ----------------- ---------------------------------------------------------
+    w                  0.05              Synapse weights.
+
+    dw                 0.                Weight increment of the last step.
+    ================== ================= =========================================================
+
+    References:
+        .. [1] Oja, Erkki. "Simplified neuron model as a principal
+               component analyzer." Journal of mathematical biology
+               15.3 (1982): 267-273.
+    """
+
     target_backend = 'general'
 
     @staticmethod
@@ -12,8 +63,9 @@ class Oja(bp.TwoEndConn):
         return dwdt
 
     def __init__(self, pre, post, conn, delay=0.,
-                 gamma=0.005, w_max=1., w_min=0.,
-                 **kwargs):
+                 gamma=0.005, w_max=1., w_min=0., storage='dense',
+                 method='euler', **kwargs):
+        check_scalar_delay(delay, 'Oja')
         # params
         self.gamma = gamma
         self.w_max = w_max
@@ -21,20 +73,40 @@ class Oja(bp.TwoEndConn):
         # no delay in firing rate models
 
         # conns
-        self.conn = conn(pre.size, post.size)
-        self.conn_mat = conn.requires('conn_mat')
-        self.size = bp.ops.shape(self.conn_mat)
+        self.conn = build_conn(conn, pre.size, post.size)
+        self.storage = get_storage(self.conn, storage)
+        self.size = self.storage.size
+        self.batch = get_batch(pre, post)
 
         # data
-        self.w = bp.ops.ones(self.size) * 0.05
+        self.w = self.storage.mask(bp.ops.ones(batch_shape(self.size, self.batch), dtype=get_dtype()) * 0.05)
+        self.dw = bp.ops.zeros(batch_shape(self.size, self.batch), dtype=get_dtype())
+
+        if method == 'exact':
+            dt = bp.backend.get_dt()
+
+            def integral(t, gamma, r_post):
+                x = gamma * r_post * r_post * dt
+                decay = bp.ops.exp(-x)
+                # 1 - decay is zero where r_post is zero
+                rate = -bp.ops.expm1(-x) / bp.ops.where(r_post == 0., 1., r_post)
+                return decay, rate
+
+        else:
+            int_w = bp.odeint(f=self.derivative, method=method)
+
+            def integral(t, gamma, r_post):
+                # the step is affine in w and in r_pre
+                decay = int_w(1., t, gamma, 0., r_post)
+                rate = int_w(0., t, gamma, 1., r_post)
+                return decay, rate
 
-        self.integral = bp.odeint(f=self.derivative)
+        self.integral = integral
         super(Oja, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
-        self.post.r = np.dot(self.pre.r, self.conn_mat * self.w)
-        pre_mat_expand = np.expand_dims(self.pre.r, axis=1) \
-            .repeat(self.post.r.shape[0], axis=1)
-        post_mat_expand = np.expand_dims(self.post.r, axis=1) \
-            .reshape(1, -1).repeat(self.pre.r.shape[0], axis=0)
-        self.w = self.integral(self.w, _t, self.gamma, pre_mat_expand, post_mat_expand)
+        self.post.r = self.storage.weighted_to_post(self.pre.r, self.w)
+        decay, rate = self.integral(_t, self.gamma, self.post.r)
+        self.w = self.storage.scale_post(self.w, decay)
+        self.dw = self.storage.outer(self.pre.r, rate, self.dw)
+        self.w += self.dw
@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
 import brainpy as bp
 
+from ...utils.batch import batch_shape, get_batch
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.propagators import exp_decay
+from ...utils.spike_queue import check_scalar_delay
+from ...utils.storage import get_storage
+
 __all__ = [
     'STDP'
 ]
@@ -34,6 +41,14 @@ class STDP(bp.TwoEndConn):
 
         w&= min([w+A_{source}]^+, w_{max})
 
+    The traces of all the synapses of a pre-synaptic neuron are equal, and so
+    are those of a post-synaptic neuron, so that :math:`A_{source}` is stored
+    per pre-synaptic neuron and :math:`A_{target}` per post-synaptic neuron.
+    :math:`s` is summed over the synapses of each post-synaptic neuron. The
+    weights are only updated at the synapses of the spiking neurons, so that
+    the cost of each step scales with the number of spikes times their
+    fan-out, instead of with the number of synapses.
+
     **Learning Rule Parameters**
 
     ============= ============== ======== =================================================================
@@ -61,6 +76,10 @@ class STDP(bp.TwoEndConn):
 
                                           a target neuron spike.
 
+    storage       'dense'        \        Synaptic storage layout, 'dense' or 'csr'.
+
+    method        \              \        Integration method, 'exponential_euler' by default, or 'exact'.
+
     ============= ============== ======== =================================================================
 
     **Synapse Variables**
@@ -70,11 +89,11 @@ class STDP(bp.TwoEndConn):
     ================== ================= =========================================================
     **Variables name** **Initial Value** **Explanation**
     ------------------ ----------------- ---------------------------------------------------------
-    A_s                0.                Source neuron trace.
+    A_s                0.                Source neuron trace, of each pre-synaptic neuron.
 
-    A_t                0.                Target neuron trace.
+    A_t                0.                Target neuron trace, of each post-synaptic neuron.
 
-    s                  0.                Gating variable on post-synaptic neuron.
+    s                  0.                Gating variable, of each post-synaptic neuron.
 
     w                  0.                Synapse weight.
     ================== ================= =========================================================
@@ -96,7 +115,7 @@ class STDP(bp.TwoEndConn):
 
     def __init__(self, pre, post, conn, delay=0.,
                  delta_A_s=0.5, delta_A_t=0.5, w_min=0., w_max=20.,
-                 tau_s=10., tau_t=10., tau=10., **kwargs):
+                 tau_s=10., tau_t=10., tau=10., storage='dense', method='exponential_euler', **kwargs):
         # parameters
         self.tau_s = tau_s
         self.tau_t = tau_t
@@ -105,21 +124,30 @@ class STDP(bp.TwoEndConn):
         self.delta_A_t = delta_A_t
         self.w_min = w_min
         self.w_max = w_max
-        self.delay = delay
+        self.delay = check_scalar_delay(delay, 'STDP')
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.conn_mat = conn.requires('conn_mat')
-        self.size = bp.ops.shape(self.conn_mat)
+        self.conn = build_conn(conn, pre.size, post.size)
+        self.storage = get_storage(self.conn, storage)
+        self.size = self.storage.size
+        self.batch = get_batch(pre, post)
 
         # variables
-        self.s = bp.ops.zeros(self.size)
-        self.A_s = bp.ops.zeros(self.size)
-        self.A_t = bp.ops.zeros(self.size)
-        self.w = bp.ops.ones(self.size) * 1.
-        self.I_syn = self.register_constant_delay('I_syn', size=self.size, delay_time=delay)
+        self.s = bp.ops.zeros(batch_shape(post.size, self.batch), dtype=get_dtype())
+        self.A_s = bp.ops.zeros(batch_shape(pre.size, self.batch), dtype=get_dtype())
+        self.A_t = bp.ops.zeros(batch_shape(post.size, self.batch), dtype=get_dtype())
+        self.w = bp.ops.ones(batch_shape(self.size, self.batch), dtype=get_dtype()) * 1.
+        self.I_syn = self.register_constant_delay('I_syn', size=batch_shape(post.size, self.batch), delay_time=delay)
 
-        self.integral = bp.odeint(f=self.derivative, method='exponential_euler')
+        if method == 'exact':
+            P, P_s, P_t = exp_decay(tau), exp_decay(tau_s), exp_decay(tau_t)
+
+            def integral(s, A_s, A_t, t, tau, tau_s, tau_t):
+                return s * P, A_s * P_s, A_t * P_t
+
+            self.integral = integral
+        else:
+            self.integral = bp.odeint(f=self.derivative, method=method)
 
         super(STDP, self).__init__(pre=pre, post=post, **kwargs)
 
@@ -128,19 +156,23 @@ class STDP(bp.TwoEndConn):
                                     _t, self.tau, self.tau_s, self.tau_t)
         w = self.w
 
-        pre_spike_map = bp.ops.unsqueeze(self.pre.spike, 1) * self.conn_mat
-        s += w * pre_spike_map
-        A_s += self.delta_A_s * pre_spike_map
-        w -= A_t * pre_spike_map
+        pre_syn = self.storage.pre_events(self.pre.spike)
+        s += self.storage.events_to_post(self.pre.spike, w)
+        A_s += self.delta_A_s * self.pre.spike
+        w[pre_syn] -= A_t[self.storage.post_index(pre_syn)]
+
+        post_syn = self.storage.post_events(self.post.spike)
+        A_t += self.delta_A_t * self.post.spike
+        w[post_syn] += A_s[self.storage.pre_index(post_syn)]
 
-        post_spike_map = bp.ops.unsqueeze(self.post.spike, 0) * self.conn_mat
-        A_t += self.delta_A_t * post_spike_map
-        w += A_s * post_spike_map
+        # only the updated weights can leave the bounds
+        w[pre_syn] = bp.ops.clip(w[pre_syn], self.w_min, self.w_max)
+        w[post_syn] = bp.ops.clip(w[post_syn], self.w_min, self.w_max)
 
         self.A_s = A_s
         self.A_t = A_t
-        self.w = bp.ops.clip(w, self.w_min, self.w_max)
+        self.w = w
         self.s = s
 
         self.I_syn.push(self.s)
-        self.post.input += bp.ops.sum(self.I_syn.pull(), axis=0)
+        self.post.input += self.I_syn.pull()
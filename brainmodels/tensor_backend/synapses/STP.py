@@ -1,5 +1,13 @@
 # -*- coding: utf-8 -*-
 import brainpy as bp
+import numpy as np
+
+from ...utils.batch import batch_shape, get_batch
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.propagators import exp_decay
+from ...utils.spike_queue import SpikeQueue
+from ...utils.storage import event_values, get_storage
 
 __all__ = [
     'STP'
@@ -31,6 +39,10 @@ class STP(bp.TwoEndConn):
     by total release of all the neurotransmitter (:math:`u=x=1`), called
     absolute synaptic efficacy of the connections.
 
+    With the heterogeneous delays of the synapses, the spikes are queued,
+    and :math:`u` and :math:`x` of a synapse are updated when its spike
+    arrives, which gives the same current as delaying the output.
+
 
     **Synapse Parameters**
 
@@ -43,7 +55,15 @@ class STP(bp.TwoEndConn):
 
     U             .15            \        The increment of :math:`u` produced by a spike.
 
+    delay         0.             ms       Synaptic delay, or an array of the delays of the synapses
+
+                                          in the connector order, which are queued as spike events.
+
     mode          'scalar'       \        Data structure of ST members.
+
+    storage       'dense'        \        Synaptic storage layout, 'dense' or 'csr'.
+
+    method        \              \        Integration method, 'exponential_euler' by default, or 'exact'.
     ============= ============== ======== ===========================================    
     
     **Synapse Variables**
@@ -77,7 +97,7 @@ class STP(bp.TwoEndConn):
         dxdt = (1 - x) / tau_d
         return dsdt, dudt, dxdt
 
-    def __init__(self, pre, post, conn, delay=0., U=0.15, tau_f=1500., tau_d=200., tau=8., **kwargs):
+    def __init__(self, pre, post, conn, delay=0., U=0.15, tau_f=1500., tau_d=200., tau=8., storage='dense', method='exponential_euler', **kwargs):
         # parameters
         self.tau_d = tau_d
         self.tau_f = tau_f
@@ -86,31 +106,51 @@ class STP(bp.TwoEndConn):
         self.delay = delay
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.conn_mat = conn.requires('conn_mat')
-        self.size = bp.ops.shape(self.conn_mat)
+        self.conn = build_conn(conn, pre.size, post.size)
+        self.storage = get_storage(self.conn, storage)
+        self.size = self.storage.size
+        self.batch = get_batch(pre, post)
+
+        # heterogeneous delays
+        if np.ndim(delay) > 0:
+            if self.batch is not None:
+                raise ValueError('Heterogeneous delays do not support the trial axis.')
+            self.queue = SpikeQueue(self.conn.requires('pre_ids'), delay, self.conn.num_pre,
+                                    index=self.storage.conn_index(self.conn))
+            delay = 0.
+        else:
+            self.queue = None
 
         # variables
-        self.s = bp.ops.zeros(self.size)
-        self.x = bp.ops.ones(self.size)
-        self.u = bp.ops.zeros(self.size)
-        self.w = bp.ops.ones(self.size)
-        self.I_syn = self.register_constant_delay('I_syn', size=self.size, delay_time=delay)
+        self.s = bp.ops.zeros(batch_shape(self.size, self.batch), dtype=get_dtype())
+        self.x = bp.ops.ones(batch_shape(self.size, self.batch), dtype=get_dtype())
+        self.u = bp.ops.zeros(batch_shape(self.size, self.batch), dtype=get_dtype())
+        self.w = bp.ops.ones(self.size, dtype=get_dtype())
+        self.I_syn = self.register_constant_delay('I_syn', size=batch_shape(post.size, self.batch), delay_time=delay)
+
+        if method == 'exact':
+            P, P_d, P_f = exp_decay(tau), exp_decay(tau_d), exp_decay(tau_f)
+
+            def integral(s, u, x, t, tau, tau_d, tau_f):
+                return s * P, u * P_f, 1. + (x - 1.) * P_d
 
-        self.integral = bp.odeint(f=self.derivative, method='exponential_euler')
+            self.integral = integral
+        else:
+            self.integral = bp.odeint(f=self.derivative, method=method)
 
         super(STP, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
         self.s, u, x = self.integral(self.s, self.u, self.x, _t, self.tau, self.tau_d, self.tau_f)
 
-        pre_spike_map = bp.ops.unsqueeze(self.pre.spike, 1) * self.conn_mat
-        u += self.U * (1 - self.u) * pre_spike_map
-        self.s += self.w * u * self.x * pre_spike_map
-        x -= u * self.x * pre_spike_map
+        events = self.storage if self.queue is None else self.queue
+        syn = events.pre_events(self.pre.spike)
+        u[syn] += self.U * (1 - self.u[syn])
+        self.s[syn] += event_values(self.w, syn) * u[syn] * self.x[syn]
+        x[syn] -= u[syn] * self.x[syn]
 
         self.u = u
         self.x = x
 
-        self.I_syn.push(self.s)
-        self.post.input += bp.ops.sum(self.I_syn.pull(), axis=0)
+        self.I_syn.push(self.storage.to_post(self.s))
+        self.post.input += self.I_syn.pull()
@@ -1,6 +1,13 @@
 # -*- coding: utf-8 -*-
 import brainpy as bp
 
+from ...utils.batch import batch_shape, get_batch
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.propagators import linear_propagator
+from ...utils.spike_queue import check_scalar_delay
+from ...utils.storage import get_storage
+
 __all__ = [
     'Alpha'
 ]
@@ -30,6 +37,12 @@ class Alpha(bp.TwoEndConn):
     co_base       False          \        Whether to return Conductance-based model. If False: return current-based model.
 
     mode          'scalar'       \        Data structure of ST members.
+
+    lumped        False          \        Integrate one state per post-synaptic neuron.
+
+    storage       'dense'        \        Synaptic storage layout, 'dense' or 'csr'.
+
+    method        'euler'        \        Integration method, or 'exact' for the exact propagator.
     ============= ============== ======== ===================================================================================  
 
 
@@ -59,28 +72,46 @@ class Alpha(bp.TwoEndConn):
         dsdt = x
         return dsdt, dxdt
 
-    def __init__(self, pre, post, conn, delay=0., tau=2.0, **kwargs):
+    def __init__(self, pre, post, conn, delay=0., tau=2.0, storage='dense', lumped=False, method='euler', **kwargs):
         # parameters
         self.tau = tau
-        self.delay = delay
+        self.delay = check_scalar_delay(delay, 'Alpha')
+        self.lumped = lumped
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.conn_mat = conn.requires('conn_mat')
-        self.size = bp.ops.shape(self.conn_mat)
+        self.conn = build_conn(conn, pre.size, post.size)
+        self.storage = get_storage(self.conn, storage)
+        self.size = self.storage.size
+        self.batch = get_batch(pre, post)
 
         # variables
-        self.s = bp.ops.zeros(self.size)
-        self.x = bp.ops.zeros(self.size)
+        self.s = bp.ops.zeros(batch_shape(post.size if lumped else self.size, self.batch), dtype=get_dtype())
+        self.x = bp.ops.zeros(batch_shape(post.size if lumped else self.size, self.batch), dtype=get_dtype())
 
-        self.w = bp.ops.ones(self.size) * .2
-        self.I_syn = self.register_constant_delay('I_syn', size=self.size, delay_time=delay)
+        self.w = bp.ops.ones(self.size, dtype=get_dtype()) * .2
+        self.I_syn = self.register_constant_delay('I_syn', size=batch_shape(post.size, self.batch), delay_time=delay)
 
-        self.integral = bp.odeint(f=self.derivative, method='euler')
+        if method == 'exact':
+            (P_ss, P_sx), (P_xs, P_xx) = linear_propagator([[0., 1.], [-1. / tau ** 2, -2. / tau]])
+
+            def integral(s, x, t, tau):
+                return P_ss * s + P_sx * x, P_xs * s + P_xx * x
+
+            self.integral = integral
+        else:
+            self.integral = bp.odeint(f=self.derivative, method=method)
+        if lumped:
+            kwargs.setdefault('steps', self.update_lumped)
         super(Alpha, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
         self.s, self.x = self.integral(self.s, self.x, _t, self.tau)
-        self.x += bp.ops.unsqueeze(self.pre.spike, 1) * self.conn_mat
-        self.I_syn.push(self.w * self.s)
-        self.post.input += bp.ops.sum(self.I_syn.pull(), axis=0)
+        self.x[self.storage.pre_events(self.pre.spike)] += 1.
+        self.I_syn.push(self.storage.to_post(self.w * self.s))
+        self.post.input += self.I_syn.pull()
+
+    def update_lumped(self, _t):
+        self.s, self.x = self.integral(self.s, self.x, _t, self.tau)
+        self.x += self.storage.events_to_post(self.pre.spike, self.w)
+        self.I_syn.push(self.s)
+        self.post.input += self.I_syn.pull()
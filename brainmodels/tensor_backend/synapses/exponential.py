@@ -1,5 +1,13 @@
 # -*- coding: utf-8 -*-
 import brainpy as bp
+import numpy as np
+
+from ...utils.batch import batch_shape, get_batch
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.propagators import exp_decay
+from ...utils.spike_queue import SpikeQueue
+from ...utils.storage import get_storage
 
 __all__ = [
     'Exponential'
@@ -21,6 +29,16 @@ class Exponential(bp.TwoEndConn):
     ------------- -------------- -------- -----------------------------------------------------------------------------------
     tau_decay     8.             ms       The time constant of decay.
 
+    delay         0.             ms       Synaptic delay, or an array of the delays of the synapses
+
+                                          in the connector order, which are queued as spike events.
+
+    lumped        False          \        Integrate one state per post-synaptic neuron.
+
+    storage       'dense'        \        Synaptic storage layout, 'dense' or 'csr'.
+
+    method        \              \        Integration method, 'exponential_euler' by default, or 'exact'.
+
     ============= ============== ======== ===================================================================================  
     
     **Synapse Variables**
@@ -49,27 +67,60 @@ class Exponential(bp.TwoEndConn):
         ds = -s / tau
         return ds
 
-    def __init__(self, pre, post, conn, delay=0., tau=8.0, **kwargs):
+    def __init__(self, pre, post, conn, delay=0., tau=8.0, storage='dense', lumped=False, method='exponential_euler', **kwargs):
         # parameters
         self.tau = tau
         self.delay = delay
+        self.lumped = lumped
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.conn_mat = conn.requires('conn_mat')
-        self.size = bp.ops.shape(self.conn_mat)
+        self.conn = build_conn(conn, pre.size, post.size)
+        self.storage = get_storage(self.conn, storage)
+        self.size = self.storage.size
+        self.batch = get_batch(pre, post)
+
+        # heterogeneous delays
+        if np.ndim(delay) > 0:
+            if self.batch is not None:
+                raise ValueError('Heterogeneous delays do not support the trial axis.')
+            self.queue = SpikeQueue(self.conn.requires('pre_ids'), delay, self.conn.num_pre,
+                                    index=self.storage.conn_index(self.conn))
+            delay = 0.
+        else:
+            self.queue = None
 
         # variables
-        self.s = bp.ops.zeros(self.size)
-        self.w = bp.ops.ones(self.size) * .1
-        self.I_syn = self.register_constant_delay('I_syn', size=self.size, delay_time=delay)
+        self.s = bp.ops.zeros(batch_shape(post.size if lumped else self.size, self.batch), dtype=get_dtype())
+        self.w = bp.ops.ones(self.size, dtype=get_dtype()) * .1
+        self.I_syn = self.register_constant_delay('I_syn', size=batch_shape(post.size, self.batch), delay_time=delay)
+
+        if method == 'exact':
+            P = exp_decay(tau)
+
+            def integral(s, t, tau):
+                return s * P
 
-        self.integral = bp.odeint(f=self.derivative, method='exponential_euler')
+            self.integral = integral
+        else:
+            self.integral = bp.odeint(f=self.derivative, method=method)
 
+        if lumped:
+            kwargs.setdefault('steps', self.update_lumped)
         super(Exponential, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
         self.s = self.integral(self.s, _t, self.tau)
-        self.s += bp.ops.unsqueeze(self.pre.spike, 1) * self.conn_mat
-        self.I_syn.push(self.w * self.s)
-        self.post.input += bp.ops.sum(self.I_syn.pull(), axis=0)
+        events = self.storage if self.queue is None else self.queue
+        self.s[events.pre_events(self.pre.spike)] += 1.
+        self.I_syn.push(self.storage.to_post(self.w * self.s))
+        self.post.input += self.I_syn.pull()
+
+    def update_lumped(self, _t):
+        self.s = self.integral(self.s, _t, self.tau)
+        if self.queue is None:
+            self.s += self.storage.events_to_post(self.pre.spike, self.w)
+        else:
+            index = self.queue.pre_events(self.pre.spike)
+            self.s += bp.ops.segment_sum(self.w[index], self.storage.post_index(index)[-1], self.storage.num_post)
+        self.I_syn.push(self.s)
+        self.post.input += self.I_syn.pull()
@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 import brainpy as bp
 
+from ...utils.batch import batch_shape, get_batch
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.spike_queue import check_scalar_delay
+from ...utils.storage import get_storage
+
 __all__ = [
     'Gap_junction',
     'Gap_junction_lif',
@@ -15,6 +21,25 @@ class Gap_junction(bp.TwoEndConn):
 
         I_{syn} = w (V_{pre} - V_{post})
 
+    The current onto each post-synaptic neuron is computed as
+    :math:`\\sum_{i} w_{i} V_{pre, i} - V_{post} \\sum_{i} w_{i}`, so that no
+    per-synapse array is built at each step. The weights are masked and
+    summed when ``w`` is assigned, e.g. ``syn.w = 0.5`` or ``syn.w *= 0.5``,
+    so that weights changed by index, e.g. ``syn.w[0] = 1.``, must be
+    assigned again with ``syn.w = syn.w``.
+    Locally coupled networks, e.g. of dendritic compartments or of
+    interneurons, should use the sparse ``storage='csr'``, whose cost
+    scales with the number of the gap junctions.
+
+    **Synapse Parameters**
+
+    ============= ============== ======== ===================================================================================
+    **Parameter** **Init Value** **Unit** **Explanation**
+    ------------- -------------- -------- -----------------------------------------------------------------------------------
+    storage       'dense'        \        Synaptic storage layout, 'dense' or 'csr'.
+
+    ============= ============== ======== ===================================================================================
+
     **Synapse Variables**
 
     An object of synapse class record those variables for each synapse:
@@ -24,6 +49,8 @@ class Gap_junction(bp.TwoEndConn):
     ------------------ ----------------- ---------------------------------------------------------
     w                  0.                Synapse weights.
 
+    w_sum              0.                Summed weights of each post-synaptic neuron.
+
     ================== ================= =========================================================
 
     Reference:
@@ -35,23 +62,30 @@ class Gap_junction(bp.TwoEndConn):
 
     target_backend = 'general'
 
-    def __init__(self, pre, post, conn, **kwargs):
+    def __init__(self, pre, post, conn, storage='dense', **kwargs):
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.conn_mat = conn.requires('conn_mat')
-        self.size = bp.ops.shape(self.conn_mat)
+        self.conn = build_conn(conn, pre.size, post.size)
+        self.storage = get_storage(self.conn, storage)
+        self.size = self.storage.size
+        self.batch = get_batch(pre, post)
 
         # variables
-        self.w = bp.ops.ones(self.size)
+        self.w = 1.
 
         super(Gap_junction, self).__init__(pre=pre, post=post, **kwargs)
 
-    def update(self, _t):
-        v_post = bp.ops.vstack((self.post.V,) * self.size[0])
-        v_pre = bp.ops.vstack((self.pre.V,) * self.size[1]).T
+    @property
+    def w(self):
+        return self._w
 
-        I_syn = self.w * (v_pre - v_post) * self.conn_mat
-        self.post.input += bp.ops.sum(I_syn, axis=0)
+    @w.setter
+    def w(self, w):
+        # a new masked array, the assigned weights can be read-only
+        self._w = self.storage.mask(bp.ops.ones(self.size, dtype=get_dtype()) * w)
+        self.w_sum = self.storage.to_post(self._w)
+
+    def update(self, _t):
+        self.post.input += self.storage.weighted_to_post(self.pre.V, self.w) - self.w_sum * self.post.V
 
 
 class Gap_junction_lif(bp.TwoEndConn):
@@ -61,6 +95,22 @@ class Gap_junction_lif(bp.TwoEndConn):
     .. math::
         I_{syn} = w (V_{pre} - V_{post})
 
+    The current is computed as in :class:`Gap_junction`, and the spikelets
+    are summed over the spiking pre-synaptic neurons only.
+
+    **Synapse Parameters**
+
+    =============== ============== ======== =================================================================================
+    **Parameter**   **Init Value** **Unit** **Explanation**
+    --------------- -------------- -------- ---------------------------------------------------------------------------------
+    k_spikelet      0.1            \        The spikelet amplitude of a unit weight.
+
+    post_refractory False          \        Suppress the spikelets of the refractory post-synaptic neurons.
+
+    storage         'dense'        \        Synaptic storage layout, 'dense' or 'csr'.
+
+    =============== ============== ======== =================================================================================
+
     **Synapse Variables**
 
     An object of synapse class record those variables for each synapse:
@@ -70,6 +120,8 @@ class Gap_junction_lif(bp.TwoEndConn):
     ------------------ ----------------- ---------------------------------------------------------
     w                  0.                Synapse weights.
 
+    w_sum              0.                Summed weights of each post-synaptic neuron.
+
     spikelet           0.                conductance for post-synaptic neuron
 
     ================== ================= =========================================================
@@ -83,32 +135,40 @@ class Gap_junction_lif(bp.TwoEndConn):
 
     target_backend = 'general'
 
-    def __init__(self, pre, post, conn, delay=0., k_spikelet=0.1, post_refractory=False, **kwargs):
-        self.delay = delay
+    def __init__(self, pre, post, conn, delay=0., k_spikelet=0.1, post_refractory=False, storage='dense', **kwargs):
+        self.delay = check_scalar_delay(delay, 'Gap_junction_lif')
         self.k_spikelet = k_spikelet
         self.post_refractory = post_refractory
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.conn_mat = conn.requires('conn_mat')
-        self.size = bp.ops.shape(self.conn_mat)
+        self.conn = build_conn(conn, pre.size, post.size)
+        self.storage = get_storage(self.conn, storage)
+        self.size = self.storage.size
+        self.batch = get_batch(pre, post)
 
         # variables
-        self.w = bp.ops.ones(self.size)
-        self.spikelet = self.register_constant_delay('spikelet', size=self.size, delay_time=self.delay)
+        self.w = 1.
+        self.spikelet = self.register_constant_delay('spikelet', size=batch_shape(post.size, self.batch), delay_time=self.delay)
 
         super(Gap_junction_lif, self).__init__(pre=pre, post=post, **kwargs)
 
-    def update(self, _t):
-        v_post = bp.ops.vstack((self.post.V,) * self.size[0])
-        v_pre = bp.ops.vstack((self.pre.V,) * self.size[1]).T
+    @property
+    def w(self):
+        return self._w
 
-        I_syn = self.w * (v_pre - v_post) * self.conn_mat
-        self.post.input += bp.ops.sum(I_syn, axis=0)
+    @w.setter
+    def w(self, w):
+        # a new masked array, the assigned weights can be read-only
+        self._w = self.storage.mask(bp.ops.ones(self.size, dtype=get_dtype()) * w)
+        self.w_sum = self.storage.to_post(self._w)
+
+    def update(self, _t):
+        self.post.input += self.storage.weighted_to_post(self.pre.V, self.w) - self.w_sum * self.post.V
 
-        self.spikelet.push(self.w * self.k_spikelet * bp.ops.unsqueeze(self.pre.spike, 1) * self.conn_mat)
+        spikelet = self.storage.events_to_post(self.pre.spike, self.w)
+        self.spikelet.push(self.k_spikelet * spikelet)
 
         if self.post_refractory:
-            self.post.V += bp.ops.sum(self.spikelet.pull(), axis=0) * (1. - self.post.refractory)
+            self.post.V += self.spikelet.pull() * (1. - self.post.refractory)
         else:
-            self.post.V += bp.ops.sum(self.spikelet.pull(), axis=0)
+            self.post.V += self.spikelet.pull()
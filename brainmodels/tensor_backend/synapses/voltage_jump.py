@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 import brainpy as bp
 
+from ...utils.batch import batch_shape, get_batch
+from ...utils.conn_cache import build_conn
+from ...utils.dtype import get_dtype
+from ...utils.spike_queue import check_scalar_delay
+from ...utils.storage import get_storage
+
 __all__ = [
     'Voltage_jump'
 ]
@@ -31,30 +37,30 @@ class Voltage_jump(bp.TwoEndConn):
 
     target_backend = 'general'
 
-    def __init__(self, pre, post, conn, weight=1., delay=0., post_refractory=False, **kwargs):
+    def __init__(self, pre, post, conn, weight=1., delay=0., post_refractory=False, storage='dense', **kwargs):
         # parameters
-        self.delay = delay
+        self.delay = check_scalar_delay(delay, 'Voltage_jump')
         self.post_refractory = post_refractory
 
         # connections
-        self.conn = conn(pre.size, post.size)
-        self.conn_mat = conn.requires('conn_mat')
-        self.size = bp.ops.shape(self.conn_mat)
+        self.conn = build_conn(conn, pre.size, post.size)
+        self.storage = get_storage(self.conn, storage)
+        self.size = self.storage.size
+        self.batch = get_batch(pre, post)
 
         # variables
-        self.s = bp.ops.zeros(self.size)
-        self.w = bp.ops.ones(self.size) * weight
-        self.I_syn = self.register_constant_delay('I_syn', size=self.size, delay_time=delay)
+        self.s = bp.ops.zeros(batch_shape(self.size, self.batch), dtype=get_dtype())
+        self.w = bp.ops.ones(self.size, dtype=get_dtype()) * weight
+        self.I_syn = self.register_constant_delay('I_syn', size=batch_shape(post.size, self.batch), delay_time=delay)
 
         super(Voltage_jump, self).__init__(pre=pre, post=post, **kwargs)
 
     def update(self, _t):
-        self.s = bp.ops.unsqueeze(self.pre.spike, 1) * self.conn_mat
+        self.s = self.storage.from_pre(self.pre.spike)
 
-        self.I_syn.push(self.s * self.w)
+        self.I_syn.push(self.storage.to_post(self.s * self.w))
 
         if self.post_refractory:
-            refra_map = (1. - bp.ops.unsqueeze(self.post.refractory, 0)) * self.conn_mat
-            self.post.V += bp.ops.sum(self.I_syn.pull() * refra_map, axis=0)
+            self.post.V += self.I_syn.pull() * (1. - self.post.refractory)
         else:
-            self.post.V += bp.ops.sum(self.I_syn.pull(), axis=0)
+            self.post.V += self.I_syn.pull()
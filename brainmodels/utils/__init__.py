@@ -1 +1,13 @@
-from .ops_buffer import *
\ No newline at end of file
+from .batch import *
+from .conn_cache import *
+from .distance_conn import *
+from .dtype import *
+from .jit import *
+from .ops_buffer import *
+from .param_sweep import *
+from .propagators import *
+from .rate_table import *
+from .shared_conn import *
+from .spike_queue import *
+from .state_block import *
+from .storage import *
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+__all__ = [
+    'batch_shape',
+    'get_batch',
+]
+
+
+def batch_shape(size, batch=None):
+    """Get the shape of a state variable with the leading trial axis.
+
+    Parameters
+    ----------
+    size : int, tuple
+        The shape of the state variable in one trial.
+    batch : None, int
+        The number of the independent trials. ``None`` means no trial axis.
+
+    Returns
+    -------
+    shape : int, tuple
+        ``size`` if ``batch`` is None, else ``(batch,) + size``.
+    """
+    if batch is None:
+        return size
+    if isinstance(size, int):
+        return (batch, size)
+    return (batch,) + tuple(size)
+
+
+def get_batch(pre, post):
+    """Get the number of the trials simulated by the pre- and the
+    post-synaptic neuron groups.
+
+    Parameters
+    ----------
+    pre : bp.NeuGroup
+        The pre-synaptic neuron group.
+    post : bp.NeuGroup
+        The post-synaptic neuron group.
+
+    Returns
+    -------
+    batch : None, int
+        The number of the trials, or ``None`` if the groups have no trial axis.
+    """
+    pre_batch = getattr(pre, 'batch', None)
+    post_batch = getattr(post, 'batch', None)
+    if pre_batch != post_batch:
+        raise ValueError(f'The pre- and post-synaptic groups have different '
+                         f'batch sizes "{pre_batch}" and "{post_batch}".')
+    return post_batch
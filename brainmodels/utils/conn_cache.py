@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+
+import brainpy as bp
+import numpy as np
+
+from .shared_conn import SharedConn
+
+__all__ = [
+    'set_conn_cache',
+    'get_conn_cache',
+    'build_conn',
+    'DETERMINISTIC_CONNECTORS',
+]
+
+# the connectors without randomness, which are cached by their parameters
+DETERMINISTIC_CONNECTORS = (
+    bp.connect.All2All,
+    bp.connect.One2One,
+    bp.connect.GridFour,
+    bp.connect.GridEight,
+    bp.connect.GridN,
+    bp.connect.GaussianWeight,
+    bp.connect.DOG,
+)
+
+# the connectivity structures stored in the cache, if made by the connector
+_STRUCTURES = ('pre_ids', 'post_ids', 'conn_mat', 'weights')
+# the attributes of the connectors which are not parameters
+_NOT_PARAMS = tuple(vars(bp.connect.Connector()))
+
+_cache = dict(directory=None, max_bytes=None)
+
+
+def set_conn_cache(directory=None, max_bytes=2 ** 34):
+    """Set the on-disk cache of the connectivity.
+
+    When the cache is set, the synapses of both backends look up their
+    connectivity in ``directory`` before they build it. An entry is
+    keyed by the connector type, the sizes of the neuron groups, and the
+    parameters of the connector, including the state of its random
+    generator. It holds the ``pre_ids``, ``post_ids`` and, if the
+    connector made them, the ``conn_mat`` and the ``weights`` as ``.npy``
+    files, which are memory-mapped read-only on a hit, see
+    :class:`SharedConn`.
+
+    Only the connectors whose result is determined by the key are cached:
+    the :data:`DETERMINISTIC_CONNECTORS`, and the connectors with a seeded
+    ``rng`` (``np.random.RandomState``), e.g. ``bp.connect.FixedProb(0.1,
+    seed=1)``. The connectors which draw from the global generator, e.g.
+    an unseeded ``FixedProb`` or ``GaussianProb``, are built every time.
+
+    The least recently used entries are removed when the cache grows
+    over ``max_bytes``.
+
+    Parameters
+    ----------
+    directory : None, str
+        The cache directory. ``None`` disables the cache.
+    max_bytes : int
+        The size limit of the cache.
+    """
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+    _cache['directory'] = directory
+    _cache['max_bytes'] = max_bytes
+
+
+def get_conn_cache():
+    """Get the cache directory, or ``None`` if the cache is disabled."""
+    return _cache['directory']
+
+
+def build_conn(conn, pre_size, post_size):
+    """Build the connectivity of a connector between two neuron groups,
+    or load it from the cache, see :func:`set_conn_cache`.
+
+    Parameters
+    ----------
+    conn : bp.connect.Connector
+        The connector.
+    pre_size : int, tuple
+        The size of the pre-synaptic neuron group.
+    post_size : int, tuple
+        The size of the post-synaptic neuron group.
+
+    Returns
+    -------
+    conn : bp.connect.Connector
+        The instantiated connector, or the :class:`SharedConn` of the cache entry.
+    """
+    directory = _cache['directory']
+    key = None if directory is None else _get_key(conn, pre_size, post_size)
+    if key is None:
+        return conn(pre_size, post_size)
+
+    num_pre, num_post = bp.size2len(pre_size), bp.size2len(post_size)
+    path = os.path.join(directory, key)
+    if os.path.isdir(path):
+        # mark as the most recently used
+        os.utime(path)
+        npy = {name: os.path.join(path, f'{name}.npy') for name in _STRUCTURES
+               if os.path.exists(os.path.join(path, f'{name}.npy'))}
+        rng = getattr(conn, 'rng', None)
+        if isinstance(rng, np.random.RandomState):
+            # the generator continues as if the connectivity was built
+            with open(os.path.join(path, 'rng_state.pkl'), 'rb') as f:
+                rng.set_state(pickle.load(f))
+        return SharedConn(num_pre, num_post, npy=npy)
+
+    conn = conn(pre_size, post_size)
+    tmp_path = tempfile.mkdtemp(dir=directory, prefix='.tmp-')
+    for name in _STRUCTURES:
+        arr = getattr(conn, name, None)
+        if arr is not None:
+            np.save(os.path.join(tmp_path, f'{name}.npy'), np.asarray(arr))
+    rng = getattr(conn, 'rng', None)
+    if isinstance(rng, np.random.RandomState):
+        with open(os.path.join(tmp_path, 'rng_state.pkl'), 'wb') as f:
+            pickle.dump(rng.get_state(), f)
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        # made by another process in the meantime
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    _evict(directory, _cache['max_bytes'], keep=key)
+    return conn
+
+
+def _get_key(conn, pre_size, post_size):
+    """Get the cache key of a connector, or ``None`` if its connectivity
+    is not determined by its parameters."""
+    if not isinstance(conn, bp.connect.Connector) or isinstance(conn, SharedConn):
+        return None
+    params = {name: val for name, val in vars(conn).items() if name not in _NOT_PARAMS}
+    rng = params.get('rng')
+    if isinstance(conn, DETERMINISTIC_CONNECTORS):
+        pass
+    elif not isinstance(rng, np.random.RandomState):
+        return None
+    elif isinstance(conn, bp.connect.FixedProb) and conn.method != 'matrix':
+        # the 'vector' method draws from the global generator of numba
+        return None
+
+    sha = hashlib.sha1()
+    sha.update(f'{type(conn).__module__}.{type(conn).__qualname__}'.encode())
+    sha.update(repr((bp.size2len(pre_size), bp.size2len(post_size))).encode())
+    for name in sorted(params):
+        sha.update(name.encode())
+        if not _update_hash(sha, params[name]):
+            return None
+    return sha.hexdigest()
+
+
+def _update_hash(sha, val):
+    """Hash a parameter value, and return False if it can not be hashed."""
+    if val is None or isinstance(val, (bool, int, float, complex, str, np.generic)):
+        sha.update(repr(val).encode())
+    elif isinstance(val, (tuple, list)):
+        sha.update(f'{type(val).__name__}{len(val)}'.encode())
+        return all(_update_hash(sha, v) for v in val)
+    elif isinstance(val, dict):
+        sha.update(f'dict{len(val)}'.encode())
+        return all(_update_hash(sha, k) and _update_hash(sha, v) for k, v in val.items())
+    elif isinstance(val, np.ndarray):
+        sha.update(f'{val.dtype.str}{val.shape}'.encode())
+        sha.update(np.ascontiguousarray(val).tobytes())
+    elif isinstance(val, np.random.RandomState):
+        return _update_hash(sha, val.get_state())
+    else:
+        return False
+    return True
+
+
+def _evict(directory, max_bytes, keep):
+    """Remove the least recently used entries while the cache is larger
+    than ``max_bytes``."""
+    entries = []
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.startswith('.') or not os.path.isdir(path):
+            continue
+        nbytes = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+        entries.append((os.path.getmtime(path), nbytes, name, path))
+    total = sum(entry[1] for entry in entries)
+    for _, nbytes, name, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if name != keep:
+            shutil.rmtree(path, ignore_errors=True)
+            total -= nbytes
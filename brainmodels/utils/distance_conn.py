@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+
+import brainpy as bp
+import numpy as np
+
+from .ops_buffer import np_concat_ranges
+
+__all__ = [
+    'DistanceProb',
+    'lattice_positions',
+]
+
+# the cells of the cell list along the cutoff radius
+_CELLS_PER_RADIUS = 2
+
+
+def lattice_positions(shape):
+    """Get the coordinates of the neurons on a lattice.
+
+    Parameters
+    ----------
+    shape : int, tuple
+        The lattice shape, e.g. ``(15, 3, 3)``.
+
+    Returns
+    -------
+    positions : np.ndarray
+        The ``(num, len(shape))`` coordinates, in the order of the flat
+        neuron index (``np.unravel_index``).
+    """
+    shape = (shape,) if isinstance(shape, int) else tuple(shape)
+    return np.stack(np.unravel_index(np.arange(int(np.prod(shape))), shape), axis=-1).astype(float)
+
+
+class DistanceProb(bp.connect.Connector):
+    """Connect the neurons with a probability which decays with their
+    distance,
+
+    .. math::
+
+        p(d) = C \\exp(-(d / \\lambda)^2)
+
+    as in the liquid state machine [1]_.
+
+    The neurons are placed at the given coordinates, or on the lattice
+    of the group shape, e.g. ``LIF((15, 3, 3))``. The pairs farther than
+    ``cutoff * lambda_`` are not connected, where ``p / C`` is below
+    ``exp(-cutoff ** 2)``. On the lattices, the synapses are sampled per
+    displacement, so the cost scales with the number of the synapses.
+    At given coordinates, the candidate pairs are found with a cell list
+    of the cutoff radius, so the cost scales with the number of the
+    nearby pairs. The distance matrix is never made, and the synapses
+    are sorted by the pre-synaptic and then the post-synaptic neuron,
+    i.e. in the CSR order.
+
+    Parameters
+    ----------
+    C : float
+        The connection probability at distance zero.
+    lambda_ : float
+        The length constant of the decay.
+    pre_pos : None, np.ndarray
+        The ``(num_pre, dim)`` coordinates of the pre-synaptic neurons.
+        Default is the lattice of the pre-synaptic group shape.
+    post_pos : None, np.ndarray
+        The ``(num_post, dim)`` coordinates of the post-synaptic neurons.
+        Default is the lattice of the post-synaptic group shape.
+    cutoff : float
+        The largest distance of the synapses, in units of ``lambda_``.
+    include_self : bool
+        Whether to create the ``(i, i)`` synapses.
+    seed : None, int
+        Seed the random generator.
+
+    References
+    ----------
+    .. [1] Maass, Wolfgang, Thomas Natschläger, and Henry Markram.
+           "Real-time computing without stable states: A new framework
+           for neural computation based on perturbations." Neural
+           computation 14.11 (2002): 2531-2560.
+    """
+
+    def __init__(self, C, lambda_, pre_pos=None, post_pos=None, cutoff=3.,
+                 include_self=True, seed=None):
+        super(DistanceProb, self).__init__()
+        self.C = C
+        self.lambda_ = lambda_
+        self.pre_pos = pre_pos
+        self.post_pos = post_pos
+        self.cutoff = cutoff
+        self.include_self = include_self
+        self.rng = np.random if seed is None else np.random.RandomState(seed)
+
+    def __call__(self, pre_size, post_size):
+        self.num_pre, self.num_post = bp.size2len(pre_size), bp.size2len(post_size)
+        if self.pre_pos is None and self.post_pos is None:
+            pre_ids, post_ids = self._lattice_pairs(pre_size, post_size)
+        else:
+            pre_ids, post_ids = self._cell_list_pairs(pre_size, post_size)
+        # CSR order
+        order = np.argsort(pre_ids * self.num_post + post_ids, kind='stable')
+        self.pre_ids = bp.ops.as_tensor(pre_ids[order])
+        self.post_ids = bp.ops.as_tensor(post_ids[order])
+        return self
+
+    def _lattice_pairs(self, pre_size, post_size):
+        """Sample the synapses of two lattices.
+
+        The probability only depends on the displacement between the
+        neurons, so the synapses of each displacement are drawn as the
+        Bernoulli trials of the neurons which have a partner at that
+        displacement, with geometric skips between the successes. The
+        cost scales with the number of the synapses.
+        """
+        pre_shape = (pre_size,) if isinstance(pre_size, int) else tuple(pre_size)
+        post_shape = (post_size,) if isinstance(post_size, int) else tuple(post_size)
+        if len(pre_shape) != len(post_shape):
+            raise ValueError(f'The lattices have different dimensions '
+                             f'"{len(pre_shape)}" and "{len(post_shape)}".')
+        radius = self.cutoff * self.lambda_
+        steps = int(np.floor(radius))
+        pre_ids, post_ids = [], []
+        for delta in itertools.product(range(-steps, steps + 1), repeat=len(pre_shape)):
+            delta = np.array(delta)
+            dist2 = np.sum(delta ** 2)
+            if dist2 > radius ** 2:
+                continue
+            prob = self.C * np.exp(-dist2 / self.lambda_ ** 2)
+            # the box of the pre-synaptic neurons with a partner at `delta`
+            low = np.maximum(0, -delta)
+            high = np.minimum(pre_shape, post_shape - delta)
+            if np.any(high <= low) or prob <= 0.:
+                continue
+            box = tuple(high - low)
+            ids = _bernoulli_ids(self.rng, int(np.prod(box)), min(prob, 1.))
+            coords = np.stack(np.unravel_index(ids, box), axis=-1) + low
+            pre_ids.append(np.ravel_multi_index(coords.T, pre_shape))
+            post_ids.append(np.ravel_multi_index((coords + delta).T, post_shape))
+            if not self.include_self:
+                keep = pre_ids[-1] != post_ids[-1]
+                pre_ids[-1], post_ids[-1] = pre_ids[-1][keep], post_ids[-1][keep]
+        if len(pre_ids) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(pre_ids), np.concatenate(post_ids)
+
+    def _cell_list_pairs(self, pre_size, post_size):
+        """Sample the synapses of the neurons at arbitrary coordinates,
+        among the candidate pairs of a cell list."""
+        pre_pos = _get_positions(self.pre_pos, pre_size)
+        post_pos = _get_positions(self.post_pos, post_size)
+        if len(pre_pos) != self.num_pre or len(post_pos) != self.num_post:
+            raise ValueError(f'The positions of {len(pre_pos)} x {len(post_pos)} neurons do not '
+                             f'match the groups of {self.num_pre} x {self.num_post} neurons.')
+        if pre_pos.shape[1] != post_pos.shape[1]:
+            raise ValueError(f'The positions have different dimensions '
+                             f'"{pre_pos.shape[1]}" and "{post_pos.shape[1]}".')
+        radius = self.cutoff * self.lambda_
+        side = radius / _CELLS_PER_RADIUS
+
+        # cell list of the post-synaptic neurons, sorted by the cell
+        pre_cells = np.floor(pre_pos / side).astype(np.int64)
+        post_cells = np.floor(post_pos / side).astype(np.int64)
+        low = np.minimum(pre_cells.min(axis=0, initial=0), post_cells.min(axis=0, initial=0)) - _CELLS_PER_RADIUS
+        extent = np.maximum(pre_cells.max(axis=0, initial=0),
+                            post_cells.max(axis=0, initial=0)) - low + _CELLS_PER_RADIUS + 1
+        post_keys = np.ravel_multi_index((post_cells - low).T, extent)
+        post_order = np.argsort(post_keys, kind='stable')
+        post_keys = post_keys[post_order]
+
+        # the cells around each pre-synaptic neuron which are within the radius
+        k = _CELLS_PER_RADIUS
+        offsets = np.array(list(itertools.product(range(-k, k + 1), repeat=pre_pos.shape[1])))
+        gaps = np.maximum(np.abs(offsets) - 1, 0) * side
+        offsets = offsets[np.sum(gaps ** 2, axis=1) <= radius ** 2]
+        keys = np.ravel_multi_index((pre_cells[:, None, :] - low + offsets).transpose(2, 0, 1), extent)
+        starts = np.searchsorted(post_keys, keys, side='left')
+        ends = np.searchsorted(post_keys, keys, side='right')
+
+        # the pre-synaptic neurons in chunks of about `max_pairs` candidate pairs
+        max_pairs = 2 ** 20
+        num_cand = np.cumsum((ends - starts).sum(axis=1))
+        bounds = np.searchsorted(num_cand, np.arange(max_pairs, num_cand[-1] if len(num_cand) else 0, max_pairs))
+        pre_ids, post_ids = [], []
+        for first, last in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [self.num_pre]))):
+            s, e = starts[first:last].ravel(), ends[first:last].ravel()
+            pre = np.repeat(np.repeat(np.arange(first, last), offsets.shape[0]), e - s)
+            post = post_order[np_concat_ranges(s, e)]
+            dist2 = np.sum((pre_pos[pre] - post_pos[post]) ** 2, axis=1)
+            prob = self.C * np.exp(-dist2 / self.lambda_ ** 2)
+            keep = (dist2 <= radius ** 2) & (self.rng.random_sample(len(prob)) < prob)
+            if not self.include_self:
+                keep &= pre != post
+            pre_ids.append(pre[keep])
+            post_ids.append(post[keep])
+        return np.concatenate(pre_ids), np.concatenate(post_ids)
+
+
+def _bernoulli_ids(rng, num, prob):
+    """Get the successes of ``num`` Bernoulli trials of probability
+    ``prob``, drawn as the geometric gaps between the successes."""
+    if prob >= 1.:
+        return np.arange(num)
+    ids = np.zeros(0, dtype=np.int64)
+    last = -1
+    while last < num:
+        mean = (num - last) * prob
+        gaps = rng.geometric(prob, size=int(mean + 5. * np.sqrt(mean) + 10))
+        new_ids = last + np.cumsum(gaps)
+        last = new_ids[-1]
+        ids = np.concatenate((ids, new_ids))
+    return ids[ids < num]
+
+
+def _get_positions(positions, size):
+    """Get the neuron coordinates, or the lattice of the group size."""
+    if positions is None:
+        return lattice_positions(size)
+    positions = np.asarray(positions, dtype=float)
+    return positions.reshape((len(positions), -1))
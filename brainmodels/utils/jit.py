@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import brainpy as bp
+
+__all__ = [
+    'jit_kernel',
+]
+
+
+def jit_kernel(func, fastmath=None, parallel=None):
+    """Compile the step kernel of one model with its own numba options.
+
+    By default the kernels are compiled with the global numba profile of
+    ``brainpy``, i.e. ``fastmath=True``, and ``parallel=True`` only with
+    the ``numba-parallel`` backend. The options given here override the
+    global profile for ``func`` only, so that e.g. a small group can run
+    serially in a network which uses the ``numba-parallel`` backend.
+
+    The ``update`` of the model calls the compiled kernel with its
+    variables and parameters. With the other backends, e.g. ``numpy``,
+    ``func`` is returned as is.
+
+    Parameters
+    ----------
+    func : callable
+        The kernel, whose loops run over ``prange``.
+    fastmath : None, bool
+        Compile with the fast (reassociating, non-IEEE) floating point
+        math. ``None`` means the global profile.
+    parallel : None, bool
+        Run the ``prange`` loops in parallel. ``None`` means the global
+        profile.
+
+    Returns
+    -------
+    kernel : callable
+        The compiled kernel.
+    """
+    if bp.backend.get_backend_name() not in ('numba', 'numba-parallel'):
+        return func
+
+    import numba
+    from brainpy.backend.drivers.numba import get_numba_profile
+
+    options = dict(get_numba_profile())
+    if fastmath is not None:
+        options['fastmath'] = fastmath
+    if parallel is not None:
+        options['parallel'] = parallel
+    return numba.jit(**options)(func)
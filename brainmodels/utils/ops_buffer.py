@@ -7,12 +7,102 @@ import numpy as np
 bp.ops.set_buffer('numpy', {'clip': np.clip})
 bp.ops.set_buffer('numpy', {'mean': np.mean})
 
+
+def np_segment_sum(data, segment_ids, num_segments):
+    if np.ndim(data) == 1:
+        return np.bincount(segment_ids, weights=data, minlength=num_segments)
+    # sum along the last axis, each leading index gets its own segments
+    shape = np.shape(data)[:-1]
+    data = np.reshape(data, (-1, np.shape(data)[-1]))
+    offsets = np.arange(data.shape[0]) * num_segments
+    ids = (segment_ids + np.expand_dims(offsets, 1)).ravel()
+    out = np.bincount(ids, weights=data.ravel(), minlength=data.shape[0] * num_segments)
+    return np.reshape(out, shape + (num_segments,))
+
+
+def np_concat_ranges(starts, ends):
+    lengths = ends - starts
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return np.arange(np.sum(lengths)) + offsets
+
+
+def np_interp_rows(table, pos):
+    idx = pos.astype(np.intp)
+    frac = np.expand_dims(pos - idx, -1)
+    low = np.take(table, idx, axis=0)
+    out = np.take(table, idx + 1, axis=0)
+    out -= low
+    out *= frac
+    out += low
+    return out
+
+
+def np_copyto(dst, src, where):
+    np.copyto(dst, src, where=where)
+    return dst
+
+
+bp.ops.set_buffer('numpy', segment_sum=np_segment_sum)
+bp.ops.set_buffer('numpy', nonzero=np.nonzero, concat_ranges=np_concat_ranges)
+bp.ops.set_buffer('numpy', interp_rows=np_interp_rows, repeat=np.repeat)
+bp.ops.set_buffer('numpy', matmul=np.matmul, multiply=np.multiply, expm1=np.expm1)
+bp.ops.set_buffer('numpy', add=np.add, subtract=np.subtract, greater_equal=np.greater_equal,
+                  logical_or=np.logical_or, copyto=np_copyto)
+
 # PyTorch
 try:
     import torch
 
     try:
-        bp.ops.set_buffer('pytorch', clip=torch.clamp, mean=torch.mean)
+        def torch_clip(x, x_min, x_max, out=None):
+            return torch.clamp(x, x_min, x_max, out=out)
+
+        def torch_multiply(x, y, out=None):
+            return torch.mul(x, y, out=out)
+
+        def torch_add(x, y, out=None):
+            return torch.add(x, y, out=out)
+
+        def torch_subtract(x, y, out=None):
+            if isinstance(y, torch.Tensor) and y.dtype == torch.bool:
+                y = y.to(x.dtype)
+            return torch.sub(x, y, out=out)
+
+        def torch_greater_equal(x, y, out=None):
+            return torch.ge(x, y, out=out)
+
+        def torch_logical_or(x, y, out=None):
+            return torch.logical_or(x, y, out=out)
+
+        def torch_copyto(dst, src, where):
+            return torch.where(where, torch.as_tensor(src, dtype=dst.dtype), dst, out=dst)
+
+        bp.ops.set_buffer('pytorch', clip=torch_clip, mean=torch.mean)
+
+        def torch_segment_sum(data, segment_ids, num_segments):
+            out = torch.zeros(data.shape[:-1] + (num_segments,), dtype=data.dtype)
+            return out.index_add_(-1, segment_ids, data)
+
+        def torch_nonzero(x):
+            return torch.nonzero(x, as_tuple=True)
+
+        def torch_concat_ranges(starts, ends):
+            lengths = ends - starts
+            offsets = torch.repeat_interleave(starts - torch.cumsum(lengths, 0) + lengths, lengths)
+            return torch.arange(int(torch.sum(lengths))) + offsets
+
+        def torch_interp_rows(table, pos):
+            idx = pos.long()
+            frac = torch.unsqueeze(pos - idx, -1)
+            low = table[idx]
+            return low + (table[idx + 1] - low) * frac
+
+        bp.ops.set_buffer('pytorch', segment_sum=torch_segment_sum)
+        bp.ops.set_buffer('pytorch', nonzero=torch_nonzero, concat_ranges=torch_concat_ranges)
+        bp.ops.set_buffer('pytorch', interp_rows=torch_interp_rows, repeat=torch.repeat_interleave)
+        bp.ops.set_buffer('pytorch', matmul=torch.matmul, multiply=torch_multiply, expm1=torch.expm1)
+        bp.ops.set_buffer('pytorch', add=torch_add, subtract=torch_subtract, greater_equal=torch_greater_equal,
+                          logical_or=torch_logical_or, copyto=torch_copyto)
     except AttributeError:
         pass
 
@@ -25,7 +115,54 @@ try:
     import tensorflow as tf
 
     try:
-        bp.ops.set_buffer('tensorflow', clip=tf.clip_by_value, mean=tf.mean)
+        def tf_segment_sum(data, segment_ids, num_segments):
+            # sum along the last axis
+            return tf.transpose(tf.math.unsorted_segment_sum(tf.transpose(data), segment_ids, num_segments))
+
+        def tf_nonzero(x):
+            return tuple(tf.unstack(tf.where(x), axis=1))
+
+        def tf_concat_ranges(starts, ends):
+            return tf.ragged.range(starts, ends).flat_values
+
+        def tf_clip(x, x_min, x_max, out=None):
+            # tensors are immutable, ``out`` is ignored
+            return tf.clip_by_value(x, x_min, x_max)
+
+        def tf_multiply(x, y, out=None):
+            return tf.multiply(x, y)
+
+        def tf_add(x, y, out=None):
+            return tf.add(x, y)
+
+        def tf_subtract(x, y, out=None):
+            return tf.subtract(x, tf.cast(y, x.dtype))
+
+        def tf_greater_equal(x, y, out=None):
+            return tf.greater_equal(x, y)
+
+        def tf_logical_or(x, y, out=None):
+            return tf.logical_or(x, y)
+
+        def tf_exp(x, out=None):
+            return tf.exp(x)
+
+        def tf_copyto(dst, src, where):
+            return tf.where(where, tf.cast(src, dst.dtype), dst)
+
+        def tf_interp_rows(table, pos):
+            idx = tf.cast(pos, tf.int64)
+            frac = tf.expand_dims(pos - tf.cast(idx, pos.dtype), -1)
+            low = tf.gather(table, idx)
+            return low + (tf.gather(table, idx + 1) - low) * frac
+
+        bp.ops.set_buffer('tensorflow', segment_sum=tf_segment_sum)
+        bp.ops.set_buffer('tensorflow', nonzero=tf_nonzero, concat_ranges=tf_concat_ranges)
+        bp.ops.set_buffer('tensorflow', interp_rows=tf_interp_rows, repeat=tf.repeat)
+        bp.ops.set_buffer('tensorflow', matmul=tf.linalg.matmul, multiply=tf_multiply, expm1=tf.math.expm1)
+        bp.ops.set_buffer('tensorflow', clip=tf_clip, mean=tf.mean)
+        bp.ops.set_buffer('tensorflow', add=tf_add, subtract=tf_subtract, greater_equal=tf_greater_equal,
+                          logical_or=tf_logical_or, exp=tf_exp, copyto=tf_copyto)
     except AttributeError:
         pass
 
@@ -38,13 +175,102 @@ try:
     import numba as nb
 
     @nb.njit
-    def nb_clip(x, x_min, x_max):
-        x = np.maximum(x, x_min)
-        x = np.minimum(x, x_max)
-        return x
+    def nb_clip(x, x_min, x_max, out=None):
+        if out is None:
+            x = np.maximum(x, x_min)
+            x = np.minimum(x, x_max)
+            return x
+        np.maximum(x, x_min, out)
+        np.minimum(out, x_max, out)
+        return out
+
+    @nb.njit
+    def nb_multiply(x, y, out=None):
+        if out is None:
+            return x * y
+        np.multiply(x, y, out)
+        return out
+
+    @nb.njit
+    def nb_add(x, y, out=None):
+        if out is None:
+            return np.add(x, y)
+        np.add(x, y, out)
+        return out
+
+    @nb.njit
+    def nb_subtract(x, y, out=None):
+        if out is None:
+            return np.subtract(x, y)
+        np.subtract(x, y, out)
+        return out
+
+    @nb.njit
+    def nb_greater_equal(x, y, out=None):
+        if out is None:
+            return np.greater_equal(x, y)
+        np.greater_equal(x, y, out)
+        return out
+
+    @nb.njit
+    def nb_logical_or(x, y, out=None):
+        if out is None:
+            return np.logical_or(x, y)
+        np.logical_or(x, y, out)
+        return out
+
+    @nb.njit
+    def nb_exp(x, out=None):
+        if out is None:
+            return np.exp(x)
+        np.exp(x, out)
+        return out
+
+    @nb.njit
+    def nb_copyto(dst, src, where):
+        src = np.broadcast_to(np.asarray(src, dtype=dst.dtype), dst.shape)
+        for i in np.ndindex(dst.shape):
+            if where[i]:
+                dst[i] = src[i]
+        return dst
+
+    @nb.njit
+    def nb_segment_sum(data, segment_ids, num_segments):
+        # sum along the last axis
+        flat = data.reshape((-1, data.shape[-1]))
+        out = np.zeros((flat.shape[0], num_segments), dtype=data.dtype)
+        for b in range(flat.shape[0]):
+            for i in range(flat.shape[1]):
+                out[b, segment_ids[i]] += flat[b, i]
+        return out.reshape(data.shape[:-1] + (num_segments,))
+
+    @nb.njit
+    def nb_concat_ranges(starts, ends):
+        out = np.empty(np.sum(ends - starts), dtype=starts.dtype)
+        k = 0
+        for i in range(starts.shape[0]):
+            for j in range(starts[i], ends[i]):
+                out[k] = j
+                k += 1
+        return out
+
+    @nb.njit
+    def nb_interp_rows(table, pos):
+        out = np.empty((pos.shape[0], table.shape[1]))
+        for i in range(pos.shape[0]):
+            j = int(pos[i])
+            frac = pos[i] - j
+            for k in range(table.shape[1]):
+                out[i, k] = table[j, k] + (table[j + 1, k] - table[j, k]) * frac
+        return out
 
-    bp.ops.set_buffer('numba', clip=nb_clip, mean=np.mean)
-    bp.ops.set_buffer('numba-parallel', clip=nb_clip, mean=np.mean)
+    for backend in ['numba', 'numba-parallel']:
+        bp.ops.set_buffer(backend, clip=nb_clip, mean=np.mean, segment_sum=nb_segment_sum,
+                          nonzero=np.nonzero, concat_ranges=nb_concat_ranges,
+                          interp_rows=nb_interp_rows, repeat=np.repeat, matmul=np.dot,
+                          multiply=nb_multiply, expm1=np.expm1)
+        bp.ops.set_buffer(backend, add=nb_add, subtract=nb_subtract, greater_equal=nb_greater_equal,
+                          logical_or=nb_logical_or, exp=nb_exp, copyto=nb_copyto)
 
 except ModuleNotFoundError:
     pass
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+__all__ = [
+    'grid_points',
+    'sweep',
+]
+
+# the state of this worker process, with the data made by ``setup``
+_worker = dict()
+
+
+def grid_points(grid):
+    """Get the parameter points of a grid.
+
+    Parameters
+    ----------
+    grid : dict, list of dict
+        The values of each parameter, whose Cartesian product are the
+        points, e.g. ``{'coherence': [0., 25.6, 51.2], 'w_pos': [1.7, 2.]}``.
+        Or the list of the points.
+
+    Returns
+    -------
+    points : list of dict
+        The parameters of each point.
+    """
+    if isinstance(grid, dict):
+        names = list(grid.keys())
+        return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+    return [dict(point) for point in grid]
+
+
+def sweep(run, grid, setup=None, num_workers=None, seed=0, backend=None,
+          dt=None, dtype=None, num_threads=1, max_pending=None):
+    """Run the points of a parameter grid on a process pool.
+
+    ``run`` builds and runs the network of one point, and returns its
+    summary statistics, e.g. the firing rates or the decision time,
+    instead of the full monitors, as the results are sent back from the
+    worker processes::
+
+        def run(coherence, w_pos):
+            net = build_network(coherence=coherence, w_pos=w_pos)
+            net.run(1000.)
+            return dict(rate_A=..., rate_B=...)
+
+        grid = {'coherence': [0., 25.6, 51.2], 'w_pos': [1.5, 1.7, 2.]}
+        for params, result in brainmodels.sweep(run, grid, backend='numba'):
+            print(params, result)
+
+    ``run`` and ``setup`` are pickled by reference, so they are functions
+    at the top level of an importable module. The large data shared by
+    all the points, e.g. the connectivity, is made by ``setup`` once in
+    each worker process, instead of being pickled for each point. Its
+    result is the first argument of ``run``.
+
+    Each point has its own random stream, spawned from ``seed`` by
+    ``np.random.SeedSequence``, which seeds ``np.random`` and, with the
+    numba backends, the random generator of numba before ``run``. The
+    results of a point are thus the same for any number of the workers
+    and any order of the execution.
+
+    Each worker runs the numba kernels with ``num_threads`` threads, so
+    the default ``num_threads=1`` with one worker per core fills the
+    cores without over-subscription. The workers live for the whole
+    sweep, so that the functions jitted at the module level, e.g. of
+    :mod:`brainmodels.utils`, are compiled once in each worker rather
+    than for each point.
+
+    Parameters
+    ----------
+    run : callable
+        The function ``run(**params)``, or ``run(data, **params)`` with
+        ``setup``, which returns the (small) result of a point.
+    grid : dict, list of dict
+        The parameter grid, see :func:`grid_points`.
+    setup : None, callable
+        The function ``setup()`` called once in each worker process.
+    num_workers : None, int
+        The number of the worker processes. Default is the number of the CPUs.
+    seed : int
+        The root seed of the random streams of the points.
+    backend : None, str
+        The ``brainpy`` backend set in the workers.
+    dt : None, float
+        The integration step set in the workers, with ``backend``, or with
+        the backend of this process if ``backend`` is None.
+    dtype : None, str
+        The dtype of the model states set in the workers, see
+        :func:`brainmodels.set_dtype`.
+    num_threads : None, int
+        The number of the numba threads of each worker. ``None`` keeps
+        the default of numba.
+    max_pending : None, int
+        The largest number of the submitted points not yet finished.
+        Default is ``4 * num_workers``, which bounds the memory of a
+        large grid.
+
+    Yields
+    ------
+    params : dict
+        The parameters of a point.
+    result : Any
+        The result of ``run`` of the point, in the order of completion.
+    """
+    if dt is not None and backend is None:
+        import brainpy as bp
+        backend = bp.backend.get_backend_name()
+
+    points = grid_points(grid)
+    num_workers = num_workers or os.cpu_count()
+    max_pending = max_pending or 4 * num_workers
+    seeds = np.random.SeedSequence(seed).spawn(len(points))
+
+    with ProcessPoolExecutor(max_workers=num_workers,
+                             initializer=_init_worker,
+                             initargs=(backend, dt, dtype, num_threads, setup)) as pool:
+        todo = iter(zip(points, seeds))
+        pending = dict()
+        try:
+            while True:
+                for params, seed_seq in itertools.islice(todo, max_pending - len(pending)):
+                    seed_int = int(seed_seq.generate_state(1)[0])
+                    pending[pool.submit(_run_point, run, params, seed_int)] = params
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _init_worker(backend, dt, dtype, num_threads, setup):
+    """Set the backend, the dtype and the threads of a worker process,
+    and make the data of ``setup``."""
+    import brainpy as bp
+
+    if backend is not None:
+        if dt is None:
+            bp.backend.set(backend)
+        else:
+            bp.backend.set(backend, dt=dt)
+    if dtype is not None:
+        from .dtype import set_dtype
+        set_dtype(dtype)
+    if num_threads is not None:
+        try:
+            import numba
+            numba.set_num_threads(min(num_threads, numba.config.NUMBA_NUM_THREADS))
+        except ModuleNotFoundError:
+            pass
+    if setup is not None:
+        _worker['data'] = setup()
+
+
+def _run_point(run, params, seed):
+    """Run one point in a worker process."""
+    np.random.seed(seed)
+    _seed_numba(seed)
+    if 'data' in _worker:
+        return run(_worker['data'], **params)
+    return run(**params)
+
+
+try:
+    import numba as nb
+
+    @nb.njit
+    def _seed_numba(seed):
+        """Seed the random generator of the jitted functions, which is
+        separate from ``np.random`` of Python."""
+        np.random.seed(seed)
+
+except ModuleNotFoundError:
+    def _seed_numba(seed):
+        pass
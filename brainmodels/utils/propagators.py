@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import brainpy as bp
+import numpy as np
+
+__all__ = [
+    'exp_decay',
+    'linear_propagator',
+]
+
+
+def exp_decay(tau, dt=None):
+    """Get the exact propagator of the decay :math:`dx/dt = -x / \\tau`.
+
+    Parameters
+    ----------
+    tau : float
+        The time constant.
+    dt : float, optional
+        The integration step. Default is the backend ``dt``.
+
+    Returns
+    -------
+    propagator : float
+        The factor :math:`e^{-dt / \\tau}`, so that
+        :math:`x(t + dt) = e^{-dt / \\tau} x(t)`.
+    """
+    dt = bp.backend.get_dt() if dt is None else dt
+    return float(np.exp(-dt / tau))
+
+
+def linear_propagator(A, dt=None):
+    """Get the exact propagator of the linear system :math:`dx/dt = A x`.
+
+    The matrix exponential :math:`e^{A dt}` is computed by scaling and
+    squaring of its Taylor series.
+
+    Parameters
+    ----------
+    A : np.ndarray
+        The square system matrix.
+    dt : float, optional
+        The integration step. Default is the backend ``dt``.
+
+    Returns
+    -------
+    propagator : np.ndarray
+        The matrix :math:`e^{A dt}`, so that :math:`x(t + dt) = e^{A dt} x(t)`.
+    """
+    dt = bp.backend.get_dt() if dt is None else dt
+    M = np.asarray(A, dtype=np.float64) * dt
+    norm = np.max(np.sum(np.abs(M), axis=1))
+    num_square = max(0, int(np.ceil(np.log2(norm))) + 1) if norm > 0. else 0
+    M = M / 2. ** num_square
+    P = np.eye(M.shape[0])
+    term = np.eye(M.shape[0])
+    for k in range(1, 20):
+        term = term @ M / k
+        P = P + term
+    for _ in range(num_square):
+        P = P @ P
+    return P
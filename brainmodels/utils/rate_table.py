@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+import brainpy as bp
+import numpy as np
+
+from .dtype import get_dtype
+
+__all__ = [
+    'RateTable',
+]
+
+
+class RateTable(object):
+    """Voltage-indexed lookup table of gating rate functions.
+
+    The functions are evaluated once on the grid
+    ``V_min, V_min + dV, ..., V_max``, and looked up with linear
+    interpolation. Voltages outside the grid are clamped to its ends.
+
+    Removable singularities (e.g. :math:`\\frac{0.1 (V + 40)}{1 - e^{-(V + 40) / 10}}`
+    at :math:`V = -40` of the Hodgkin-Huxley model) which fall on a grid
+    point are filled with the mean of the function evaluated at
+    :math:`V \\pm 10^{-3} dV`.
+
+    Parameters
+    ----------
+    f : callable
+        The function ``f(V)`` which returns the sequence of the rate
+        functions evaluated on the NumPy array ``V``.
+    V_range : tuple
+        The voltage range ``(V_min, V_max)`` of the table.
+    dV : float
+        The voltage resolution of the table.
+    """
+
+    def __init__(self, f, V_range=(-100., 100.), dV=0.01):
+        V_min, V_max = V_range
+        if V_max <= V_min:
+            raise ValueError(f'Empty voltage range "{V_range}".')
+        num = int(round((V_max - V_min) / dV)) + 1
+        V = V_min + dV * np.arange(num)
+
+        with np.errstate(all='ignore'):
+            columns = [np.asarray(val, dtype=np.float64) * np.ones(num) for val in f(V)]
+            table = np.empty((num + 1, len(columns)))
+            for k, val in enumerate(columns):
+                bad = ~np.isfinite(val)
+                if np.any(bad):
+                    h = 1e-3 * dV
+                    val[bad] = (f(V[bad] - h)[k] + f(V[bad] + h)[k]) / 2.
+                if not np.all(np.isfinite(val)):
+                    raise ValueError(f'Rate function {k} is not finite in {V_range}.')
+                table[:num, k] = val
+        # repeat the last row, so that the upper end needs no special case
+        table[num] = table[num - 1]
+
+        self.V_min = V_min
+        self.dV = dV
+        self.pos_max = float(num - 1)
+        self.data = table
+        self.table = bp.ops.as_tensor(table, dtype=get_dtype())
+
+    def position(self, V):
+        """Get the fractional grid position of the voltage ``V``."""
+        return bp.ops.clip((V - self.V_min) / self.dV, 0., self.pos_max)
+
+    def __call__(self, V):
+        """Interpolate the rate functions at the voltage ``V``.
+
+        Returns an array of shape ``V.shape + (num_rates,)``.
+        """
+        return bp.ops.interp_rows(self.table, self.position(V))
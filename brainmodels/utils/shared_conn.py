@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+from multiprocessing import shared_memory
+
+import brainpy as bp
+import numpy as np
+
+from .dtype import get_dtype
+
+__all__ = [
+    'SharedConn',
+    'share_conn',
+]
+
+
+class SharedConn(bp.connect.Connector):
+    """Read-only connectivity shared by the processes.
+
+    The connectivity arrays, e.g. ``pre_ids`` and ``post_ids``, or
+    ``conn_mat``, are held in ``multiprocessing.shared_memory`` blocks or
+    in memory-mapped ``.npy`` files, and the connector uses them without
+    a copy. The connector is pickled as the names of the blocks or the
+    paths of the files, so the worker processes of a sweep attach the
+    same physical memory instead of unpickling their own copies.
+
+    It is passed as the ``conn`` of the synapse classes like the other
+    connectors. The synapses which keep the connector order, e.g.
+    ``AMPA`` of ``numba_backend`` with ``order=None``, and the CSR storage
+    of the pre-sorted synapses, use the shared arrays directly. The
+    dense storage uses a shared ``conn_mat`` directly if it has the dtype
+    of the model states, see :func:`share_conn`. The other structures,
+    e.g. ``pre2post``, are made in each process, and so are the
+    ``pre_ids`` and ``post_ids`` if only the ``conn_mat`` is shared.
+
+    Parameters
+    ----------
+    num_pre : int
+        The number of the pre-synaptic neurons.
+    num_post : int
+        The number of the post-synaptic neurons.
+    shm : dict
+        The shared memory arrays, ``name: (block_name, shape, dtype)``.
+    npy : dict
+        The memory-mapped arrays, ``name: path`` of the ``.npy`` file.
+    """
+
+    def __init__(self, num_pre, num_post, shm=None, npy=None):
+        super(SharedConn, self).__init__()
+        self.num_pre = num_pre
+        self.num_post = num_post
+        self.shm = dict() if shm is None else dict(shm)
+        self.npy = dict() if npy is None else dict(npy)
+        self.blocks = []
+        self._attach()
+
+    def _attach(self):
+        for name, (block_name, shape, dtype) in self.shm.items():
+            block = shared_memory.SharedMemory(name=block_name)
+            arr = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            arr.flags.writeable = False
+            self.blocks.append(block)
+            setattr(self, name, arr)
+        for name, path in self.npy.items():
+            setattr(self, name, np.load(path, mmap_mode='r'))
+
+        # the synapse index of a shared conn_mat is made in each process
+        shared = set(self.shm) | set(self.npy)
+        if not {'pre_ids', 'post_ids'} <= shared:
+            if 'conn_mat' not in shared:
+                raise ValueError(f'The shared connectivity needs "pre_ids" and "post_ids", '
+                                 f'or "conn_mat", but got {sorted(shared)}.')
+            self.pre_ids, self.post_ids = bp.connect.mat2ij(self.conn_mat)
+
+    def __call__(self, pre_size, post_size):
+        num_pre, num_post = bp.size2len(pre_size), bp.size2len(post_size)
+        if (num_pre, num_post) != (self.num_pre, self.num_post):
+            raise ValueError(f'The shared connectivity of {self.num_pre} x {self.num_post} '
+                             f'neurons does not match {num_pre} x {num_post} neurons.')
+        return self
+
+    def __getstate__(self):
+        return dict(num_pre=self.num_pre, num_post=self.num_post, shm=self.shm, npy=self.npy)
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def close(self):
+        """Detach the shared memory blocks from this process."""
+        for name in self.shm:
+            setattr(self, name, None)
+        for block in self.blocks:
+            block.close()
+        self.blocks = []
+
+    def unlink(self):
+        """Free the shared memory blocks. Called once, by the process
+        which made them, after all the processes closed them."""
+        for block in self.blocks:
+            block.unlink()
+        self.close()
+
+
+def share_conn(conn, pre_size, post_size, names=('pre_ids', 'post_ids'), directory=None):
+    """Build the connectivity once, and put it into shared memory or
+    into memory-mapped files.
+
+    Parameters
+    ----------
+    conn : bp.connect.Connector
+        The connector.
+    pre_size : int, tuple
+        The size of the pre-synaptic neuron group.
+    post_size : int, tuple
+        The size of the post-synaptic neuron group.
+    names : tuple of str
+        The structures to be shared, e.g. ``('pre_ids', 'post_ids')``, or
+        ``('conn_mat',)`` for the dense storage of ``tensor_backend``.
+        ``conn_mat`` is stored with the dtype of the model states.
+    directory : None, str
+        The directory of the ``.npy`` files, which are written into a new
+        subdirectory at each call, so that the connectors shared into the
+        same directory do not overwrite each other. Default is shared
+        memory, which is freed by :meth:`SharedConn.unlink`.
+
+    Returns
+    -------
+    conn : SharedConn
+        The shared connector.
+    """
+    conn = conn(pre_size, post_size)
+    arrays = conn.requires(*names)
+    arrays = (arrays,) if len(names) == 1 else arrays
+    shm, npy = dict(), dict()
+    blocks = []
+    if directory is not None:
+        directory = tempfile.mkdtemp(dir=directory, prefix='conn-')
+    for name, arr in zip(names, arrays):
+        arr = np.asarray(arr, dtype=np.dtype(get_dtype()) if name == 'conn_mat' else None)
+        if directory is None:
+            block = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=block.buf)[...] = arr
+            shm[name] = (block.name, arr.shape, arr.dtype.str)
+            blocks.append(block)
+        else:
+            path = os.path.join(directory, f'{name}.npy')
+            np.save(path, arr)
+            npy[name] = path
+    shared = SharedConn(conn.num_pre, conn.num_post, shm=shm, npy=npy)
+    # the new blocks are attached by the shared connector
+    for block in blocks:
+        block.close()
+    return shared
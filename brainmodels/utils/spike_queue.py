@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+import brainpy as bp
+import numpy as np
+
+__all__ = [
+    'SpikeQueue',
+    'check_scalar_delay',
+]
+
+
+class SpikeQueue(object):
+    """Spike event queue for heterogeneous synaptic delays.
+
+    The synapses are grouped by their pre-synaptic neuron and their delay.
+    A spike of a pre-synaptic neuron puts one event per group, i.e. per
+    distinct delay of its outgoing synapses, into the bucket of the step at
+    which the spike arrives. The buckets form a circular list over the
+    ``max_delay + 1`` steps, so that the memory scales with the events in
+    flight instead of with ``max_delay * num_syn``. A bucket grows when
+    more events arrive in one step than it can hold.
+
+    The tensor backend models use :meth:`pre_events`, and the
+    numba backend models the jitted :func:`queue_push` and :func:`queue_pop`
+    with the arrays of the queue. The queue is used by ``Exponential`` and
+    ``STP`` of both backends; the other synapses only take a scalar delay,
+    see :func:`check_scalar_delay`.
+
+    Parameters
+    ----------
+    pre_ids : np.ndarray
+        The pre-synaptic neuron index of each synapse.
+    delay : float, np.ndarray
+        The delay of each synapse, or of all of them.
+    num_pre : int
+        The number of the pre-synaptic neurons.
+    index : tuple
+        The synapse index returned by :meth:`pop` for each synapse, e.g.
+        ``(pre_ids, post_ids)`` of the dense storage. Default is the synapse
+        position ``(np.arange(num_syn),)``.
+    capacity : int
+        The initial number of the events of a bucket.
+    """
+
+    def __init__(self, pre_ids, delay, num_pre, index=None, capacity=16):
+        pre_ids = np.asarray(pre_ids)
+        num_syn = len(pre_ids)
+        dt = bp.backend.get_dt()
+        delay_steps = np.ceil(np.ones(num_syn) * delay / dt).astype(np.int64)
+        if num_syn and np.min(delay_steps) < 0:
+            raise ValueError(f'Negative synaptic delay "{np.min(delay)}".')
+        if index is None:
+            index = (np.arange(num_syn),)
+
+        # synapses grouped by (pre-synaptic neuron, delay)
+        order = np.lexsort((delay_steps, pre_ids))
+        keys = pre_ids[order] * (np.max(delay_steps, initial=0) + 1) + delay_steps[order]
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1]))) if num_syn else np.zeros(0, np.int64)
+        group_pre = pre_ids[order][starts]
+
+        self.num_slot = int(np.max(delay_steps, initial=0)) + 1
+        self.group_delay = delay_steps[order][starts]
+        self.gptr = np.concatenate((starts, [num_syn]))
+        self.pre_gptr = np.concatenate(([0], np.cumsum(np.bincount(group_pre, minlength=num_pre))))
+        self.syn_index = tuple(np.asarray(ids)[order] for ids in index)
+
+        # circular list of the buckets, the current step is at ``cursor``
+        self.events = np.zeros((self.num_slot, capacity), dtype=np.int64)
+        self.counts = np.zeros(self.num_slot, dtype=np.int64)
+        self.cursor = np.zeros(1, dtype=np.int64)
+
+    def pre_events(self, pre_spike):
+        """Push the spikes, and get the index of the synapses whose events
+        arrive at the current step, like the ``pre_events`` of the storages."""
+        self.push(pre_spike)
+        return self.pop()
+
+    def push(self, pre_spike):
+        """Put the events of the spiking pre-synaptic neurons into the
+        buckets of their arrival steps."""
+        pre_ids = np.nonzero(pre_spike)[0]
+        starts, ends = self.pre_gptr[pre_ids], self.pre_gptr[pre_ids + 1]
+        groups = bp.ops.concat_ranges(starts, ends)
+        if len(groups) == 0:
+            return
+        slots = (self.cursor[0] + self.group_delay[groups]) % self.num_slot
+        order = np.argsort(slots, kind='stable')
+        slots, groups = slots[order], groups[order]
+        new_counts = np.bincount(slots, minlength=self.num_slot)
+        # position of each event in its bucket
+        first = np.concatenate(([0], np.cumsum(new_counts)[:-1]))
+        positions = self.counts[slots] + np.arange(len(slots)) - first[slots]
+        self.counts += new_counts
+        self.events = _reserve(self.events, np.max(self.counts))
+        self.events[slots, positions] = groups
+
+    def pop(self):
+        """Get the index of the synapses whose events arrive at the current
+        step, and advance the queue by one step."""
+        slot = self.cursor[0]
+        groups = self.events[slot, :self.counts[slot]]
+        syn = bp.ops.concat_ranges(self.gptr[groups], self.gptr[groups + 1])
+        self.counts[slot] = 0
+        self.cursor[0] = (slot + 1) % self.num_slot
+        return tuple(ids[syn] for ids in self.syn_index)
+
+
+def check_scalar_delay(delay, name):
+    """Check the delay of the synapses without the spike event queue,
+    which only delay their output by one scalar delay.
+
+    Parameters
+    ----------
+    delay : float, np.ndarray
+        The synaptic delay.
+    name : str
+        The name of the synapse class.
+
+    Returns
+    -------
+    delay : float
+        The synaptic delay.
+    """
+    if np.ndim(delay) > 0:
+        raise ValueError(f'"{name}" only supports a scalar "delay". The heterogeneous '
+                         f'delays of the synapses are supported by "Exponential" and "STP".')
+    return delay
+
+
+def _reserve(events, capacity):
+    """Grow the buckets to hold at least ``capacity`` events."""
+    if capacity <= events.shape[1]:
+        return events
+    new_events = np.zeros((events.shape[0], max(capacity, 2 * events.shape[1])), dtype=events.dtype)
+    new_events[:, :events.shape[1]] = events
+    return new_events
+
+
+try:
+    import numba as nb
+
+    _reserve = nb.njit(_reserve)
+
+    @nb.njit
+    def queue_push(events, counts, cursor, pre_gptr, group_delay, pre_spike):
+        """Put the events of the spiking pre-synaptic neurons into the
+        buckets of their arrival steps, and return the (grown) buckets."""
+        num_slot = counts.shape[0]
+        for pre_id in range(pre_spike.shape[0]):
+            if pre_spike[pre_id] > 0:
+                for g in range(pre_gptr[pre_id], pre_gptr[pre_id + 1]):
+                    slot = (cursor[0] + group_delay[g]) % num_slot
+                    events = _reserve(events, counts[slot] + 1)
+                    events[slot, counts[slot]] = g
+                    counts[slot] += 1
+        return events
+
+    @nb.njit
+    def queue_pop(events, counts, cursor, gptr, syn_index):
+        """Get the ids of the synapses whose events arrive at the current
+        step, and advance the queue by one step."""
+        slot = cursor[0]
+        num = 0
+        for k in range(counts[slot]):
+            g = events[slot, k]
+            num += gptr[g + 1] - gptr[g]
+        syn_ids = np.empty(num, dtype=syn_index.dtype)
+        num = 0
+        for k in range(counts[slot]):
+            g = events[slot, k]
+            for j in range(gptr[g], gptr[g + 1]):
+                syn_ids[num] = syn_index[j]
+                num += 1
+        counts[slot] = 0
+        cursor[0] = (slot + 1) % counts.shape[0]
+        return syn_ids
+
+except ModuleNotFoundError:
+    pass
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+__all__ = [
+    'StateBlock',
+]
+
+# the byte alignment of each variable in the block, one cache line
+_ALIGN = 64
+
+
+class StateBlock(object):
+    """Contiguous storage of the state variables of a neuron group.
+
+    The variables of a group, e.g. ``V``, ``input``, ``spike``,
+    ``refractory`` and ``ref_count`` of ``LIF``, are moved into one
+    allocation, and the attributes of the group are replaced by the views
+    of the block. Each variable starts at a 64-byte aligned offset, so
+    the variables of different dtypes share the block. A snapshot or a
+    restore of the whole state is then one copy of :attr:`data`::
+
+        group = brainmodels.numba_backend.neurons.LIF(1000)
+        block = StateBlock(group)
+        checkpoint = block.copy()
+        group.run(100.)
+        block.load(checkpoint)
+
+    The block holds the state only as long as the model updates its
+    variables in place, as the ``numba_backend`` models and the
+    ``tensor_backend`` models with ``fused=True`` do. The other tensor
+    models assign new arrays to the attributes in each step, which
+    detaches them from the block, see :attr:`attached`. The block is
+    made before the first run of the group, as the compiled step
+    functions may keep the previous arrays.
+
+    Parameters
+    ----------
+    group : bp.NeuGroup
+        The neuron group, whose variables are numpy arrays.
+    names : None, list of str
+        The names of the variables. Default is all the array attributes
+        of the group with the shape of one state variable.
+    """
+
+    def __init__(self, group, names=None):
+        if names is None:
+            names = _get_state_names(group)
+        if len(names) == 0:
+            raise ValueError(f'No state variable of "{group.name}" to be put into a state block.')
+        arrays = [np.asarray(getattr(group, name)) for name in names]
+
+        offsets, nbytes = [], 0
+        for arr in arrays:
+            offsets.append(nbytes)
+            nbytes += -(-arr.nbytes // _ALIGN) * _ALIGN
+        # over-allocate to align the start of the block
+        raw = np.zeros(nbytes + _ALIGN, dtype=np.uint8)
+        start = -raw.ctypes.data % _ALIGN
+
+        self.group = group
+        self.names = list(names)
+        self.data = raw[start: start + nbytes]
+        self.views = dict()
+        for name, arr, offset in zip(names, arrays, offsets):
+            view = self.data[offset: offset + arr.nbytes].view(arr.dtype).reshape(arr.shape)
+            view[...] = arr
+            self.views[name] = view
+            setattr(group, name, view)
+
+    def __getitem__(self, name):
+        return self.views[name]
+
+    @property
+    def attached(self):
+        """Whether all the variables of the group are still the views of the block."""
+        return all(getattr(self.group, name) is view for name, view in self.views.items())
+
+    def copy(self):
+        """Get a snapshot of the state, as a copy of :attr:`data`."""
+        return self.data.copy()
+
+    def load(self, data):
+        """Restore the state from a snapshot made by :meth:`copy`, or
+        from the :attr:`data` of the block of another group of the same
+        model and size."""
+        data = np.asarray(data)
+        if data.shape != self.data.shape:
+            raise ValueError(f'The state of {data.nbytes} bytes does not match the '
+                             f'state block of {self.data.nbytes} bytes.')
+        self.data[:] = data
+
+
+def _get_state_names(group):
+    """Get the names of the array attributes with the shape of one state
+    variable, i.e. the number of the neurons, or the group size, with the
+    leading trial axis if the group has one."""
+    shapes = [(group.num,), tuple(group.size)]
+    batch = getattr(group, 'batch', None)
+    if batch is not None:
+        shapes = [(batch,) + shape for shape in shapes]
+    return [name for name, val in vars(group).items()
+            if isinstance(val, np.ndarray) and val.shape in shapes]
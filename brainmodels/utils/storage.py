@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+
+import brainpy as bp
+import numpy as np
+
+from .dtype import get_dtype
+
+__all__ = [
+    'DenseStorage',
+    'CSRStorage',
+    'get_storage',
+    'csc_index',
+    'sort_synapses',
+    'event_values',
+]
+
+
+class DenseStorage(object):
+    """Dense synaptic storage.
+
+    Synaptic variables are ``(num_pre, num_post)`` matrices, and the
+    connectivity is the ``conn_mat`` mask. The index returned by
+    :meth:`pre_events` and :meth:`post_events` can be used to update
+    the synaptic variables in place, e.g. ``s[storage.pre_events(spike)] += 1.``.
+
+    The neuron and the synaptic variables can have a leading trial axis,
+    e.g. ``(batch, num_pre, num_post)``, in which case the event index
+    starts with the trial index.
+
+    Parameters
+    ----------
+    conn : bp.connect.Connector
+        The instantiated connector.
+    """
+
+    def __init__(self, conn):
+        self.num_pre = conn.num_pre
+        self.num_post = conn.num_post
+        self.conn_mat = bp.ops.as_tensor(conn.requires('conn_mat'), dtype=get_dtype())
+        self.size = bp.ops.shape(self.conn_mat)
+
+    def conn_index(self, conn):
+        """Get the index of the synapses in the connector order."""
+        pre_ids, post_ids = conn.requires('pre_ids', 'post_ids')
+        return np.asarray(pre_ids), np.asarray(post_ids)
+
+    def from_pre(self, pre_val):
+        """Map a pre-synaptic vector onto the synapses."""
+        return bp.ops.unsqueeze(pre_val, -1) * self.conn_mat
+
+    def from_post(self, post_val):
+        """Map a post-synaptic vector onto the synapses."""
+        return bp.ops.unsqueeze(post_val, -2) * self.conn_mat
+
+    def to_post(self, syn_val):
+        """Sum the synaptic values onto each post-synaptic neuron."""
+        return bp.ops.sum(syn_val, axis=-2)
+
+    def mask(self, syn_val):
+        """Zero in place the synaptic values of the absent synapses."""
+        syn_val *= self.conn_mat
+        return syn_val
+
+    def weighted_to_post(self, pre_val, syn_weight):
+        """Sum the pre-synaptic values weighted by the synaptic values onto
+        each post-synaptic neuron, without a per-synapse intermediate.
+
+        ``syn_weight`` must be zero at the absent synapses, see :meth:`mask`.
+        """
+        out = bp.ops.matmul(bp.ops.unsqueeze(pre_val, -2), syn_weight)
+        return bp.ops.squeeze(out, -2)
+
+    def outer(self, pre_val, post_val, out=None):
+        """Get the product of the pre- and the post-synaptic values of each
+        synapse, zero at the absent synapses. The product is written into
+        the preallocated synaptic array ``out`` if given."""
+        out = bp.ops.multiply(bp.ops.unsqueeze(pre_val, -1), self.conn_mat, out)
+        out *= bp.ops.unsqueeze(post_val, -2)
+        return out
+
+    def scale_post(self, syn_val, post_val):
+        """Multiply in place the synaptic values by the value of their
+        post-synaptic neuron."""
+        syn_val *= bp.ops.unsqueeze(post_val, -2)
+        return syn_val
+
+    def pre_events(self, pre_spike):
+        """Get the index of the synapses whose pre-synaptic neuron spikes.
+
+        Only the rows of the spiking neurons are visited, so the cost
+        scales with the number of events instead of the matrix size.
+        """
+        *trial_ids, pre_ids = bp.ops.nonzero(pre_spike)
+        rows, cols = bp.ops.nonzero(self.conn_mat[pre_ids])
+        return tuple(ids[rows] for ids in trial_ids) + (pre_ids[rows], cols)
+
+    def post_events(self, post_spike):
+        """Get the index of the synapses whose post-synaptic neuron spikes."""
+        *trial_ids, post_ids = bp.ops.nonzero(post_spike)
+        rows, cols = bp.ops.nonzero(self.conn_mat[:, post_ids])
+        return tuple(ids[cols] for ids in trial_ids) + (rows, post_ids[cols])
+
+    def pre_index(self, index):
+        """Get the index of the pre-synaptic neurons of the synapses at the
+        event index returned by :meth:`pre_events` or :meth:`post_events`."""
+        return index[:-1]
+
+    def post_index(self, index):
+        """Get the index of the post-synaptic neurons of the synapses at the
+        event index returned by :meth:`pre_events` or :meth:`post_events`."""
+        return index[:-2] + index[-1:]
+
+    def events_to_post(self, pre_spike, syn_val=None):
+        """Sum the synaptic values of the spiking pre-synaptic neurons onto
+        each post-synaptic neuron. Each synapse counts one if ``syn_val``
+        is None."""
+        index = self.pre_events(pre_spike)
+        data = bp.ops.ones(bp.ops.shape(index[-1])) if syn_val is None else event_values(syn_val, index)
+        return _scatter_to_post(data, index[:-2], index[-1], pre_spike, self.num_post)
+
+
+class CSRStorage(object):
+    """Compressed sparse row (CSR) synaptic storage.
+
+    Synaptic variables are vectors with one element per existing
+    synapse. Synapses are sorted by the pre-synaptic index, so that
+    the outgoing synapses of the pre-synaptic neuron ``i`` are
+    ``indptr[i]:indptr[i + 1]``.
+
+    The neuron and the synaptic variables can have a leading trial axis,
+    e.g. ``(batch, num_syn)``, in which case the event index starts with
+    the trial index.
+
+    Parameters
+    ----------
+    conn : bp.connect.Connector
+        The instantiated connector.
+    """
+
+    def __init__(self, conn):
+        self.num_pre = conn.num_pre
+        self.num_post = conn.num_post
+        pre_ids, post_ids = conn.requires('pre_ids', 'post_ids')
+        pre_ids = np.asarray(pre_ids)
+        post_ids = np.asarray(post_ids)
+        counts = np.bincount(pre_ids, minlength=self.num_pre)
+        if np.all(pre_ids[1:] >= pre_ids[:-1]):
+            # already sorted, e.g. shared by the processes, kept without a copy
+            order = slice(None)
+        else:
+            order = np.argsort(pre_ids, kind='stable')
+        self.pre_ids = bp.ops.as_tensor(pre_ids[order])
+        self.post_ids = bp.ops.as_tensor(post_ids[order])
+        self.indptr = bp.ops.as_tensor(np.concatenate(([0], np.cumsum(counts))))
+        self.size = (len(pre_ids),)
+
+        # synapses grouped by the post-synaptic neuron
+        post2syn, post_indptr = csc_index(post_ids[order], self.num_post)
+        self.post2syn = bp.ops.as_tensor(post2syn)
+        self.post_indptr = bp.ops.as_tensor(post_indptr)
+
+    def conn_index(self, conn):
+        """Get the index of the synapses in the connector order."""
+        order = np.argsort(np.asarray(conn.requires('pre_ids')), kind='stable')
+        syn_ids = np.empty(len(order), dtype=np.int64)
+        syn_ids[order] = np.arange(len(order))
+        return (syn_ids,)
+
+    def from_pre(self, pre_val):
+        """Map a pre-synaptic vector onto the synapses."""
+        return pre_val[..., self.pre_ids]
+
+    def from_post(self, post_val):
+        """Map a post-synaptic vector onto the synapses."""
+        return post_val[..., self.post_ids]
+
+    def to_post(self, syn_val):
+        """Sum the synaptic values onto each post-synaptic neuron."""
+        return bp.ops.segment_sum(syn_val, self.post_ids, self.num_post)
+
+    def mask(self, syn_val):
+        """Zero in place the synaptic values of the absent synapses. Only
+        the existing synapses are stored, so the values are returned as is."""
+        return syn_val
+
+    def weighted_to_post(self, pre_val, syn_weight):
+        """Sum the pre-synaptic values weighted by the synaptic values onto
+        each post-synaptic neuron."""
+        return bp.ops.segment_sum(pre_val[..., self.pre_ids] * syn_weight, self.post_ids, self.num_post)
+
+    def outer(self, pre_val, post_val, out=None):
+        """Get the product of the pre- and the post-synaptic values of each
+        synapse. The product is written into the preallocated synaptic
+        array ``out`` if given."""
+        return bp.ops.multiply(pre_val[..., self.pre_ids], post_val[..., self.post_ids], out)
+
+    def scale_post(self, syn_val, post_val):
+        """Multiply in place the synaptic values by the value of their
+        post-synaptic neuron."""
+        syn_val *= post_val[..., self.post_ids]
+        return syn_val
+
+    def pre_events(self, pre_spike):
+        """Get the index of the synapses whose pre-synaptic neuron spikes.
+
+        Only the outgoing synapses of the spiking neurons are visited.
+        """
+        *trial_ids, pre_ids = bp.ops.nonzero(pre_spike)
+        starts, ends = self.indptr[pre_ids], self.indptr[pre_ids + 1]
+        syn_ids = bp.ops.concat_ranges(starts, ends)
+        return tuple(bp.ops.repeat(ids, ends - starts) for ids in trial_ids) + (syn_ids,)
+
+    def post_events(self, post_spike):
+        """Get the index of the synapses whose post-synaptic neuron spikes."""
+        *trial_ids, post_ids = bp.ops.nonzero(post_spike)
+        starts, ends = self.post_indptr[post_ids], self.post_indptr[post_ids + 1]
+        syn_ids = self.post2syn[bp.ops.concat_ranges(starts, ends)]
+        return tuple(bp.ops.repeat(ids, ends - starts) for ids in trial_ids) + (syn_ids,)
+
+    def pre_index(self, index):
+        """Get the index of the pre-synaptic neurons of the synapses at the
+        event index returned by :meth:`pre_events` or :meth:`post_events`."""
+        return index[:-1] + (self.pre_ids[index[-1]],)
+
+    def post_index(self, index):
+        """Get the index of the post-synaptic neurons of the synapses at the
+        event index returned by :meth:`pre_events` or :meth:`post_events`."""
+        return index[:-1] + (self.post_ids[index[-1]],)
+
+    def events_to_post(self, pre_spike, syn_val=None):
+        """Sum the synaptic values of the spiking pre-synaptic neurons onto
+        each post-synaptic neuron. Each synapse counts one if ``syn_val``
+        is None."""
+        index = self.pre_events(pre_spike)
+        data = bp.ops.ones(bp.ops.shape(index[-1])) if syn_val is None else event_values(syn_val, index)
+        return _scatter_to_post(data, index[:-1], self.post_ids[index[-1]], pre_spike, self.num_post)
+
+
+def event_values(syn_val, index):
+    """Get the synaptic values at the event index returned by
+    :meth:`pre_events` or :meth:`post_events`. The trial index is
+    skipped if ``syn_val`` is shared by the trials, e.g. a weight
+    without the trial axis."""
+    ndim = len(bp.ops.shape(syn_val))
+    return syn_val[index[len(index) - ndim:]]
+
+
+def _scatter_to_post(data, trial_ids, post_ids, pre_spike, num_post):
+    """Sum the event values onto each (trial, post-synaptic neuron) pair."""
+    if len(trial_ids) == 0:
+        return bp.ops.segment_sum(data, post_ids, num_post)
+    num_trial = bp.ops.shape(pre_spike)[0]
+    out = bp.ops.segment_sum(data, trial_ids[0] * num_post + post_ids, num_trial * num_post)
+    return bp.ops.reshape(out, (num_trial, num_post))
+
+
+def get_storage(conn, storage='dense'):
+    """Get the synaptic storage.
+
+    Parameters
+    ----------
+    conn : bp.connect.Connector
+        The instantiated connector.
+    storage : str
+        The storage layout, ``'dense'`` or ``'csr'``.
+
+    Returns
+    -------
+    storage : DenseStorage, CSRStorage
+        The synaptic storage.
+    """
+    if storage == 'dense':
+        return DenseStorage(conn)
+    elif storage == 'csr':
+        return CSRStorage(conn)
+    else:
+        raise ValueError(f'Unknown synaptic storage "{storage}".')
+
+
+def csc_index(post_ids, num_post):
+    """Group the synapses by the post-synaptic neuron.
+
+    The synapses onto the post-synaptic neuron ``j`` are
+    ``syn_ids[indptr[j]:indptr[j + 1]]``. The synapse order within
+    each group is kept.
+
+    Parameters
+    ----------
+    post_ids : np.ndarray
+        The post-synaptic neuron index of each synapse.
+    num_post : int
+        The number of the post-synaptic neurons.
+
+    Returns
+    -------
+    index : tuple
+        The synapse ids ``syn_ids`` and the pointers ``indptr``.
+    """
+    post_ids = np.asarray(post_ids)
+    syn_ids = np.argsort(post_ids, kind='stable')
+    counts = np.bincount(post_ids, minlength=num_post)
+    indptr = np.concatenate(([0], np.cumsum(counts)))
+    return syn_ids, indptr
+
+
+def sort_synapses(pre_ids, post_ids, order=None):
+    """Sort the synapses by the post- or the pre-synaptic neuron.
+
+    Sorting by the post-synaptic neuron makes the reduction onto each
+    post-synaptic neuron a contiguous segment, and sorting by the
+    pre-synaptic neuron makes the spike gathers contiguous.
+
+    Parameters
+    ----------
+    pre_ids : np.ndarray
+        The pre-synaptic neuron index of each synapse.
+    post_ids : np.ndarray
+        The post-synaptic neuron index of each synapse.
+    order : None, str
+        ``None`` keeps the connector order, ``'post'`` sorts by the
+        post-synaptic and ``'pre'`` by the pre-synaptic neuron.
+
+    Returns
+    -------
+    synapses : tuple
+        The sorted ``pre_ids`` and ``post_ids``, and the permutation
+        ``perm``. The synapse ``k`` is the synapse ``perm[k]`` in the
+        connector order, so that ``s_conn[perm] = s`` restores the
+        connector order of a synaptic state ``s``.
+    """
+    pre_ids = np.asarray(pre_ids)
+    post_ids = np.asarray(post_ids)
+    if order is None:
+        # no copy, the connector arrays may be shared by the processes
+        return pre_ids, post_ids, np.arange(len(pre_ids))
+    elif order == 'post':
+        perm = np.lexsort((pre_ids, post_ids))
+    elif order == 'pre':
+        perm = np.lexsort((post_ids, pre_ids))
+    else:
+        raise ValueError(f'Unknown synapse order "{order}".')
+    return pre_ids[perm], post_ids[perm], perm
@@ -92,53 +92,16 @@ syn_delay_ee = 1.5
 syn_delay = .8
 
 
-def compute_p(coor_neu1, coor_neu2, conn_type='EE'):
-    x1, y1, z1 = coor_neu1
-    x2, y2, z2 = coor_neu2
-    dist = np.sqrt((x1-x2)**2+(y1-y2)**2+(z1-z2)**2)
-    C = pars[conn_type]['C']
-    p = C * np.exp(-dist/lbd**2)
-    return 1 if p >= np.random.random_sample() else 0
-
-
-def get_corr():
-    pos_corr = []
-    for z in range(n_z):
-        for y in range(n_y):
-            for x in range(n_x):
-                pos_corr.append([x, y, z])
-    return np.array(pos_corr)
+# neuron coordinates [x, y, z], x is the fastest axis
+neu_coor = brainmodels.utils.lattice_positions((n_z, n_y, n_x))[:, ::-1]
 
 
 def make_conn(conn_type='EE'):
-    neu_coor = get_corr()
-
-    if conn_type[0] == 'I':
-        n_pre = num_inh
-        coor_pre = neu_coor[i_idx]
-        assert n_pre == coor_pre.shape[0]
-    elif conn_type[0] == 'E':
-        n_pre = num_exc
-        coor_pre = neu_coor[e_idx]
-        assert n_pre == coor_pre.shape[0]
-
-    if conn_type[1] == 'I':
-        n_post = num_inh
-        coor_post = neu_coor[i_idx]
-        assert n_post == coor_post.shape[0]
-    elif conn_type[1] == 'E':
-        n_post = num_exc
-        coor_post = neu_coor[e_idx]
-        assert n_post == coor_post.shape[0]
-
-    mat = np.zeros((n_pre, n_post))
-
-    for i in range(n_pre):
-        for j in range(n_post):
-            mat[i][j] = compute_p(
-                coor_pre[i], coor_post[j], conn_type=conn_type)
-    # mat = bp.types.MatConn(mat)
-    return mat
+    pre_idx = i_idx if conn_type[0] == 'I' else e_idx
+    post_idx = i_idx if conn_type[1] == 'I' else e_idx
+    return brainmodels.utils.DistanceProb(C=pars[conn_type]['C'], lambda_=lbd,
+                                          pre_pos=neu_coor[pre_idx],
+                                          post_pos=neu_coor[post_idx])
 
 
 def gaussian_sample(mu, num, ratio=.5):
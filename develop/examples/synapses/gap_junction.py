@@ -15,7 +15,7 @@ neu1.V = bp.ops.ones(neu1.V.shape) * -10.
 syn = brainmodels.synapses.Gap_junction_lif(pre=neu0, post=neu1, conn=bp.connect.All2All(),
                                             post_refractory=True,
                                             k_spikelet=25.)
-syn.w = bp.ops.ones(syn.w.shape) * .5
+syn.w = syn.w * .5
 # syn = brainmodels.synapses.Gap_junction(pre=neu0, post=neu1, conn=bp.connect.All2All())
 net = bp.Network(neu0, neu1, syn, show_code=False)
 net.run(100., inputs=(neu0, 'input', 36.), report=True)
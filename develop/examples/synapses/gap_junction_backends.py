@@ -0,0 +1,23 @@
+import brainpy as bp
+import brainmodels
+import numpy as np
+
+# recurrent electrical coupling, the numba and the tensor backends should agree
+
+
+def run(backend):
+    bp.backend.set(backend=backend, dt=0.1)
+    brainmodels.set_backend(backend=backend)
+    neu = brainmodels.neurons.LIF(20, monitors=['V'], t_refractory=2.)
+    syn = brainmodels.synapses.Gap_junction_lif(pre=neu, post=neu, conn=bp.connect.FixedProb(0.3, seed=1),
+                                                post_refractory=True, k_spikelet=2.)
+    syn.w = syn.w * .2
+    net = bp.Network(neu, syn)
+    net.run(100., inputs=(neu, 'input', np.linspace(15., 30., 20)), report=False)
+    return np.asarray(neu.mon.V)
+
+
+V_numba = run('numba')
+V_tensor = run('numpy')
+print('max |V_numba - V_tensor| =', np.max(np.abs(V_numba - V_tensor)))
+assert np.allclose(V_numba, V_tensor)